@@ -6,6 +6,8 @@ from .data import (
     download_fundamentals,
 )
 from .engine import Engine
+from .orders import Order
+from .profiling import Profiler
 from .strategy import Strategy
 from .strategies import (
     MovingAverageCrossStrategy,
@@ -15,8 +17,9 @@ from .strategies import (
     KDJStrategy,
     Alpha101Strategy,
     AlphaWeightStrategy,
+    RuleStrategy,
 )
-from .analysis import analyze
+from .analysis import analyze, batch_analyze, performance
 
 __all__ = [
     "DataStore",
@@ -25,6 +28,8 @@ __all__ = [
     "download_history",
     "download_fundamentals",
     "Engine",
+    "Order",
+    "Profiler",
     "Strategy",
     "MovingAverageCrossStrategy",
     "MACDStrategy",
@@ -33,5 +38,8 @@ __all__ = [
     "KDJStrategy",
     "Alpha101Strategy",
     "AlphaWeightStrategy",
+    "RuleStrategy",
     "analyze",
+    "batch_analyze",
+    "performance",
 ]
@@ -1,16 +1,24 @@
-"""Partial implementation of the 101 Alpha formulas.
-
-Only a small subset of formulas is implemented to illustrate the
-framework. New formulas can be added easily by extending the
-``ALPHAS`` mapping.
+"""The 101 Alpha formulas.
+
+``ALPHAS`` holds the original single-symbol formulas, which work on one
+OHLCV frame and are kept for :func:`compute_alpha`. The complete set from
+the paper lives in :data:`~src.alphas.formulas.FORMULAS`. It is evaluated
+cross-sectionally over a :class:`~src.alphas.panel.Panel` by
+:func:`compute_alphas`, with all requested formulas sharing one
+expression graph.
 """
 from __future__ import annotations
 
-from typing import Callable, Dict
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Tuple
 
 import pandas as pd
 import numpy as np
 
+from .expr import AlphaProgram
+from .formulas import FORMULAS
+from .panel import Panel
+
 
 # ---------------------------------------------------------------------------
 # Helper functions used by some formulas
@@ -156,4 +164,33 @@ def compute_alpha(df: pd.DataFrame, name: str) -> pd.Series:
         raise NotImplementedError(f"{name} not implemented")
     return func(df)
 
-__all__ = ["compute_alpha", "ALPHAS"]
+
+@lru_cache(maxsize=32)
+def _program(names: Tuple[str, ...]) -> AlphaProgram:
+    return AlphaProgram({name: FORMULAS[name] for name in names})
+
+
+def compute_alphas(
+    panel: Panel, names: Optional[Iterable[str]] = None
+) -> Dict[str, pd.DataFrame]:
+    """Evaluate paper alphas over *panel* as (time × symbol) frames.
+
+    *names* defaults to every formula whose inputs the panel provides
+    (alpha056 needs a ``cap`` field). Classifications missing from
+    ``panel.groups`` put all symbols in one group, so ``IndNeutralize``
+    then demeans across the whole universe.
+    """
+    if names is None:
+        program = _program(tuple(FORMULAS))
+        names = [n for n in FORMULAS if all(f in panel for f in program.requires([n])[0])]
+    else:
+        names = list(names)
+        unknown = [n for n in names if n not in FORMULAS]
+        if unknown:
+            raise NotImplementedError(f"{unknown} not implemented")
+    program = _program(tuple(names))
+    groups = {name: panel.classification(name) for name in program.groups}
+    return program.evaluate(panel, groups=groups)
+
+
+__all__ = ["compute_alpha", "compute_alphas", "ALPHAS", "FORMULAS", "Panel"]
@@ -0,0 +1,513 @@
+"""Expression language for Alpha101-style formulas.
+
+Formulas such as ``-1 * correlation(rank(delta(log(volume), 2)), rank(((close
+- open) / open)), 6)`` are parsed into one shared expression graph. Every
+sub-expression is interned, so a term that appears several times, within one
+formula or across many, is computed once. The graph is then evaluated over
+(time × symbol) panels: each input field is a DataFrame indexed by
+timestamp with one column per symbol.
+
+Supported syntax: numbers, field names (``close``, ``vwap``, ``adv20``, ...),
+group references (``IndClass.sector``), ``+ - * / ^``, comparisons,
+``&&``/``||``, the ternary ``cond ? a : b`` and the function calls listed in
+:data:`FUNCTIONS`. Names are case-insensitive. Window arguments must be
+constants; fractional windows are floored, as in the paper.
+"""
+from __future__ import annotations
+
+import math
+import re
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+Key = Tuple[str, Tuple[int, ...], object]
+
+
+class ExpressionError(ValueError):
+    """A formula cannot be parsed or refers to an unknown function."""
+
+
+###############################################################################
+
+# Parsing
+
+###############################################################################
+
+_TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+    r"|(?P<name>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)?)"
+    r"|(?P<op>\|\||&&|<=|>=|==|!=|[-+*/^<>?:(),])"
+    r")"
+)
+
+_COMPARISONS = {"<", ">", "<=", ">=", "==", "!="}
+_COMMUTATIVE = {"+", "*", "==", "!=", "&&", "||"}
+
+
+def tokenize(formula: str) -> List[Tuple[str, str]]:
+    """Split *formula* into ``(kind, text)`` tokens."""
+    tokens: List[Tuple[str, str]] = []
+    pos, end = 0, len(formula.rstrip())
+    while pos < end:
+        match = _TOKEN.match(formula, pos)
+        if match is None or match.end() == pos:
+            raise ExpressionError(f"Unexpected character at {pos}: {formula[pos:pos + 10]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser emitting nodes into an :class:`AlphaProgram`.
+
+    Precedence, loosest first: ``?:``, ``||``, ``&&``, comparisons,
+    ``+ -``, ``* /``, unary ``-``, ``^``.
+    """
+
+    def __init__(self, program: "AlphaProgram", formula: str) -> None:
+        self.program = program
+        self.formula = formula
+        self.tokens = tokenize(formula)
+        self.pos = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos][1] if self.pos < len(self.tokens) else None
+
+    def _next(self) -> Tuple[str, str]:
+        if self.pos >= len(self.tokens):
+            raise ExpressionError(f"Unexpected end of formula: {self.formula!r}")
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def _expect(self, text: str) -> None:
+        _, tok = self._next()
+        if tok != text:
+            raise ExpressionError(f"Expected {text!r}, got {tok!r} in {self.formula!r}")
+
+    def parse(self) -> int:
+        node = self._ternary()
+        if self.pos != len(self.tokens):
+            raise ExpressionError(f"Unexpected {self._peek()!r} in {self.formula!r}")
+        return node
+
+    def _ternary(self) -> int:
+        cond = self._binary(0)
+        if self._peek() != "?":
+            return cond
+        self._next()
+        a = self._ternary()
+        self._expect(":")
+        b = self._ternary()
+        return self.program._node("where", (cond, a, b))
+
+    _LEVELS = (("||",), ("&&",), tuple(_COMPARISONS), ("+", "-"), ("*", "/"))
+
+    def _binary(self, level: int) -> int:
+        if level == len(self._LEVELS):
+            return self._unary()
+        left = self._binary(level + 1)
+        while self._peek() in self._LEVELS[level]:
+            op = self._next()[1]
+            right = self._binary(level + 1)
+            left = self.program._node(op, (left, right))
+        return left
+
+    def _unary(self) -> int:
+        if self._peek() == "-":
+            self._next()
+            return self.program._node("neg", (self._unary(),))
+        if self._peek() == "+":
+            self._next()
+            return self._unary()
+        return self._power()
+
+    def _power(self) -> int:
+        base = self._primary()
+        if self._peek() == "^":
+            self._next()
+            return self.program._node("^", (base, self._unary()))
+        return base
+
+    def _primary(self) -> int:
+        kind, tok = self._next()
+        if kind == "num":
+            return self.program._const(float(tok))
+        if tok == "(":
+            node = self._ternary()
+            self._expect(")")
+            return node
+        if kind != "name":
+            raise ExpressionError(f"Unexpected {tok!r} in {self.formula!r}")
+        name = tok.lower()
+        if self._peek() != "(":
+            if name.startswith("indclass."):
+                return self.program._node("group", (), name.split(".", 1)[1])
+            return self.program._node("field", (), name)
+        self._next()
+        args: List[int] = []
+        if self._peek() != ")":
+            args.append(self._ternary())
+            while self._peek() == ",":
+                self._next()
+                args.append(self._ternary())
+        self._expect(")")
+        return self.program._call(name, args, self.formula)
+
+
+###############################################################################
+
+# Kernels over (time × symbol) arrays
+
+###############################################################################
+
+# Upper bound on elements materialised per block by window kernels.
+_BLOCK_ELEMENTS = 1 << 22
+
+
+def _windowed(x: np.ndarray, d: int, func: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    """Apply *func* to every trailing window of *d* rows.
+
+    *func* receives a ``(rows, symbols, d)`` block and returns ``(rows,
+    symbols)``. Windows containing NaN yield NaN, like pandas ``rolling``.
+    """
+    out = np.full(x.shape, np.nan)
+    if d > len(x):
+        return out
+    windows = sliding_window_view(x, d, axis=0)
+    step = max(1, _BLOCK_ELEMENTS // max(1, x.shape[1] * d))
+    for start in range(0, len(windows), step):
+        block = windows[start:start + step]
+        values = func(block).astype(float)
+        values[np.isnan(block).any(axis=-1)] = np.nan
+        out[start + d - 1:start + d - 1 + len(block)] = values
+    return out
+
+
+def _rolling(x: np.ndarray, d: int, method: str) -> np.ndarray:
+    return getattr(pd.DataFrame(x).rolling(d), method)().to_numpy()
+
+
+def _rolling_pair(x: np.ndarray, y: np.ndarray, d: int, method: str) -> np.ndarray:
+    out = getattr(pd.DataFrame(x).rolling(d), method)(pd.DataFrame(y)).to_numpy()
+    return np.where(np.isinf(out), np.nan, out)
+
+
+def _correlation(x: np.ndarray, y: np.ndarray, d: int) -> np.ndarray:
+    """Rolling correlation; 0 where a complete window has zero variance.
+
+    Short windows over ranks are often constant, and propagating NaN there
+    would blank out every later window-based operator.
+    """
+    out = _rolling_pair(x, y, d, "corr")
+    complete = ~np.isnan(_rolling(x + y, d, "sum"))
+    return np.where(np.isnan(out) & complete, 0.0, out)
+
+
+def _shift(x: np.ndarray, d: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if d < len(x):
+        out[d:] = x[: len(x) - d]
+    return out
+
+
+def _ts_rank(x: np.ndarray, d: int) -> np.ndarray:
+    def rank_last(w: np.ndarray) -> np.ndarray:
+        last = w[..., -1:]
+        less = (w < last).sum(axis=-1)
+        equal = (w == last).sum(axis=-1)
+        return less + (equal + 1) / 2.0
+
+    return _windowed(x, d, rank_last)
+
+
+def _decay_linear(x: np.ndarray, d: int) -> np.ndarray:
+    weights = np.arange(1, d + 1, dtype=float)
+    weights /= weights.sum()
+    return _windowed(x, d, lambda w: w @ weights)
+
+
+def _rank(x: np.ndarray) -> np.ndarray:
+    return pd.DataFrame(x).rank(axis=1, pct=True).to_numpy()
+
+
+def _scale(x: np.ndarray, a: float = 1.0) -> np.ndarray:
+    total = np.nansum(np.abs(x), axis=1, keepdims=True)
+    return x * a / np.where(total == 0, np.nan, total)
+
+
+def _neutralize(x: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Subtract the per-row mean of each group (``codes[j]`` of column j)."""
+    valid = ~np.isnan(x)
+    values = np.where(valid, x, 0.0)
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+    onehot = np.zeros((len(codes), n_groups))
+    onehot[np.arange(len(codes)), codes] = 1.0
+    sums = values @ onehot
+    counts = valid @ onehot
+    means = sums / np.where(counts == 0, np.nan, counts)
+    return x - means[:, codes]
+
+
+def _divide(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    out = np.divide(a, b)
+    return np.where(np.isinf(out), np.nan, out)
+
+
+def _truth(x: np.ndarray) -> np.ndarray:
+    return (x != 0) & ~np.isnan(x)
+
+
+###############################################################################
+
+# Function table
+
+###############################################################################
+
+# name -> (kernel, number of array arguments, kinds of the constant arguments
+# that follow them). Windows are floored to ints.
+_WINDOW = "window"
+_SCALAR = "scalar"
+
+FUNCTIONS: Dict[str, Tuple[Callable, int, Tuple[str, ...]]] = {
+    "abs": (np.abs, 1, ()),
+    "log": (np.log, 1, ()),
+    "sign": (np.sign, 1, ()),
+    "rank": (_rank, 1, ()),
+    "scale": (_scale, 1, (_SCALAR,)),
+    "signedpower": (lambda x, a: np.sign(x) * np.abs(x) ** a, 2, ()),
+    "delay": (_shift, 1, (_WINDOW,)),
+    "delta": (lambda x, d: x - _shift(x, d), 1, (_WINDOW,)),
+    "ts_sum": (lambda x, d: _rolling(x, d, "sum"), 1, (_WINDOW,)),
+    "ts_mean": (lambda x, d: _rolling(x, d, "mean"), 1, (_WINDOW,)),
+    "stddev": (lambda x, d: _rolling(x, d, "std"), 1, (_WINDOW,)),
+    "ts_min": (lambda x, d: _rolling(x, d, "min"), 1, (_WINDOW,)),
+    "ts_max": (lambda x, d: _rolling(x, d, "max"), 1, (_WINDOW,)),
+    "ts_argmax": (lambda x, d: _windowed(x, d, lambda w: w.argmax(axis=-1) + 1), 1, (_WINDOW,)),
+    "ts_argmin": (lambda x, d: _windowed(x, d, lambda w: w.argmin(axis=-1) + 1), 1, (_WINDOW,)),
+    "ts_rank": (_ts_rank, 1, (_WINDOW,)),
+    "product": (lambda x, d: _windowed(x, d, lambda w: w.prod(axis=-1)), 1, (_WINDOW,)),
+    "decay_linear": (_decay_linear, 1, (_WINDOW,)),
+    "correlation": (_correlation, 2, (_WINDOW,)),
+    "covariance": (lambda x, y, d: _rolling_pair(x, y, d, "cov"), 2, (_WINDOW,)),
+    "indneutralize": (_neutralize, 1, ()),
+    "min2": (np.minimum, 2, ()),
+    "max2": (np.maximum, 2, ()),
+}
+
+# Paper spellings resolved at parse time. ``min``/``max`` with a constant
+# second argument are the rolling versions, otherwise element-wise.
+_ALIASES = {"sum": "ts_sum", "sma": "ts_mean", "corr": "correlation", "cov": "covariance"}
+
+_OPERATORS: Dict[str, Callable[..., np.ndarray]] = {
+    "+": np.add,
+    "-": np.subtract,
+    "*": np.multiply,
+    "/": _divide,
+    "^": np.power,
+    "neg": np.negative,
+    "<": lambda a, b: (a < b).astype(float),
+    ">": lambda a, b: (a > b).astype(float),
+    "<=": lambda a, b: (a <= b).astype(float),
+    ">=": lambda a, b: (a >= b).astype(float),
+    "==": lambda a, b: (a == b).astype(float),
+    "!=": lambda a, b: (a != b).astype(float),
+    "&&": lambda a, b: (_truth(a) & _truth(b)).astype(float),
+    "||": lambda a, b: (_truth(a) | _truth(b)).astype(float),
+    "where": lambda c, a, b: np.where(_truth(c), a, b),
+}
+
+_FOLDABLE = {"+", "-", "*", "/", "^", "neg"}
+
+
+###############################################################################
+
+# Program
+
+###############################################################################
+
+
+class AlphaProgram:
+    """A set of named formulas compiled into one deduplicated graph.
+
+    Nodes are stored as ``(op, argument ids, value)`` in creation order,
+    which is a topological order. Identical sub-expressions, including
+    commutative operands given in either order, map to the same node.
+
+    ``AlphaProgram({"a": "rank(delta(close, 7))", "b": "-delta(close, 7)"})``
+    computes ``delta(close, 7)`` once for both outputs.
+    """
+
+    def __init__(self, formulas: Optional[Mapping[str, str]] = None) -> None:
+        self._nodes: List[Key] = []
+        self._ids: Dict[Key, int] = {}
+        self.outputs: Dict[str, int] = {}
+        self.formulas: Dict[str, str] = {}
+        for name, formula in (formulas or {}).items():
+            self.add(name, formula)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def add(self, name: str, formula: str) -> None:
+        """Parse *formula* into the graph as output *name*."""
+        self.outputs[name] = _Parser(self, formula).parse()
+        self.formulas[name] = formula
+
+    @property
+    def fields(self) -> Set[str]:
+        """Input fields referenced by any formula."""
+        return self.requires(self.outputs)[0]
+
+    @property
+    def groups(self) -> Set[str]:
+        """Group classifications (``IndClass.<name>``) referenced."""
+        return self.requires(self.outputs)[1]
+
+    def requires(self, names: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """Input fields and classifications needed to evaluate *names*."""
+        fields: Set[str] = set()
+        groups: Set[str] = set()
+        for node in self._required(names):
+            op, _, value = self._nodes[node]
+            if op == "field":
+                fields.add(value)
+            elif op == "indneutralize":
+                groups.add(value)
+        return fields, groups
+
+    # ------------------------------------------------------------------
+    def _node(self, op: str, args: Tuple[int, ...], value: object = None) -> int:
+        if op in _COMMUTATIVE:
+            args = tuple(sorted(args))
+        if op in _FOLDABLE and all(self._nodes[a][0] == "const" for a in args):
+            with np.errstate(all="ignore"):
+                folded = _OPERATORS[op](*(np.float64(self._nodes[a][2]) for a in args))
+            return self._const(float(folded))
+        key = (op, args, value)
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self._nodes)
+            self._nodes.append(key)
+        return node
+
+    def _const(self, value: float) -> int:
+        return self._node("const", (), value)
+
+    def _call(self, name: str, args: List[int], formula: str) -> int:
+        name = _ALIASES.get(name, name)
+        if name in ("min", "max"):
+            is_window = len(args) == 2 and self._nodes[args[1]][0] == "const"
+            name = f"ts_{name}" if is_window else f"{name}2"
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"Unknown function {name!r} in {formula!r}")
+        _, n_arrays, constants = FUNCTIONS[name]
+        if name == "indneutralize":
+            if len(args) != 2 or self._nodes[args[1]][0] != "group":
+                raise ExpressionError(f"IndNeutralize needs an IndClass argument in {formula!r}")
+            return self._node(name, (args[0],), self._nodes[args[1]][2])
+        optional = name == "scale"
+        if not (n_arrays + len(constants) - optional <= len(args) <= n_arrays + len(constants)):
+            raise ExpressionError(f"Wrong number of arguments to {name!r} in {formula!r}")
+        params = []
+        for kind, arg in zip(constants, args[n_arrays:]):
+            op, _, value = self._nodes[arg]
+            if op != "const":
+                raise ExpressionError(f"{name} expects a constant {kind} in {formula!r}")
+            params.append(max(1, int(math.floor(value))) if kind == _WINDOW else value)
+        return self._node(name, tuple(args[:n_arrays]), tuple(params))
+
+    # ------------------------------------------------------------------
+    def _required(self, names: Iterable[str]) -> List[int]:
+        seen: Set[int] = set()
+        stack = [self.outputs[name] for name in names]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(self._nodes[node][1])
+        return sorted(seen)
+
+    def evaluate(
+        self,
+        fields: Mapping[str, pd.DataFrame],
+        *,
+        groups: Optional[Mapping[str, Mapping[str, object]]] = None,
+        names: Optional[Iterable[str]] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """Evaluate the formulas (all, or *names*) over a panel.
+
+        *fields* maps lowercase field names to (time × symbol) frames
+        sharing index and columns. *groups* maps a classification name to
+        ``{symbol: label}``; it defaults to ``fields.groups`` when present.
+        Intermediate arrays are released after their last consumer.
+        """
+        names = list(self.outputs if names is None else names)
+        order = self._required(names)
+        if groups is None:
+            groups = getattr(fields, "groups", {})
+        last_use: Dict[int, int] = {}
+        for node in order:
+            for arg in self._nodes[node][1]:
+                last_use[arg] = node
+        keep = {self.outputs[name] for name in names}
+
+        index = columns = None
+        values: Dict[int, np.ndarray] = {}
+        with np.errstate(all="ignore"):
+            for node in order:
+                op, args, value = self._nodes[node]
+                if op == "field":
+                    frame = fields[value]
+                    if index is None:
+                        index, columns = frame.index, frame.columns
+                    result = frame.to_numpy(dtype=float)
+                elif op == "const":
+                    result = np.float64(value)
+                elif op == "group":
+                    continue
+                elif op in _OPERATORS:
+                    result = _OPERATORS[op](*(values[a] for a in args))
+                elif op == "indneutralize":
+                    result = _neutralize(values[args[0]], self._group_codes(groups, value, columns))
+                else:
+                    result = FUNCTIONS[op][0](*(values[a] for a in args), *value)
+                values[node] = result
+                for arg in set(args):
+                    if last_use.get(arg) == node and arg not in keep:
+                        del values[arg]
+
+        if index is None:
+            raise ExpressionError("Formulas reference no input fields")
+        shape = (len(index), len(columns))
+        return {
+            name: pd.DataFrame(
+                np.broadcast_to(values[self.outputs[name]], shape).astype(float, copy=False),
+                index=index,
+                columns=columns,
+            )
+            for name in names
+        }
+
+    @staticmethod
+    def _group_codes(
+        groups: Mapping[str, Mapping[str, object]], name: str, columns: pd.Index
+    ) -> np.ndarray:
+        if name not in groups:
+            raise KeyError(f"No classification {name!r} for IndNeutralize")
+        labels = pd.Series(groups[name]).reindex(columns)
+        codes, _ = pd.factorize(labels, use_na_sentinel=False)
+        return codes
+
+
+def evaluate(formula: str, fields: Mapping[str, pd.DataFrame], **kwargs) -> pd.DataFrame:
+    """Evaluate a single *formula* over *fields* (see :meth:`AlphaProgram.evaluate`)."""
+    return AlphaProgram({"alpha": formula}).evaluate(fields, **kwargs)["alpha"]
+
+
+__all__ = ["AlphaProgram", "ExpressionError", "FUNCTIONS", "evaluate", "tokenize"]
@@ -0,0 +1,121 @@
+"""(time × symbol) market data panels for cross-sectional alphas."""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterator, Mapping, Optional
+
+import pandas as pd
+
+_ADV = re.compile(r"adv(\d+)$")
+_OHLCV = ("Open", "High", "Low", "Close", "Volume")
+
+
+def _field_name(column: str) -> str:
+    return column.strip().lower().replace(" ", "_")
+
+
+class Panel(Mapping[str, pd.DataFrame]):
+    """Aligned per-field frames, one column per symbol.
+
+    Besides the stored fields, the inputs used by the Alpha101 formulas are
+    derived on first access and cached:
+
+    ``returns``
+        Close-to-close simple returns.
+    ``vwap``
+        A stored ``vwap`` field if there is one, otherwise the typical price
+        ``(high + low + close) / 3`` as a daily approximation.
+    ``adv{d}``
+        Average daily volume over the past *d* bars, as used by the
+        repository's hand-written alphas.
+
+    *groups* maps a classification name (``sector``, ``industry``,
+    ``subindustry``) to ``{symbol: label}`` for ``IndNeutralize``.
+    """
+
+    def __init__(
+        self,
+        fields: Mapping[str, pd.DataFrame],
+        *,
+        groups: Optional[Mapping[str, Mapping[str, object]]] = None,
+    ) -> None:
+        if not fields:
+            raise ValueError("Panel needs at least one field")
+        frames = {_field_name(name): frame for name, frame in fields.items()}
+        first = next(iter(frames.values()))
+        self.index = first.index
+        self.columns = first.columns
+        self._fields: Dict[str, pd.DataFrame] = {
+            name: frame.reindex(index=self.index, columns=self.columns).astype(float)
+            for name, frame in frames.items()
+        }
+        self.groups: Dict[str, Mapping[str, object]] = dict(groups or {})
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame], **kwargs) -> "Panel":
+        """Build from per-symbol OHLCV frames such as ``DataStore.load`` returns.
+
+        Numeric columns shared by every symbol become fields; rows are the
+        union of all timestamps.
+        """
+        shared = None
+        for df in frames.values():
+            cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+            shared = cols if shared is None else [c for c in shared if c in cols]
+        fields = {
+            col: pd.concat({sym: df[col] for sym, df in frames.items()}, axis=1).sort_index()
+            for col in shared or []
+        }
+        return cls(fields, **kwargs)
+
+    @classmethod
+    def from_portal(cls, portal, **kwargs) -> "Panel":
+        """Build from a :class:`~src.data.DataPortal` on its aligned index."""
+        columns = pd.Index(portal.symbols)
+        fields = {
+            col: pd.DataFrame(portal.field_matrix(col), index=portal.index, columns=columns)
+            for col in _OHLCV
+        }
+        vwap = pd.DataFrame(portal.field_matrix("VWAP"), index=portal.index, columns=columns)
+        if vwap.notna().any().any():
+            fields["vwap"] = vwap
+        return cls(fields, **kwargs)
+
+    # ------------------------------------------------------------------
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        frame = self._fields.get(name)
+        if frame is None:
+            frame = self._fields[name] = self._derive(name)
+        return frame
+
+    def _derive(self, name: str) -> pd.DataFrame:
+        if name == "returns":
+            return self["close"].pct_change(fill_method=None)
+        if name == "vwap":
+            return (self["high"] + self["low"] + self["close"]) / 3
+        match = _ADV.match(name)
+        if match:
+            return self["volume"].rolling(int(match.group(1))).mean()
+        raise KeyError(f"Panel has no field {name!r}")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def classification(self, name: str) -> Dict[str, object]:
+        """``{symbol: label}`` for *name*; without one, a single group."""
+        return dict(self.groups.get(name) or dict.fromkeys(self.columns, "all"))
+
+
+__all__ = ["Panel"]
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
 
+import numpy as np
 import pandas as pd
 
+_DAY_NS = 86_400 * 10**9
+
 
 @dataclass
 class Report:
@@ -14,28 +19,243 @@ class Report:
     max_drawdown: float
 
 
-def analyze(results: pd.DataFrame, risk_free_rate: float = 0.0) -> Report:
-    """Calculate basic performance statistics for an Engine run."""
+@dataclass
+class PerformanceReport(Report):
+    volatility: float
+    sortino_ratio: float
+    calmar_ratio: float
+    max_drawdown_duration: int
+    exposure: float
+    turnover: float
+    num_trades: int
+    win_rate: float
+    profit_factor: float
+    avg_holding_days: float
+    periods_per_year: float
+
+
+# ---------------------------------------------------------------------------
+# Bar frequency
+# ---------------------------------------------------------------------------
+def infer_periods_per_year(index: pd.Index) -> float:
+    """Infer the number of bars per year from a DatetimeIndex.
+
+    Intraday data is scaled by the median number of bars per session.
+    Calendars that trade on weekends (crypto, FX) use 365 days a year,
+    exchange calendars 252. Falls back to 252 when the index is too short
+    or not datetime-like.
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return 252.0
+    step = float(np.median(np.diff(index.as_unit("ns").asi8))) / _DAY_NS
+    weekend = np.mean(index.dayofweek >= 5) > 0.1
+    days = 365.0 if weekend else 252.0
+    if step < 1:
+        sessions = index.normalize().as_unit("ns").asi8
+        per_day = float(np.median(np.unique(sessions, return_counts=True)[1]))
+        return days * per_day
+    if step <= 4:
+        return days
+    if step <= 10:
+        return 52.0
+    if step <= 45:
+        return 12.0
+    if step <= 120:
+        return 4.0
+    return 1.0
+
+
+# ---------------------------------------------------------------------------
+# Vectorised equity-curve metrics
+# ---------------------------------------------------------------------------
+def _equity_metrics(
+    values: np.ndarray, periods_per_year: float, risk_free_rate: float
+) -> Dict[str, np.ndarray]:
+    """Metrics for each column of a ``(bars, curves)`` value matrix."""
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[0]
+    returns = np.zeros_like(values)
+    returns[1:] = values[1:] / values[:-1] - 1
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+    total = values[-1] / values[0] - 1
+    annual = (1 + total) ** (periods_per_year / n) - 1
+
+    excess = returns - risk_free_rate / periods_per_year
+    mean = excess.mean(axis=0)
+    std = excess.std(axis=0, ddof=1) if n > 1 else np.zeros(values.shape[1])
+    scale = periods_per_year ** 0.5
+    sharpe = mean / (std + 1e-12) * scale
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2, axis=0))
+    sortino = mean / (downside + 1e-12) * scale
+
+    equity = np.cumprod(1 + returns, axis=0)
+    peak = np.maximum.accumulate(equity, axis=0)
+    drawdown = (equity - peak) / peak
+    max_dd = drawdown.min(axis=0)
+    # Bars since the last running peak; its maximum is the longest spell
+    # under water.
+    bars = np.arange(n)[:, None]
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, bars, 0), axis=0)
+    max_dd_duration = (bars - last_peak).max(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        calmar = np.where(max_dd < 0, annual / -max_dd, np.nan)
+
+    return {
+        "final_value": values[-1],
+        "total_return": total,
+        "annual_return": annual,
+        "sharpe_ratio": sharpe,
+        "max_drawdown": max_dd,
+        "volatility": std * scale,
+        "sortino_ratio": sortino,
+        "calmar_ratio": calmar,
+        "max_drawdown_duration": max_dd_duration,
+    }
+
+
+def analyze(
+    results: pd.DataFrame,
+    risk_free_rate: float = 0.0,
+    *,
+    periods_per_year: Optional[float] = None,
+) -> Report:
+    """Calculate basic performance statistics for an Engine run.
+
+    ``periods_per_year`` defaults to the frequency inferred from the index.
+    Statistics are always computed in float64; for runs on compact (float32)
+    data see :mod:`src.data.dtypes` for the resulting error bound.
+    """
     value = results["value"]
-    returns = value.pct_change().fillna(0.0)
+    ppy = periods_per_year or infer_periods_per_year(results.index)
+    m = _equity_metrics(value.to_numpy()[:, None], ppy, risk_free_rate)
+    return Report(**{f: float(m[f][0]) for f in Report.__dataclass_fields__})
+
+
+def rolling_sharpe(
+    results: pd.DataFrame,
+    window: int,
+    risk_free_rate: float = 0.0,
+    *,
+    periods_per_year: Optional[float] = None,
+) -> pd.Series:
+    """Annualised Sharpe ratio over a rolling window of bars."""
+    ppy = periods_per_year or infer_periods_per_year(results.index)
+    excess = results["value"].pct_change().fillna(0.0) - risk_free_rate / ppy
+    roll = excess.rolling(window)
+    return roll.mean() / (roll.std() + 1e-12) * ppy ** 0.5
+
+
+def batch_analyze(
+    curves: pd.DataFrame,
+    risk_free_rate: float = 0.0,
+    *,
+    periods_per_year: Optional[float] = None,
+) -> pd.DataFrame:
+    """Evaluate many equity curves (one per column) in a single pass.
+
+    Returns one row of metrics per column, suitable for sweep tables.
+    """
+    ppy = periods_per_year or infer_periods_per_year(curves.index)
+    m = _equity_metrics(curves.to_numpy(), ppy, risk_free_rate)
+    return pd.DataFrame(m, index=curves.columns)
+
+
+# ---------------------------------------------------------------------------
+# Trade-level statistics
+# ---------------------------------------------------------------------------
+def round_trips(trades: Iterable) -> pd.DataFrame:
+    """Match sells against earlier buys (FIFO) into closed round trips.
+
+    *trades* is ``Engine.trades`` (or any sequence of ``Trade`` objects).
+    """
+    frame = trades.to_frame() if hasattr(trades, "to_frame") else pd.DataFrame(
+        [t.__dict__ for t in trades],
+        columns=["timestamp", "symbol", "quantity", "price", "side", "cost"],
+    )
+    lots: Dict[str, deque] = {}
+    rows = []
+    for ts, sym, qty, price, side in zip(
+        frame["timestamp"], frame["symbol"], frame["quantity"], frame["price"], frame["side"]
+    ):
+        book = lots.setdefault(sym, deque())
+        if side == "buy":
+            book.append([ts, qty, price])
+            continue
+        while qty and book:
+            lot = book[0]
+            take = min(qty, lot[1])
+            rows.append((sym, lot[0], ts, take, lot[2], price, take * (price - lot[2])))
+            lot[1] -= take
+            qty -= take
+            if not lot[1]:
+                book.popleft()
+    return pd.DataFrame(
+        rows,
+        columns=["symbol", "entry_time", "exit_time", "quantity", "entry_price", "exit_price", "pnl"],
+    )
+
 
-    total = value.iloc[-1] / value.iloc[0] - 1
-    annual = (1 + total) ** (252 / len(value)) - 1
+def performance(
+    results: pd.DataFrame,
+    trades: Optional[Iterable] = None,
+    risk_free_rate: float = 0.0,
+    *,
+    periods_per_year: Optional[float] = None,
+) -> PerformanceReport:
+    """Extended statistics: risk ratios, drawdown duration, exposure,
+    turnover and, when *trades* are given, round-trip trade statistics."""
+    ppy = periods_per_year or infer_periods_per_year(results.index)
+    value = results["value"].to_numpy(dtype=np.float64)
+    m = {k: float(v[0]) for k, v in _equity_metrics(value[:, None], ppy, risk_free_rate).items()}
 
-    excess = returns - risk_free_rate / 252
-    sharpe = (excess.mean() / (excess.std() + 1e-12)) * (252 ** 0.5)
+    if "cash" in results:
+        invested = np.abs(value - results["cash"].to_numpy(dtype=np.float64))
+        exposure = float(np.mean(invested > 1e-9 * np.abs(value)))
+    else:
+        exposure = float("nan")
 
-    equity = (1 + returns).cumprod()
-    drawdown = (equity - equity.cummax()) / equity.cummax()
-    max_dd = drawdown.min()
+    turnover = 0.0
+    num_trades, win_rate, profit_factor, holding = 0, float("nan"), float("nan"), float("nan")
+    if trades is not None:
+        frame = trades.to_frame() if hasattr(trades, "to_frame") else None
+        notional = (
+            float((frame["quantity"] * frame["price"]).sum())
+            if frame is not None
+            else float(sum(t.quantity * t.price for t in trades))
+        )
+        turnover = notional / float(np.mean(value)) * ppy / len(value)
+        trips = round_trips(trades)
+        num_trades = len(trips)
+        if num_trades:
+            pnl = trips["pnl"].to_numpy()
+            win_rate = float(np.mean(pnl > 0))
+            loss = -pnl[pnl < 0].sum()
+            profit_factor = float(pnl[pnl > 0].sum() / loss) if loss else float("inf")
+            held = (trips["exit_time"] - trips["entry_time"]).dt.total_seconds()
+            holding = float(held.mean() / 86_400)
 
-    return Report(
-        final_value=float(value.iloc[-1]),
-        total_return=float(total),
-        annual_return=float(annual),
-        sharpe_ratio=float(sharpe),
-        max_drawdown=float(max_dd),
+    m["max_drawdown_duration"] = int(m["max_drawdown_duration"])
+    return PerformanceReport(
+        **m,
+        exposure=exposure,
+        turnover=turnover,
+        num_trades=num_trades,
+        win_rate=win_rate,
+        profit_factor=profit_factor,
+        avg_holding_days=holding,
+        periods_per_year=float(ppy),
     )
 
 
-__all__ = ["Report", "analyze"]
+__all__ = [
+    "Report",
+    "PerformanceReport",
+    "analyze",
+    "performance",
+    "batch_analyze",
+    "rolling_sharpe",
+    "round_trips",
+    "infer_periods_per_year",
+]
@@ -0,0 +1,126 @@
+"""Transaction cost models applied to engine fills.
+
+Every model maps ``(quantity, price, volume)`` to the cash cost of a fill.
+Arguments may be scalars or equal-length arrays, so the same model prices a
+single ``Engine.buy`` and a whole ``Engine.rebalance`` batch in one NumPy
+expression. Quantities are unsigned share counts; ``volume`` is the bar's
+traded volume (NaN when unknown).
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Iterable, List
+
+import numpy as np
+
+
+class CostModel(ABC):
+    """Base class for commission, slippage and impact models."""
+
+    @abstractmethod
+    def cost(self, quantity, price, volume) -> np.ndarray:
+        """Return the cash cost of fills of *quantity* shares at *price*."""
+        raise NotImplementedError
+
+    def __add__(self, other: "CostModel") -> "CompositeCost":
+        return CompositeCost([self, other])
+
+
+class CompositeCost(CostModel):
+    """Sum of several cost models."""
+
+    def __init__(self, models: Iterable[CostModel]) -> None:
+        self.models: List[CostModel] = []
+        for model in models:
+            if isinstance(model, CompositeCost):
+                self.models.extend(model.models)
+            else:
+                self.models.append(model)
+
+    def cost(self, quantity, price, volume) -> np.ndarray:
+        total = np.zeros(np.shape(quantity))
+        for model in self.models:
+            total = total + model.cost(quantity, price, volume)
+        return total
+
+
+class FixedCommission(CostModel):
+    """Flat fee per non-empty fill."""
+
+    def __init__(self, per_trade: float) -> None:
+        self.per_trade = per_trade
+
+    def cost(self, quantity, price, volume) -> np.ndarray:
+        return np.where(np.asarray(quantity) != 0, self.per_trade, 0.0)
+
+
+class PerShareCommission(CostModel):
+    """Fee proportional to share count with an optional per-fill minimum."""
+
+    def __init__(self, rate: float, minimum: float = 0.0) -> None:
+        self.rate = rate
+        self.minimum = minimum
+
+    def cost(self, quantity, price, volume) -> np.ndarray:
+        qty = np.abs(np.asarray(quantity, dtype=np.float64))
+        return np.where(qty != 0, np.maximum(qty * self.rate, self.minimum), 0.0)
+
+
+class BpsSlippage(CostModel):
+    """Constant slippage of ``bps`` basis points of traded notional."""
+
+    def __init__(self, bps: float) -> None:
+        self.bps = bps
+
+    def cost(self, quantity, price, volume) -> np.ndarray:
+        return np.abs(quantity) * np.asarray(price) * (self.bps * 1e-4)
+
+
+def _participation(quantity, volume) -> np.ndarray:
+    """Fill size as a fraction of bar volume; unknown volume counts as 100%."""
+    qty = np.abs(np.asarray(quantity, dtype=np.float64))
+    vol = np.asarray(volume, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(vol > 0, qty / vol, 1.0)
+
+
+class VolumeParticipationSlippage(CostModel):
+    """Slippage growing linearly with the fill's share of bar volume.
+
+    The price concession is ``coefficient * participation`` (capped at
+    ``max_participation``), charged on the traded notional.
+    """
+
+    def __init__(self, coefficient: float = 0.1, max_participation: float = 1.0) -> None:
+        self.coefficient = coefficient
+        self.max_participation = max_participation
+
+    def cost(self, quantity, price, volume) -> np.ndarray:
+        part = np.minimum(_participation(quantity, volume), self.max_participation)
+        return np.abs(quantity) * np.asarray(price) * self.coefficient * part
+
+
+class SquareRootImpact(CostModel):
+    """Square-root market impact: ``coefficient * volatility * sqrt(q / V)``.
+
+    ``volatility`` is the per-bar return volatility of the traded names.
+    """
+
+    def __init__(self, coefficient: float = 1.0, volatility: float = 0.02) -> None:
+        self.coefficient = coefficient
+        self.volatility = volatility
+
+    def cost(self, quantity, price, volume) -> np.ndarray:
+        impact = self.coefficient * self.volatility * np.sqrt(_participation(quantity, volume))
+        return np.abs(quantity) * np.asarray(price) * impact
+
+
+__all__ = [
+    "CostModel",
+    "CompositeCost",
+    "FixedCommission",
+    "PerShareCommission",
+    "BpsSlippage",
+    "VolumeParticipationSlippage",
+    "SquareRootImpact",
+]
@@ -1,12 +1,30 @@
 """Data access layer and ingestion helpers."""
-from .datastore import DataStore, DataPortal
-from .ingest import download_history, download_fundamentals
-from .series import DataSeries
+from .datastore import Bar, DataStore, DataPortal, normalize_ohlcv
+from .dtypes import compact_frame
+from .ingest import (
+    download_history,
+    download_fundamentals,
+    bulk_download,
+    update_history,
+    HistoryProvider,
+    YahooProvider,
+)
+from .series import DataSeries, LookaheadError
+from .streaming import StreamingPortal
 
 __all__ = [
+    "Bar",
     "DataStore",
     "DataPortal",
+    "StreamingPortal",
     "DataSeries",
+    "LookaheadError",
+    "normalize_ohlcv",
+    "compact_frame",
     "download_history",
     "download_fundamentals",
+    "bulk_download",
+    "update_history",
+    "HistoryProvider",
+    "YahooProvider",
 ]
@@ -1,17 +1,119 @@
-"""Datastore & DataPortal – core read‑only access layer."""
+"""Datastore & DataPortal – core storage and access layer."""
 
 from __future__ import annotations
 
+import csv
+import heapq
+import itertools
 import logging
-from dataclasses import dataclass, field
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from .series import DataSeries
+from ..singleflight import SingleFlight
+from .dtypes import compact_frame
+from .series import DataSeries, LookaheadError
 logger = logging.getLogger(__name__)
 
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+PRICE_COLUMNS = OHLCV_COLUMNS[:-1]
+_CANONICAL = {c.lower().replace(" ", ""): c for c in OHLCV_COLUMNS}
+
+
+def _canonical_name(name: object) -> str:
+    key = str(name).strip().lower().replace(" ", "").replace("_", "")
+    return _CANONICAL.get(key, str(name).strip())
+
+
+def _localize(index: pd.DatetimeIndex, tz: Optional[str]) -> pd.DatetimeIndex:
+    """Convert *index* to *tz* (naive timestamps are taken to be in *tz*)."""
+    if tz is None:
+        return index
+    return index.tz_localize(tz) if index.tz is None else index.tz_convert(tz)
+
+
+def _convert_index(df: pd.DataFrame, tz: Optional[str]) -> pd.DataFrame:
+    """Convert the index of *df* to *tz* in place."""
+    df.index = _localize(df.index, tz)
+    return df
+
+
+def normalize_ohlcv(
+    df: pd.DataFrame,
+    *,
+    price_dtype: str = "float64",
+    tz: Optional[str] = "UTC",
+) -> pd.DataFrame:
+    """Return *df* with a canonical OHLCV schema.
+
+    * MultiIndex columns (e.g. yfinance ``(Price, Ticker)``) are reduced to
+      the level holding the OHLCV field names.
+    * Column names are mapped case-/separator-insensitively onto
+      :data:`OHLCV_COLUMNS`.
+    * Prices are cast to *price_dtype*, ``Volume`` to ``int64``.
+    * The index becomes a sorted, unique DatetimeIndex converted to *tz*
+      (naive timestamps are assumed to be in *tz* already).
+    """
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        levels = range(df.columns.nlevels)
+        best = max(
+            levels,
+            key=lambda lvl: sum(
+                _canonical_name(v) in OHLCV_COLUMNS for v in df.columns.get_level_values(lvl)
+            ),
+        )
+        df.columns = df.columns.get_level_values(best)
+    df.columns = [_canonical_name(c) for c in df.columns]
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    _convert_index(df, tz)
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(price_dtype)
+    if "Volume" in df.columns:
+        df["Volume"] = pd.to_numeric(df["Volume"], errors="coerce").fillna(0).astype("int64")
+    return df
+
+
+def _last_line(path: Path, block: int = 1 << 16) -> Optional[str]:
+    """Last non-empty line of a text file after its header, read from the end."""
+    with open(path, "rb") as fh:
+        pos = fh.seek(0, os.SEEK_END)
+        tail = b""
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            fh.seek(pos)
+            tail = fh.read(step) + tail
+            # Two lines in the tail mean the last one is complete.
+            if len(tail.rstrip().splitlines()) >= 2:
+                break
+    lines = tail.rstrip().splitlines()
+    return lines[-1].decode() if len(lines) >= 2 else None
+
+
+def align_timestamp(ts: Optional[pd.Timestamp], index: pd.DatetimeIndex) -> Optional[pd.Timestamp]:
+    """Make *ts* comparable with *index* (matching tz-awareness)."""
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    if index.tz is not None and ts.tz is None:
+        return ts.tz_localize(index.tz)
+    if index.tz is None and ts.tz is not None:
+        return ts.tz_convert(None)
+    return ts
+
 ###############################################################################
 
 # DataStore – on‑disk Parquet/CSV with LRU in‑memory cache
@@ -27,22 +129,160 @@ class DataStore:
     -----
     * Stores one file per *symbol* (``<SYMBOL>.parquet`` or ``.csv``).
     * Keeps up to ``cache_size`` DataFrames in RAM; evicts FIFO beyond that.
+    * ``compact=True`` keeps loaded frames in float32/int32 (see
+      :mod:`src.data.dtypes`); files on disk are unaffected.
+    * :meth:`write` / :meth:`append` normalise the schema (see
+      :func:`normalize_ohlcv`) and replace files atomically, so concurrent
+      readers never observe a half-written file.
+    * Indexes are kept as stored by default. With ``tz`` set they are
+      converted to it on write and on load (naive timestamps are taken to be
+      in ``tz``), so legacy files and freshly written ones share a portal.
     """
 
-    def __init__(self, root: str | Path, *, cache_size: Optional[int] = 5):
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        cache_size: Optional[int] = 5,
+        price_dtype: str = "float64",
+        tz: Optional[str] = None,
+        compact: bool = False,
+    ):
         self.root = Path(root).expanduser().resolve()
         self.cache_size = cache_size
+        self.price_dtype = price_dtype
+        self.tz = tz
+        self.compact = compact
         self._cache: Dict[str, pd.DataFrame] = {}
+        # Bumped when a symbol's file is rewritten or reloaded, so a read that
+        # started earlier does not put its older frame into the cache.
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._flight = SingleFlight()
         logger.debug("DataStore @ %s (cache=%s)", self.root, cache_size)
 
+    def __getstate__(self) -> dict:
+        # Worker processes get the configuration only, not the cache or locks.
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        del state["_lock"], state["_flight"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._flight = SingleFlight()
+
     # ------------------------------ public API ----------------------------
 
     def load(self, symbol: str, *, reload: bool = False) -> pd.DataFrame:
+        """Return the history of *symbol* from the cache or disk.
+
+        Concurrent loads of the same symbol share a single file read.
+        ``reload=True`` always reads the file itself, so it never joins a
+        read that started before the file changed.
+        """
         key = symbol.upper()
-        if reload or key not in self._cache:
-            df = self._read_file(self._resolve_path(key))
-            self._insert_cache(key, df)
-        return self._cache[key]
+        if reload:
+            self._invalidate(key)
+            return self._load_file(key)
+        df = self._cache.get(key)
+        if df is None:
+            df = self._flight.do(key, self._load_file, key)
+        return df
+
+    def _load_file(self, key: str) -> pd.DataFrame:
+        version = self._versions.get(key, 0)
+        # With ``tz`` set, files written before it (or by other tools) may be
+        # naive; converting here keeps every symbol of a portal consistent.
+        df = _convert_index(self._read_file(self._resolve_path(key)), self.tz)
+        if self.compact:
+            df = compact_frame(df)
+        self._insert_cache(key, df, version)
+        return df
+
+    def write(self, symbol: str, df: pd.DataFrame, *, fmt: Optional[str] = None) -> Path:
+        """Normalise *df* and atomically replace the stored history.
+
+        *fmt* is ``"parquet"`` or ``"csv"``; by default an existing file keeps
+        its format and new files use Parquet (CSV if pyarrow is missing).
+        """
+        key = symbol.upper()
+        df = normalize_ohlcv(df, price_dtype=self.price_dtype, tz=self.tz)
+        if fmt is None:
+            try:
+                fmt = self._resolve_path(key).suffix.lstrip(".")
+            except FileNotFoundError:
+                fmt = "parquet"
+        path = self._atomic_write(self.root / f"{key}.{fmt}", df)
+        self._invalidate(key)
+        logger.debug("Wrote %d rows for %s → %s", len(df), key, path)
+        return path
+
+    def append(self, symbol: str, df: pd.DataFrame) -> int:
+        """Merge *df* into the stored history and return the rows added.
+
+        Overlapping timestamps are replaced by the new values.
+        """
+        key = symbol.upper()
+        new = normalize_ohlcv(df, price_dtype=self.price_dtype, tz=self.tz)
+        try:
+            old = normalize_ohlcv(
+                self._read_file(self._resolve_path(key)),
+                price_dtype=self.price_dtype,
+                tz=self.tz,
+            )
+        except FileNotFoundError:
+            self.write(key, new)
+            return len(new)
+        merged = pd.concat([old, new])
+        self.write(key, merged)
+        return len(merged.index.unique()) - len(old)
+
+    def last_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Timestamp of the last stored bar, or ``None`` if nothing is stored.
+
+        Only the tail of the file is read: the index column of the last
+        Parquet row group, or the last line of a CSV. Like
+        :meth:`iter_chunks` this relies on files being sorted by time, as
+        :meth:`write` leaves them.
+        """
+        try:
+            path = self._resolve_path(symbol.upper())
+        except FileNotFoundError:
+            return None
+        last = self._read_last_index(path)
+        if last is None:
+            return None
+        return _localize(pd.DatetimeIndex([last]), self.tz)[0]
+
+    def iter_chunks(self, symbol: str, rows: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Yield the stored history in consecutive frames of up to *rows* rows.
+
+        Parquet files are read batch by batch and CSV files with
+        ``chunksize``, so the full history is never held in memory. Files are
+        expected to be sorted by time, as :meth:`write` leaves them. Chunks
+        bypass the cache; ``compact`` is applied per chunk.
+        """
+        path = self._resolve_path(symbol.upper())
+        if path.suffix == ".parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            pf = pq.ParquetFile(path)
+            chunks = (
+                pa.Table.from_batches([batch], schema=pf.schema_arrow).to_pandas()
+                for batch in pf.iter_batches(batch_size=rows)
+            )
+        elif path.suffix == ".csv":
+            chunks = pd.read_csv(path, index_col=0, parse_dates=[0], chunksize=rows)
+        else:
+            raise ValueError(f"Unsupported file type: {path.suffix}")
+        for df in chunks:
+            if not isinstance(df.index, pd.DatetimeIndex):
+                raise ValueError("Index must be DatetimeIndex")
+            _convert_index(df, self.tz)
+            yield compact_frame(df) if self.compact else df
 
     # ---------------------------- private helpers ------------------------
 
@@ -66,13 +306,68 @@ class DataStore:
         df.sort_index(inplace=True)
         return df
 
-    def _insert_cache(self, key: str, df: pd.DataFrame):
-        # FIFO eviction
-        if self.cache_size is not None and len(self._cache) >= self.cache_size:
-            oldest = next(iter(self._cache))
-            logger.debug("Cache full – evicting %s", oldest)
-            self._cache.pop(oldest)
-        self._cache[key] = df
+    @staticmethod
+    def _read_last_index(path: Path) -> Optional[pd.Timestamp]:
+        if path.suffix == ".parquet":
+            import pyarrow.parquet as pq
+
+            pf = pq.ParquetFile(path)
+            meta = pf.schema_arrow.pandas_metadata or {}
+            names = [c for c in meta.get("index_columns", []) if isinstance(c, str)]
+            if names:
+                for group in reversed(range(pf.num_row_groups)):
+                    column = pf.read_row_group(group, columns=names[:1]).column(0)
+                    if len(column):
+                        return pd.Timestamp(column[-1:].to_pandas().iloc[0])
+                return None
+        elif path.suffix == ".csv":
+            line = _last_line(path)
+            if line is None:
+                return None
+            return pd.Timestamp(next(csv.reader([line]))[0])
+        # Unknown layout: fall back to a full read.
+        df = DataStore._read_file(path)
+        return df.index[-1] if len(df) else None
+
+    @staticmethod
+    def _atomic_write(path: Path, df: pd.DataFrame) -> Path:
+        """Write via a temp file in the target directory and ``os.replace``."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            if path.suffix == ".parquet":
+                try:
+                    df.to_parquet(tmp)
+                except ImportError:  # Fallback to CSV when pyarrow is unavailable
+                    path = path.with_suffix(".csv")
+                    df.to_csv(tmp)
+            elif path.suffix == ".csv":
+                # Full ISO timestamps – never truncate intraday bars
+                df.to_csv(tmp)
+            else:
+                raise ValueError(f"Unsupported file type: {path.suffix}")
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return path
+
+    def _invalidate(self, key: str) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _insert_cache(self, key: str, df: pd.DataFrame, version: int) -> None:
+        with self._lock:
+            if self._versions.get(key, 0) != version:
+                return
+            # FIFO eviction
+            if self.cache_size is not None and len(self._cache) >= self.cache_size:
+                oldest = next(iter(self._cache))
+                logger.debug("Cache full – evicting %s", oldest)
+                self._cache.pop(oldest)
+            self._cache[key] = df
 
     # ------------------------------------------------------------------
     def list_symbols(self) -> List[str]:
@@ -91,19 +386,109 @@ class DataStore:
 ###############################################################################
 
 
+class Bar(dict):
+    """Mapping of symbol → row ``Series`` for a single timestamp.
+
+    Besides the rows, a bar carries ``slots`` (positions of its symbols in
+    ``DataPortal.symbols``) and the matching ``close`` prices and ``volume``
+    as arrays so the engine can mark a portfolio and price fills without
+    touching the row objects.
+    """
+
+    __slots__ = ("slots", "close", "volume")
+
+
+def _enhance(series: DataSeries) -> pd.DataFrame:
+    return series.enhance()
+
+
 @dataclass
 class DataPortal:
+    """Aligned bar access over a fixed list of symbols.
+
+    ``compact`` defaults to the datastore's setting; when enabled the per-symbol
+    :class:`DataSeries` keep data and indicators in compact dtypes. The
+    matrices handed to the engine are always float64.
+
+    Symbol files are loaded concurrently on a thread pool of *max_workers*
+    (``1`` loads sequentially). Indicators are computed per symbol on a
+    thread pool, or on a process pool with ``executor="process"``, which
+    requires picklable indicator functions. With ``background=True`` the
+    constructor returns immediately. :meth:`ready` reports progress and
+    :meth:`wait_ready` blocks until the data is loaded. Every data access
+    waits implicitly.
+    """
+
     datastore: DataStore
     symbols: List[str]
-    _index: pd.DatetimeIndex = field(init=False, repr=False)
-    _series: Dict[str, DataSeries] = field(init=False, repr=False)
+    compact: Optional[bool] = None
+    max_workers: Optional[int] = None
+    executor: str = "thread"
+    background: bool = False
 
     def __post_init__(self):
-        self._series = {
-            sym: DataSeries(self.datastore.load(sym)) for sym in self.symbols
-        }
-        self._index = self._series[self.symbols[0]].data.index
-        logger.debug("DataPortal created with %d bars", len(self._index))
+        if self.executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor: {self.executor!r}")
+        if self.compact is None:
+            self.compact = getattr(self.datastore, "compact", False)
+        self._loaded: Future = Future()
+        if self.background:
+            threading.Thread(target=self._load, name="portal-build", daemon=True).start()
+        else:
+            self._load()
+            self._loaded.result()
+
+    def _load(self) -> None:
+        def load(sym: str) -> DataSeries:
+            return DataSeries(self.datastore.load(sym), compact=self.compact)
+
+        try:
+            if self.max_workers == 1 or len(self.symbols) < 2:
+                series = [load(sym) for sym in self.symbols]
+            else:
+                with ThreadPoolExecutor(self.max_workers) as pool:
+                    series = list(pool.map(load, self.symbols))
+            self._built = dict(zip(self.symbols, series))
+            logger.debug("DataPortal created with %d bars", len(series[0].data.index))
+            self._loaded.set_result(self)
+        except BaseException as exc:
+            self._loaded.set_exception(exc)
+
+    def ready(self) -> bool:
+        """``True`` once all symbols are loaded successfully."""
+        return self._loaded.done() and self._loaded.exception() is None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> "DataPortal":
+        """Block until loaded; re-raises a loading error."""
+        return self._loaded.result(timeout)
+
+    @property
+    def _series(self) -> Dict[str, DataSeries]:
+        if not self._loaded.done():
+            self._loaded.result()
+        return self._built
+
+    @property
+    def _index(self) -> pd.DatetimeIndex:
+        return self._series[self.symbols[0]].data.index
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return self._index
+
+    def enhance_all(self) -> Dict[str, pd.DataFrame]:
+        """Enhanced frames of every symbol, computing stale ones in parallel."""
+        series = self._series
+        todo = [ds for ds in series.values() if ds._cache is None]
+        if len(todo) > 1 and self.max_workers != 1:
+            if self.executor == "process":
+                with ProcessPoolExecutor(self.max_workers) as pool:
+                    for ds, df in zip(todo, pool.map(_enhance, todo)):
+                        ds._cache = df
+            else:
+                with ThreadPoolExecutor(self.max_workers) as pool:
+                    list(pool.map(_enhance, todo))
+        return {sym: ds.enhance() for sym, ds in series.items()}
 
     # ------------------------------------------------------------------
     def register_indicator(
@@ -111,13 +496,51 @@ class DataPortal:
         name: str,
         func: Callable[[pd.DataFrame], pd.Series | pd.DataFrame],
         symbols: Optional[List[str]] = None,
+        *,
+        timeframe: Optional[str] = None,
     ) -> None:
+        """Register *func* on the base bars or on a higher *timeframe*.
+
+        Higher-timeframe indicators are computed once on the resampled frame
+        and exposed as ``<name>_<timeframe>``.
+        """
         for sym in symbols or self.symbols:
-            self._series[sym].register_indicator(name, func)
+            self._series[sym].register_indicator(name, func, timeframe=timeframe)
 
-    def unregister_indicator(self, name: str, symbols: Optional[List[str]] = None) -> None:
+    def unregister_indicator(
+        self,
+        name: str,
+        symbols: Optional[List[str]] = None,
+        *,
+        timeframe: Optional[str] = None,
+    ) -> None:
+        for sym in symbols or self.symbols:
+            self._series[sym].unregister_indicator(name, timeframe=timeframe)
+
+    def get_indicator(
+        self, name: str, symbol: str
+    ) -> Optional[Callable[[pd.DataFrame], pd.Series | pd.DataFrame]]:
+        """The base-bar indicator registered as *name* for *symbol*, if any."""
+        return self._series[symbol].get_indicator(name)
+
+    def check_lookahead(self, samples: int = 3) -> None:
+        """Raise :class:`LookaheadError` if any registered indicator column
+        uses bars after the one it is reported on (see
+        :meth:`DataSeries.lookahead_columns`)."""
+        for sym in self.symbols:
+            bad = self._series[sym].lookahead_columns(samples)
+            if bad:
+                raise LookaheadError(f"Columns {bad} for {sym} depend on future bars")
+
+    def add_timeframe(self, rule: str, symbols: Optional[List[str]] = None) -> None:
+        """Expose *rule* bars (e.g. ``"1D"``, ``"W"``) alongside the base bars.
+
+        Each bar gains ``Open_<rule>`` … ``Volume_<rule>`` columns holding
+        the most recent higher-timeframe bar that has completed, i.e. whose
+        last constituent base bar is at or before the current timestamp.
+        """
         for sym in symbols or self.symbols:
-            self._series[sym].unregister_indicator(name)
+            self._series[sym].resample(rule)
 
     # --------------------------------------------------------------------
     def iter_bars(
@@ -126,21 +549,126 @@ class DataPortal:
         start: Optional[pd.Timestamp] = None,
         end: Optional[pd.Timestamp] = None,
     ) -> Iterable[Tuple[pd.Timestamp, Dict[str, pd.Series]]]:
-        enhanced = {sym: ds.enhance() for sym, ds in self._series.items()}
-        for ts in self._index:
+        enhanced = self.enhance_all()
+        yield from self._emit_bars(self.symbols, self._index, enhanced, start, end)
+
+    @classmethod
+    def _emit_bars(
+        cls,
+        symbols: List[str],
+        index: pd.DatetimeIndex,
+        frames: Dict[str, pd.DataFrame],
+        start: Optional[pd.Timestamp],
+        end: Optional[pd.Timestamp],
+    ) -> Iterable[Tuple[pd.Timestamp, Bar]]:
+        """Yield a :class:`Bar` of *frames* for each timestamp of *index*."""
+        start = align_timestamp(start, index)
+        end = align_timestamp(end, index)
+        close = cls._matrix(symbols, index, frames, "Close")
+        volume = cls._matrix(symbols, index, frames, "Volume")
+        slots = np.arange(len(symbols))
+        for i, ts in enumerate(index):
             if start and ts < start:
                 continue
             if end and ts > end:
                 break
-            yield ts, {sym: self._select_row(enhanced[sym], ts, sym) for sym in self.symbols}
+            bar = Bar((sym, cls._select_row(frames[sym], ts, sym)) for sym in symbols)
+            bar.slots = slots
+            bar.close = close[i]
+            bar.volume = volume[i]
+            yield ts, bar
+
+    def iter_events(
+        self,
+        *,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> Iterable[Tuple[pd.Timestamp, Bar]]:
+        """Yield bars in time order from each symbol's own index.
+
+        The per-symbol timestamp arrays are k-way merged with a heap, and each
+        yielded :class:`Bar` only holds the symbols that have a row at that
+        timestamp; ``slots``, ``close`` and ``volume`` are restricted to them.
+        Unlike :meth:`iter_bars`, nothing is aligned onto a shared index.
+        """
+        frames: List[pd.DataFrame] = []
+        streams = []
+        tz = None
+        enhanced = self.enhance_all()
+        for slot, sym in enumerate(self.symbols):
+            df = enhanced[sym]
+            ts = df.index.as_unit("ns").asi8
+            lo, hi = 0, len(ts)
+            if start is not None:
+                lo = ts.searchsorted(align_timestamp(start, df.index).value)
+            if end is not None:
+                hi = ts.searchsorted(align_timestamp(end, df.index).value, side="right")
+            frames.append(df)
+            tz = df.index.tz
+            streams.append(zip(ts[lo:hi].tolist(), itertools.repeat(slot), range(lo, hi)))
+        close = [self._frame_field(df, "Close", sym) for df, sym in zip(frames, self.symbols)]
+        volume = [self._frame_field(df, "Volume", sym) for df, sym in zip(frames, self.symbols)]
+
+        for ns, group in itertools.groupby(heapq.merge(*streams), key=lambda e: e[0]):
+            events = [(slot, pos) for _, slot, pos in group]
+            bar = Bar(
+                (self.symbols[slot], self._symbol_row(frames[slot].iloc[pos], self.symbols[slot]))
+                for slot, pos in events
+            )
+            bar.slots = np.array([slot for slot, _ in events], dtype=np.intp)
+            bar.close = np.array([close[slot][pos] for slot, pos in events])
+            bar.volume = np.array([volume[slot][pos] for slot, pos in events])
+            yield pd.Timestamp(ns, tz=tz), bar
+
+    def field_matrix(
+        self, name: str, frames: Optional[Dict[str, pd.DataFrame]] = None
+    ) -> np.ndarray:
+        """Return column *name* as a ``(bars, symbols)`` float64 array.
+
+        Symbols without the column are filled with NaN.
+        """
+        frames = frames or {sym: ds.data for sym, ds in self._series.items()}
+        return self._matrix(self.symbols, self._index, frames, name)
+
+    @classmethod
+    def _matrix(
+        cls,
+        symbols: List[str],
+        index: pd.DatetimeIndex,
+        frames: Dict[str, pd.DataFrame],
+        name: str,
+    ) -> np.ndarray:
+        out = np.full((len(index), len(symbols)), np.nan)
+        for j, sym in enumerate(symbols):
+            if name not in frames[sym].columns:
+                continue
+            col = cls._select_column(frames[sym], name, sym)
+            out[:, j] = col.reindex(index).to_numpy(dtype=np.float64)
+        return out
 
     def get_bar(self, ts: pd.Timestamp, symbol: str):
-        return self._select_row(self._series[symbol].enhance(), ts, symbol)
+        df = self._series[symbol].enhance()
+        return self._select_row(df, align_timestamp(ts, df.index), symbol)
 
     # ------------------------------------------------------------------
+    def _frame_field(self, df: pd.DataFrame, name: str, symbol: str) -> np.ndarray:
+        if name not in df.columns:
+            return np.full(len(df), np.nan)
+        return self._select_column(df, name, symbol).to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _select_column(df: pd.DataFrame, name: str, symbol: str) -> pd.Series:
+        col = df[name]
+        if isinstance(col, pd.DataFrame):
+            col = col[symbol] if symbol in col.columns else col.iloc[:, 0]
+        return col
+
+    @classmethod
+    def _select_row(cls, df: pd.DataFrame, ts: pd.Timestamp, symbol: str) -> pd.Series:
+        return cls._symbol_row(df.loc[ts], symbol)
+
     @staticmethod
-    def _select_row(df: pd.DataFrame, ts: pd.Timestamp, symbol: str) -> pd.Series:
-        row = df.loc[ts]
+    def _symbol_row(row: pd.Series, symbol: str) -> pd.Series:
         if isinstance(row.index, pd.MultiIndex):
             for level in range(row.index.nlevels):
                 if symbol in row.index.get_level_values(level):
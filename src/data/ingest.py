@@ -2,8 +2,13 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, Optional, Tuple, Type
 
 import pandas as pd
 
@@ -12,11 +17,21 @@ try:
 except ImportError:  # pragma: no cover - optional dependency
     yf = None
 
-from .datastore import DataStore
+from .datastore import DataStore, normalize_ohlcv
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["download_history", "download_fundamentals"]
+__all__ = [
+    "TRANSIENT_ERRORS",
+    "download_history",
+    "download_fundamentals",
+    "HistoryProvider",
+    "YahooProvider",
+    "RateLimiter",
+    "BulkResult",
+    "update_history",
+    "bulk_download",
+]
 
 
 def download_history(
@@ -41,21 +56,10 @@ def download_history(
             df = yf.download(symbol, start=start, end=end, progress=False, interval="1d")
     if df.empty:
         raise ValueError(f"No data returned for {symbol}")
-    df.index = pd.to_datetime(df.index)
-    df.sort_index(inplace=True)
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = ["_".join(map(str, c)) for c in df.columns]
-    if any("_" in c for c in df.columns):
-        df.columns = [c.split("_")[0] for c in df.columns]
+    df = normalize_ohlcv(df)
 
     if store is not None:
-        save_path = (Path(store.root) / f"{symbol.upper()}").with_suffix(".parquet")
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        try:
-            df.to_parquet(save_path)
-        except Exception:  # Fallback to CSV when pyarrow is unavailable
-            save_path = save_path.with_suffix(".csv")
-            df.to_csv(save_path, date_format="%Y-%m-%d")
+        save_path = store.write(symbol, df)
         logger.info("Saved %s rows for %s → %s", len(df), symbol, save_path)
     return df
 
@@ -76,3 +80,155 @@ def download_fundamentals(
         df.to_csv(path, index=False)
         logger.info("Saved fundamentals for %s → %s", symbol, path)
     return df
+
+
+###############################################################################
+
+# Bulk ingestion – concurrent, incremental, retrying
+
+###############################################################################
+
+
+class HistoryProvider(ABC):
+    """Source of OHLCV history used by :func:`bulk_download`."""
+
+    @abstractmethod
+    def fetch(
+        self,
+        symbol: str,
+        start: Optional[pd.Timestamp],
+        end: Optional[pd.Timestamp],
+        interval: str,
+    ) -> pd.DataFrame:
+        """Return bars for *symbol* in ``[start, end]`` (empty if none)."""
+        raise NotImplementedError
+
+
+class YahooProvider(HistoryProvider):
+    """Yahoo Finance via ``yfinance``."""
+
+    def fetch(self, symbol, start, end, interval):
+        if yf is None:
+            raise ImportError("pip install yfinance to enable YahooProvider")
+        df = yf.download(symbol, start=start, end=end, progress=False, interval=interval)
+        return df if df.empty else normalize_ohlcv(df)
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at most ``rate`` per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Errors worth retrying: connection resets, timeouts and HTTP failures
+# (``urllib`` and ``requests`` errors derive from OSError).
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (OSError,)
+
+
+@dataclass
+class BulkResult:
+    rows: Dict[str, int] = field(default_factory=dict)
+    failures: Dict[str, str] = field(default_factory=dict)
+
+
+def update_history(
+    symbol: str,
+    store: DataStore,
+    provider: Optional[HistoryProvider] = None,
+    *,
+    start: str | pd.Timestamp = "2000-01-01",
+    end: Optional[str | pd.Timestamp] = None,
+    interval: str = "1d",
+    retries: int = 3,
+    backoff: float = 1.0,
+    limiter: Optional[RateLimiter] = None,
+    retry_on: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+) -> int:
+    """Fetch only the bars after the last stored timestamp and merge them.
+
+    Returns the number of new rows written. Provider errors of the
+    *retry_on* types are retried with exponential backoff
+    (``backoff * 2**attempt`` seconds); any other error propagates at once.
+    """
+    provider = provider or YahooProvider()
+    # Refetch from the last stored bar; DataStore.append dedupes the overlap.
+    since = store.last_timestamp(symbol) or pd.Timestamp(start)
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.wait()
+        try:
+            new = provider.fetch(symbol, since, end, interval)
+            break
+        except retry_on as exc:
+            if attempt == retries:
+                raise
+            logger.warning("%s fetch failed (%s); retry %d", symbol, exc, attempt + 1)
+            time.sleep(backoff * 2**attempt)
+    if new is None or new.empty:
+        return 0
+    added = store.append(symbol, new)
+    logger.info("Saved %s new rows for %s", added, symbol)
+    return added
+
+
+def bulk_download(
+    symbols: Iterable[str],
+    store: DataStore,
+    provider: Optional[HistoryProvider] = None,
+    *,
+    start: str | pd.Timestamp = "2000-01-01",
+    end: Optional[str | pd.Timestamp] = None,
+    interval: str = "1d",
+    max_workers: int = 8,
+    rate_limit: Optional[float] = None,
+    retries: int = 3,
+    backoff: float = 1.0,
+    retry_on: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+) -> BulkResult:
+    """Incrementally update many symbols with a bounded worker pool.
+
+    ``rate_limit`` caps provider calls per second across all workers.
+    Symbol-level failures (*retry_on* errors left after the retries, and
+    ``ValueError`` such as an unknown symbol) are collected per symbol
+    instead of aborting the batch; any other exception is a bug and is
+    re-raised.
+    """
+    provider = provider or YahooProvider()
+    limiter = RateLimiter(rate_limit) if rate_limit else None
+    result = BulkResult()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(
+                update_history,
+                sym,
+                store,
+                provider,
+                start=start,
+                end=end,
+                interval=interval,
+                retries=retries,
+                backoff=backoff,
+                limiter=limiter,
+                retry_on=retry_on,
+            ): sym
+            for sym in symbols
+        }
+        for fut in as_completed(futures):
+            sym = futures[fut]
+            try:
+                result.rows[sym] = fut.result()
+            except (*retry_on, ValueError) as exc:
+                logger.error("%s failed: %s", sym, exc)
+                result.failures[sym] = str(exc)
+    return result
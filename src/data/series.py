@@ -1,30 +1,103 @@
 """DataSeries holding price data and calculating indicators."""
 from __future__ import annotations
 
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from .dtypes import compact_frame, compact_series
+
+_OHLCV_AGG = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Adj Close": "last",
+    "Volume": "sum",
+}
+
+
+def resample_ohlcv(df: pd.DataFrame, rule: str) -> Tuple[pd.DataFrame, pd.DatetimeIndex]:
+    """Aggregate *df* into *rule* bars.
+
+    Returns the resampled frame and, per resampled bar, the timestamp of its
+    last constituent bar – the earliest moment the bar is fully known.
+    Bins without data are dropped; non-OHLCV columns keep their last value.
+    """
+    agg = {col: _OHLCV_AGG.get(col, "last") for col in df.columns}
+    resampler = df.resample(rule)
+    out = resampler.agg(agg)
+    last_seen = df.index.to_series().resample(rule).last()
+    keep = last_seen.notna().to_numpy()
+    return out[keep], pd.DatetimeIndex(last_seen[keep])
+
+
+class LookaheadError(ValueError):
+    """An indicator column depends on bars after the one it is reported on."""
+
 
 class DataSeries:
-    def __init__(self, data: pd.DataFrame) -> None:
+    """Price frame plus lazily computed indicator columns.
+
+    With ``compact=True`` the data and every indicator output are stored
+    with the downcast dtypes of :mod:`src.data.dtypes`.
+
+    Higher timeframes (see :meth:`resample`) are child series with their own
+    indicators. :meth:`enhance` joins their columns, suffixed ``_<rule>``,
+    onto the base bars so that each base bar only sees higher-timeframe bars
+    that had closed by then.
+    """
+
+    def __init__(self, data: pd.DataFrame, *, compact: bool = False) -> None:
         if not isinstance(data.index, pd.DatetimeIndex):
             raise ValueError("Index must be DatetimeIndex")
-        self.data = data.sort_index().copy()
+        self.compact = compact
+        data = data.sort_index()
+        self.data = compact_frame(data) if compact else data.copy()
         self._indicators: Dict[str, Callable[[pd.DataFrame], pd.Series | pd.DataFrame]] = {}
         self._cache: Optional[pd.DataFrame] = None
+        self._timeframes: Dict[str, Tuple[DataSeries, pd.DatetimeIndex]] = {}
 
     # ------------------------------------------------------------------
     def register_indicator(
-        self, name: str, func: Callable[[pd.DataFrame], pd.Series | pd.DataFrame]
+        self,
+        name: str,
+        func: Callable[[pd.DataFrame], pd.Series | pd.DataFrame],
+        *,
+        timeframe: Optional[str] = None,
     ) -> None:
-        self._indicators[name] = func
+        if timeframe is not None:
+            self.resample(timeframe).register_indicator(name, func)
+        else:
+            self._indicators[name] = func
         self._cache = None
 
-    def unregister_indicator(self, name: str) -> None:
-        self._indicators.pop(name, None)
+    def unregister_indicator(self, name: str, *, timeframe: Optional[str] = None) -> None:
+        if timeframe is not None:
+            if timeframe in self._timeframes:
+                self._timeframes[timeframe][0].unregister_indicator(name)
+        else:
+            self._indicators.pop(name, None)
         self._cache = None
 
+    def get_indicator(self, name: str) -> Optional[Callable[[pd.DataFrame], pd.Series | pd.DataFrame]]:
+        """The function registered as *name* on the base bars, if any."""
+        return self._indicators.get(name)
+
+    def resample(self, rule: str) -> "DataSeries":
+        """Return the (cached) *rule* timeframe as its own :class:`DataSeries`."""
+        entry = self._timeframes.get(rule)
+        if entry is None:
+            frame, available = resample_ohlcv(self.data, rule)
+            entry = self._timeframes[rule] = (DataSeries(frame, compact=self.compact), available)
+            self._cache = None
+        return entry[0]
+
+    @property
+    def timeframes(self) -> Tuple[str, ...]:
+        return tuple(self._timeframes)
+
     # ------------------------------------------------------------------
     def enhance(self) -> pd.DataFrame:
         if self._cache is not None:
@@ -33,9 +106,58 @@ class DataSeries:
         for name, func in self._indicators.items():
             result = func(df)
             if isinstance(result, pd.Series):
-                df[name] = result
+                df[name] = compact_series(result) if self.compact else result
             else:
                 for col in result.columns:
-                    df[col] = result[col]
+                    df[col] = compact_series(result[col]) if self.compact else result[col]
+        for rule, (series, available) in self._timeframes.items():
+            # Re-key each higher-timeframe bar by its last constituent base
+            # bar, then carry it forward: no base bar sees an unfinished bar.
+            aligned = series.enhance().set_axis(available).reindex(df.index, method="ffill")
+            for col in aligned.columns:
+                df[f"{col}_{rule}"] = aligned[col]
         self._cache = df
         return df
+
+    def lookahead_columns(self, samples: int = 3) -> List[str]:
+        """Return indicator columns whose values change when future bars are
+        removed.
+
+        The indicators are recomputed on *samples* truncated prefixes of the
+        data. For each prefix, the last row must equal the same row of the
+        full :meth:`enhance` result. Higher timeframes are truncated to the
+        bars that had completed by the end of the prefix, so their columns
+        are checked as well.
+        """
+        full = self.enhance()
+        derived = [c for c in full.columns if c not in self.data.columns]
+        n = len(self.data)
+        if not derived or n < 2:
+            return []
+        cuts = np.unique(np.linspace(n // 2, n - 2, samples).astype(int))
+        bad: List[str] = []
+        for cut in cuts:
+            prefix = DataSeries(self.data.iloc[: cut + 1], compact=self.compact)
+            prefix._indicators = dict(self._indicators)
+            closed = self.data.index[cut]
+            for rule, (series, available) in self._timeframes.items():
+                keep = np.asarray(available <= closed)
+                child = DataSeries(series.data[keep], compact=self.compact)
+                child._indicators = dict(series._indicators)
+                prefix._timeframes[rule] = (child, available[keep])
+            part = prefix.enhance()
+            for col in derived:
+                if col in bad or col not in part.columns:
+                    continue
+                if not _same_value(part[col].iloc[-1], full[col].iloc[cut]):
+                    bad.append(col)
+        return bad
+
+
+def _same_value(a: object, b: object) -> bool:
+    if pd.isna(a) or pd.isna(b):
+        return bool(pd.isna(a) and pd.isna(b))
+    try:
+        return bool(np.isclose(float(a), float(b), rtol=1e-6))
+    except (TypeError, ValueError):
+        return a == b
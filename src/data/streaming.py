@@ -0,0 +1,236 @@
+"""StreamingPortal – chunked, bounded-memory bar replay for large histories."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from .datastore import Bar, DataPortal, DataStore, align_timestamp
+from .series import DataSeries, LookaheadError
+
+Window = Tuple[pd.DatetimeIndex, Dict[str, pd.DataFrame]]
+_DONE = object()
+
+
+class _ChunkBuffer:
+    """Rows read from one symbol's file but not yet handed out."""
+
+    def __init__(self, chunks: Iterator[pd.DataFrame]) -> None:
+        self._chunks = chunks
+        self._pending: List[pd.DataFrame] = []
+        self._rows = 0
+        self.exhausted = False
+
+    def _pull(self) -> bool:
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            return False
+        self._pending.append(chunk)
+        self._rows += len(chunk)
+        return True
+
+    def _split(self, n: int) -> pd.DataFrame:
+        data = pd.concat(self._pending) if len(self._pending) > 1 else self._pending[0]
+        head, rest = data.iloc[:n], data.iloc[n:]
+        self._pending = [rest] if len(rest) else []
+        self._rows = len(rest)
+        return head
+
+    def take(self, n: int) -> Optional[pd.DataFrame]:
+        """The next *n* rows (fewer at the end, ``None`` once exhausted)."""
+        while self._rows < n and self._pull():
+            pass
+        return self._split(n) if self._rows else None
+
+    def take_until(self, ts: pd.Timestamp) -> Optional[pd.DataFrame]:
+        """All remaining rows stamped at or before *ts*."""
+        while not self.exhausted and (not self._rows or self._pending[-1].index[-1] <= ts):
+            self._pull()
+        if not self._rows:
+            return None
+        n = sum(int(df.index.searchsorted(ts, side="right")) for df in self._pending)
+        return self._split(n) if n else None
+
+
+class StreamingPortal:
+    """Replay symbols from a :class:`DataStore` in bounded-size windows.
+
+    Drop-in for :class:`DataPortal` in ``Engine.run`` when histories do not
+    fit in memory. The first symbol drives the timeline, as in
+    :meth:`DataPortal.iter_bars`, in windows of *chunk_size* bars. Other
+    symbols are read up to the end of each window.
+
+    Indicators are computed per window on the window's rows plus the last
+    *warmup* rows of the previous window, which are then dropped again. For
+    indicators whose lookback is at most *warmup* bars, such as rolling
+    windows, the values are identical to a full in-memory computation.
+    Exponential smoothers converge to them. A background thread reads and
+    enhances up to *prefetch* windows ahead of the engine. With a *start*,
+    windows that end before it are read only to carry their warmup tail
+    forward and are not enhanced.
+
+    Higher timeframes and :meth:`DataPortal.iter_events` are not supported.
+    """
+
+    def __init__(
+        self,
+        datastore: DataStore,
+        symbols: List[str],
+        *,
+        chunk_size: int = 50_000,
+        warmup: int = 500,
+        prefetch: int = 2,
+        read_rows: int = 100_000,
+        compact: Optional[bool] = None,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        self.datastore = datastore
+        self.symbols = list(symbols)
+        self.chunk_size = chunk_size
+        self.warmup = warmup
+        self.prefetch = prefetch
+        self.read_rows = read_rows
+        self.compact = getattr(datastore, "compact", False) if compact is None else compact
+        self._indicators: Dict[str, Dict[str, Callable]] = {sym: {} for sym in self.symbols}
+        self._index: Optional[pd.DatetimeIndex] = None
+
+    # ------------------------------------------------------------------
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """Timestamps of the lead symbol (read once, chunk by chunk)."""
+        if self._index is None:
+            chunks = self.datastore.iter_chunks(self.symbols[0], self.read_rows)
+            parts = [df.index for df in chunks]
+            self._index = parts[0].append(parts[1:]) if parts else pd.DatetimeIndex([])
+        return self._index
+
+    def register_indicator(
+        self,
+        name: str,
+        func: Callable[[pd.DataFrame], pd.Series | pd.DataFrame],
+        symbols: Optional[List[str]] = None,
+    ) -> None:
+        for sym in symbols or self.symbols:
+            self._indicators[sym][name] = func
+
+    def unregister_indicator(self, name: str, symbols: Optional[List[str]] = None) -> None:
+        for sym in symbols or self.symbols:
+            self._indicators[sym].pop(name, None)
+
+    def get_indicator(self, name: str, symbol: str) -> Optional[Callable]:
+        return self._indicators[symbol].get(name)
+
+    def check_lookahead(self, samples: int = 3) -> None:
+        """Lookahead check (see :meth:`DataPortal.check_lookahead`) on the
+        first window of each symbol."""
+        for sym in self.symbols:
+            if not self._indicators[sym]:
+                continue
+            head = next(self.datastore.iter_chunks(sym, self.chunk_size), None)
+            if head is None:
+                continue
+            series = self._series(sym, head)
+            bad = series.lookahead_columns(samples)
+            if bad:
+                raise LookaheadError(f"Columns {bad} for {sym} depend on future bars")
+
+    # ------------------------------------------------------------------
+    def _series(self, symbol: str, data: pd.DataFrame) -> DataSeries:
+        series = DataSeries(data, compact=self.compact)
+        for name, func in self._indicators[symbol].items():
+            series.register_indicator(name, func)
+        return series
+
+    def iter_windows(self, start: Optional[pd.Timestamp] = None) -> Iterator[Window]:
+        """Yield ``(index, {symbol: enhanced frame})`` per window, in order.
+
+        Windows whose last bar is before *start* are skipped without being
+        enhanced; their rows still feed the next window's warmup tail.
+        """
+        lead, others = self.symbols[0], self.symbols[1:]
+        buffers = {
+            sym: _ChunkBuffer(self.datastore.iter_chunks(sym, self.read_rows))
+            for sym in self.symbols
+        }
+        tails: Dict[str, Optional[pd.DataFrame]] = dict.fromkeys(self.symbols)
+        while True:
+            rows = {lead: buffers[lead].take(self.chunk_size)}
+            if rows[lead] is None:
+                return
+            end = rows[lead].index[-1]
+            start = align_timestamp(start, rows[lead].index)
+            skip = start is not None and end < start
+            for sym in others:
+                rows[sym] = buffers[sym].take_until(end)
+            frames: Dict[str, pd.DataFrame] = {}
+            for sym, new in rows.items():
+                tail = tails[sym]
+                if new is None:
+                    new = (tail if tail is not None else rows[lead]).iloc[:0]
+                data = new if tail is None else pd.concat([tail, new])
+                if not skip:
+                    enhanced = self._series(sym, data).enhance()
+                    frames[sym] = enhanced.iloc[len(data) - len(new):]
+                if self.warmup:
+                    tails[sym] = data.iloc[-self.warmup:]
+            if not skip:
+                yield rows[lead].index, frames
+
+    def _prefetched(self, windows: Iterator[Window]) -> Iterator[Window]:
+        """Run *windows* in a background thread, *prefetch* items ahead."""
+        buf: "queue.Queue" = queue.Queue(maxsize=max(1, self.prefetch))
+        stop = threading.Event()
+
+        def put(item: object) -> bool:
+            while not stop.is_set():
+                try:
+                    buf.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce() -> None:
+            try:
+                for item in windows:
+                    if not put(item):
+                        return
+                put(_DONE)
+            except BaseException as exc:  # surfaced in the consumer
+                put(exc)
+
+        worker = threading.Thread(target=produce, name="portal-prefetch", daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = buf.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            worker.join(timeout=1.0)
+
+    def iter_bars(
+        self,
+        *,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> Iterable[Tuple[pd.Timestamp, Bar]]:
+        windows = self.iter_windows(start)
+        if self.prefetch:
+            windows = self._prefetched(windows)
+        for index, frames in windows:
+            if end is not None and index[0] > align_timestamp(end, index):
+                break
+            yield from DataPortal._emit_bars(self.symbols, index, frames, start, end)
+
+
+__all__ = ["StreamingPortal"]
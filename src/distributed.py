@@ -0,0 +1,509 @@
+"""Distributed backtests: a coordinator hands ``Engine.run`` jobs to workers.
+
+Workers connect to the coordinator over TCP and speak newline-delimited JSON:
+
+``{"op": "hello", "worker": name, "portals": [[...], ...]}``
+    sent once after connecting, listing the symbol lists of the portals the
+    worker has cached.
+``{"op": "result", "id": n, "row": {...}, "portals": [...]}`` / ``{"op": "error", "id": n, "error": msg, "portals": [...]}``
+    the outcome of task *n*, which also asks for the next task.
+
+The coordinator answers each message with ``{"op": "task", "id": n, "task":
+{...}}`` once a task is available, or ``{"op": "stop"}`` when it closes.
+Tasks only name a strategy class from :mod:`src.strategies`, so no code is
+shipped over the wire.
+
+Each task preferably goes to a worker that already caches a portal for
+exactly its symbols, so portals are loaded and enhanced once per worker
+rather than once per task. A task that errors, or whose worker disconnects
+or exceeds *task_timeout*, is requeued up to *retries* times, preferably
+onto another worker. Results stream back as rows of one table.
+"""
+from __future__ import annotations
+
+import importlib
+import inspect
+import json
+import logging
+import multiprocessing
+import pkgutil
+import queue
+import socket
+import socketserver
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .analysis import performance
+from .data import DataPortal, DataStore
+from .engine import Engine
+from .strategy import Strategy, make_strategy
+
+logger = logging.getLogger(__name__)
+
+Address = Tuple[str, int]
+
+
+@dataclass
+class BacktestTask:
+    """One ``Engine.run``: a strategy class name from ``src.strategies``."""
+
+    strategy: str
+    symbols: List[str]
+    params: Dict[str, Any] = field(default_factory=dict)
+    start: Optional[str] = None
+    end: Optional[str] = None
+    cash: float = 1_000_000.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BacktestTask":
+        return cls(**data)
+
+
+# ---------------------------------------------------------------------------
+# Wire format
+# ---------------------------------------------------------------------------
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    raise TypeError(f"Cannot serialise {type(obj).__name__}")
+
+
+def _send(wfile, message: Dict[str, Any]) -> None:
+    wfile.write(json.dumps(message, default=_default).encode() + b"\n")
+    wfile.flush()
+
+
+def _recv(rfile) -> Optional[Dict[str, Any]]:
+    line = rfile.readline()
+    if not line:
+        return None
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError(f"Malformed message: {line[:80]!r}")
+    return message
+
+
+def strategy_classes() -> Dict[str, type]:
+    """Strategy subclasses defined in the ``src.strategies`` modules."""
+    found = {}
+    pkg = importlib.import_module(".strategies", __package__)
+    for _, mod_name, _ in pkgutil.iter_modules(pkg.__path__):
+        mod = importlib.import_module(f".strategies.{mod_name}", __package__)
+        for _, obj in inspect.getmembers(mod, inspect.isclass):
+            if issubclass(obj, Strategy) and obj is not Strategy:
+                found[obj.__name__] = obj
+    return found
+
+
+###############################################################################
+
+# Worker
+
+###############################################################################
+
+
+class Worker:
+    """Run tasks from a coordinator against a local :class:`DataStore`.
+
+    Up to *cache_size* portals (one per symbol list) are kept between tasks;
+    their symbol lists are reported to the coordinator for scheduling.
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        store: DataStore | str | Path,
+        *,
+        name: Optional[str] = None,
+        cache_size: int = 8,
+        connect_timeout: float = 10.0,
+    ) -> None:
+        self.address = (address[0], int(address[1]))
+        self.store = store if isinstance(store, DataStore) else DataStore(store)
+        self.name = name or f"{socket.gethostname()}:{multiprocessing.current_process().pid}"
+        self.cache_size = cache_size
+        self.connect_timeout = connect_timeout
+        self._portals: "OrderedDict[Tuple[str, ...], DataPortal]" = OrderedDict()
+        self._strategies: Dict[str, type] = {}
+
+    @property
+    def cached_portals(self) -> List[List[str]]:
+        return [list(key) for key in self._portals]
+
+    def _portal(self, symbols: List[str]) -> Tuple[DataPortal, bool]:
+        key = tuple(symbols)
+        portal = self._portals.get(key)
+        if portal is not None:
+            self._portals.move_to_end(key)
+            return portal, True
+        portal = self._portals[key] = DataPortal(self.store, list(symbols))
+        while len(self._portals) > self.cache_size:
+            self._portals.popitem(last=False)
+        return portal, False
+
+    def _strategy(self, name: str) -> type:
+        if name not in self._strategies:
+            self._strategies = strategy_classes()
+        try:
+            return self._strategies[name]
+        except KeyError:
+            raise ValueError(f"Unknown strategy: {name!r}") from None
+
+    def run_task(self, task: BacktestTask) -> Dict[str, Any]:
+        """Run *task* and return its metrics row."""
+        began = time.perf_counter()
+        strategy = make_strategy(self._strategy(task.strategy), task.symbols, task.params)
+        portal, hit = self._portal(task.symbols)
+        engine = Engine(portal, strategy, starting_cash=task.cash)
+        start = pd.Timestamp(task.start) if task.start else None
+        end = pd.Timestamp(task.end) if task.end else None
+        results = engine.run(start=start, end=end)
+        row = asdict(performance(results, engine.trades))
+        row.update(cache_hit=hit, elapsed=time.perf_counter() - began)
+        return row
+
+    def _connect(self) -> socket.socket:
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return socket.create_connection(self.address)
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.1)
+
+    def serve(self) -> int:
+        """Process tasks until the coordinator stops or disconnects.
+
+        Returns the number of tasks handled.
+        """
+        handled = 0
+        with self._connect() as sock, sock.makefile("rb") as rfile, sock.makefile("wb") as wfile:
+            _send(wfile, {"op": "hello", "worker": self.name, "portals": self.cached_portals})
+            while True:
+                try:
+                    message = _recv(rfile)
+                except (OSError, ValueError):
+                    message = None
+                op = message.get("op") if message is not None else "stop"
+                if op == "stop":
+                    return handled
+                if op != "task" or "id" not in message:
+                    logger.warning("Unexpected message from coordinator: op=%r", op)
+                    return handled
+                task_id = message["id"]
+                try:
+                    row = self.run_task(BacktestTask.from_dict(message.get("task") or {}))
+                    reply = {"op": "result", "id": task_id, "row": row}
+                except Exception as exc:
+                    logger.debug("Task %s failed:\n%s", task_id, traceback.format_exc())
+                    reply = {"op": "error", "id": task_id, "error": f"{type(exc).__name__}: {exc}"}
+                reply["portals"] = self.cached_portals
+                handled += 1
+                try:
+                    _send(wfile, reply)
+                except OSError:
+                    return handled
+
+
+def _serve(address: Address, root: str, name: str) -> None:
+    Worker(address, root, name=name).serve()
+
+
+def spawn_workers(address: Address, root: str | Path, n: int) -> List[multiprocessing.Process]:
+    """Start *n* local worker processes connected to *address*."""
+    procs = []
+    for i in range(n):
+        proc = multiprocessing.Process(
+            target=_serve, args=(address, str(root), f"local-{i}"), daemon=True
+        )
+        proc.start()
+        procs.append(proc)
+    return procs
+
+
+###############################################################################
+
+# Coordinator
+
+###############################################################################
+
+
+@dataclass
+class _Job:
+    id: int
+    task: BacktestTask
+    attempts: int = 0
+    failed_on: Set[str] = field(default_factory=set)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_Server"
+
+    def handle(self) -> None:
+        coord = self.server.coordinator
+        try:
+            hello = _recv(self.rfile)
+        except (OSError, ValueError):
+            return
+        if hello is None or hello.get("op") != "hello" or not isinstance(hello.get("worker"), str):
+            return
+        worker = coord._join(hello["worker"], hello.get("portals", []))
+        job: Optional[_Job] = None
+        try:
+            while True:
+                job = coord._assign(worker)
+                if job is None:
+                    _send(self.wfile, {"op": "stop"})
+                    return
+                _send(self.wfile, {"op": "task", "id": job.id, "task": asdict(job.task)})
+                self.request.settimeout(coord.task_timeout)
+                message = _recv(self.rfile)
+                self.request.settimeout(None)
+                if message is None:
+                    raise ConnectionError("worker went away")
+                op = message.get("op")
+                row = message.get("row")
+                if message.get("id") != job.id or not (
+                    op == "error" or (op == "result" and isinstance(row, dict))
+                ):
+                    raise ValueError(f"protocol error: unexpected {op!r} message")
+                coord._update_cache(worker, message.get("portals", []))
+                if op == "result":
+                    coord._complete(job, worker, row=row)
+                else:
+                    coord._fail(job, worker, str(message.get("error", "unknown error")))
+                job = None
+        except (OSError, ValueError, TypeError) as exc:
+            if job is not None:
+                coord._fail(job, worker, f"worker {worker} lost: {exc}")
+        finally:
+            coord._leave(worker)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    coordinator: "Coordinator"
+
+
+class Coordinator:
+    """Schedule :class:`BacktestTask` jobs onto connected :class:`Worker` s.
+
+    Parameters
+    ----------
+    host, port:
+        Listening address; port ``0`` picks a free one (see :attr:`address`).
+    retries:
+        Extra attempts per task after an error, disconnect or timeout.
+    task_timeout:
+        Seconds a worker may spend on one task before it is considered lost.
+    worker_grace:
+        Seconds :meth:`results` waits while tasks are outstanding but no
+        worker is connected (so none is running) before giving up.
+
+    Usage::
+
+        with Coordinator(port=7070) as coord:
+            table = coord.run(tasks)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        retries: int = 2,
+        task_timeout: Optional[float] = None,
+        worker_grace: float = 30.0,
+    ) -> None:
+        self.retries = retries
+        self.task_timeout = task_timeout
+        self.worker_grace = worker_grace
+        self._server = _Server((host, port), _Handler)
+        self._server.coordinator = self
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[int, _Job]" = OrderedDict()
+        self._workers: Dict[str, Set[Tuple[str, ...]]] = {}
+        self._idle_since: Optional[float] = time.monotonic()
+        self._results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._next_id = 0
+        self._submitted = 0
+        self._yielded = 0
+        self._closing = False
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="coordinator", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def address(self) -> Address:
+        host, port = self._server.server_address[:2]
+        return host, port
+
+    @property
+    def workers(self) -> List[str]:
+        with self._cond:
+            return list(self._workers)
+
+    def __enter__(self) -> "Coordinator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Tell idle workers to stop and shut the server down."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ------------------------------------------------------------------
+    def submit(self, tasks: Iterable[BacktestTask]) -> List[int]:
+        """Queue *tasks*; returns their ids in submission order."""
+        ids = []
+        with self._cond:
+            for task in tasks:
+                job = _Job(self._next_id, task)
+                self._pending[job.id] = job
+                ids.append(job.id)
+                self._next_id += 1
+            self._submitted += len(ids)
+            self._cond.notify_all()
+        return ids
+
+    def results(self, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Yield result rows as they arrive until every submitted task is done.
+
+        Raises ``TimeoutError`` if no row arrives within *timeout* seconds and
+        ``RuntimeError`` if no worker has been connected for *worker_grace*
+        seconds while tasks are outstanding.
+        """
+        while True:
+            with self._cond:
+                if self._yielded >= self._submitted:
+                    return
+            row = self._next_row(timeout)
+            with self._cond:
+                self._yielded += 1
+            yield row
+
+    def _next_row(self, timeout: Optional[float]) -> Dict[str, Any]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = 0.1 if deadline is None else max(0.0, min(0.1, deadline - time.monotonic()))
+            try:
+                return self._results.get(timeout=wait)
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                raise TimeoutError("No result within timeout")
+            with self._cond:
+                idle = self._idle_since
+            if idle is not None and now - idle >= self.worker_grace and self._results.empty():
+                raise RuntimeError(
+                    f"No worker connected for {self.worker_grace:g}s with tasks outstanding"
+                )
+
+    def run(self, tasks: Iterable[BacktestTask], timeout: Optional[float] = None) -> pd.DataFrame:
+        """Submit *tasks* and collect all rows into a table indexed by task id."""
+        self.submit(tasks)
+        rows = list(self.results(timeout))
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows).set_index("task").sort_index()
+
+    # ------------------------------------------------------------------
+    # Called from connection handlers
+    # ------------------------------------------------------------------
+    def _join(self, name: str, portals: List[List[str]]) -> str:
+        with self._cond:
+            base, n = name, 1
+            while name in self._workers:
+                n += 1
+                name = f"{base}#{n}"
+            self._workers[name] = {tuple(p) for p in portals}
+            self._idle_since = None
+        logger.info("Worker %s joined", name)
+        return name
+
+    def _leave(self, worker: str) -> None:
+        with self._cond:
+            self._workers.pop(worker, None)
+            if not self._workers:
+                self._idle_since = time.monotonic()
+            self._cond.notify_all()
+        logger.info("Worker %s left", worker)
+
+    def _update_cache(self, worker: str, portals: List[List[str]]) -> None:
+        with self._cond:
+            self._workers[worker] = {tuple(p) for p in portals}
+
+    def _score(self, job: _Job, worker: str) -> Tuple[bool, bool, int]:
+        # Avoid workers a task already failed on, then prefer a worker whose
+        # cached portal is exactly the task's, then submission order.
+        cached = self._workers.get(worker, set())
+        return (
+            worker not in job.failed_on,
+            tuple(job.task.symbols) in cached,
+            -job.id,
+        )
+
+    def _assign(self, worker: str) -> Optional[_Job]:
+        """Block until a task is available for *worker*; ``None`` on close."""
+        with self._cond:
+            while not self._closing:
+                if self._pending:
+                    job = max(self._pending.values(), key=lambda j: self._score(j, worker))
+                    del self._pending[job.id]
+                    job.attempts += 1
+                    return job
+                self._cond.wait()
+            return None
+
+    def _row(self, job: _Job, worker: str) -> Dict[str, Any]:
+        task = job.task
+        return {
+            "task": job.id,
+            "strategy": task.strategy,
+            "symbols": ",".join(task.symbols),
+            **task.params,
+            "worker": worker,
+            "attempts": job.attempts,
+        }
+
+    def _complete(self, job: _Job, worker: str, row: Dict[str, Any]) -> None:
+        self._results.put({**self._row(job, worker), **row, "error": None})
+
+    def _fail(self, job: _Job, worker: str, error: str) -> None:
+        logger.warning("Task %d failed on %s (attempt %d): %s", job.id, worker, job.attempts, error)
+        job.failed_on.add(worker)
+        if job.attempts <= self.retries:
+            with self._cond:
+                self._pending[job.id] = job
+                self._pending.move_to_end(job.id, last=False)
+                self._cond.notify_all()
+        else:
+            self._results.put({**self._row(job, worker), "error": error})
+
+
+__all__ = [
+    "BacktestTask",
+    "Coordinator",
+    "Worker",
+    "spawn_workers",
+    "strategy_classes",
+]
@@ -1,32 +1,26 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+import copy
+import itertools
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional
 
+import numpy as np
 import pandas as pd
 
-from .data import DataPortal
+from .costs import CostModel
+from .data import Bar, DataPortal
+from .data.datastore import align_timestamp
+from .orders import LIMIT, MARKET, STOP, STOP_LIMIT, Order, OrderBook
+from .portfolio import BUY, SELL, Portfolio, Trade, TradeLedger
+from .profiling import Profiler
+from .recorder import EquityRecorder
 from .strategy import Strategy
 
-
-@dataclass
-class Portfolio:
-    cash: float
-    positions: Dict[str, int] = field(default_factory=dict)
-
-    def value(self, prices: Dict[str, pd.Series]) -> float:
-        return self.cash + sum(
-            self.positions.get(sym, 0) * prices[sym]["Close"] for sym in prices
-        )
-
-
-@dataclass
-class Trade:
-    timestamp: pd.Timestamp
-    symbol: str
-    quantity: int
-    price: float
-    side: str
+CHECKPOINT_VERSION = 1
 
 
 class Engine:
@@ -38,75 +32,411 @@ class Engine:
         strategy: Strategy,
         *,
         starting_cash: float = 1_000_000.0,
+        profiler: Optional[Profiler] = None,
+        cost_model: Optional[CostModel] = None,
+        check_lookahead: bool = False,
+        recorder: Optional[EquityRecorder] = None,
     ) -> None:
         self.data_portal = data_portal
         self.strategy = strategy
+        self.profiler = profiler
+        self.cost_model = cost_model
+        self.check_lookahead = check_lookahead
         self.portfolio = Portfolio(
             cash=starting_cash,
             positions={sym: 0 for sym in data_portal.symbols},
         )
         self._current_bar: Optional[Dict[str, pd.Series]] = None
         self._current_ts: Optional[pd.Timestamp] = None
-        self.trades: List[Trade] = []
+        self.trades = TradeLedger(self.portfolio.symbols)
+        self.orders = OrderBook()
+        self._volume = np.full(len(self.portfolio.symbols), np.nan)
+        self.recorder = recorder if recorder is not None else EquityRecorder()
+        self._cursor: Optional[pd.Timestamp] = None
+        self._resume = False
 
     # ------------------------------------------------------------------
-    def buy(self, symbol: str, quantity: int) -> None:
+    def _quote(self, symbol: str) -> tuple[int, float]:
         if self._current_bar is None:
             raise RuntimeError("No market data available")
-        price = self._current_bar[symbol]["Close"]
-        cost = price * quantity
-        if cost > self.portfolio.cash:
+        slot = self.portfolio.slot(symbol)
+        price = self.portfolio._price[slot]
+        if np.isnan(price):
+            raise ValueError(f"No price available for {symbol}")
+        return slot, float(price)
+
+    def _fee(self, slot: int, quantity: int, price: float) -> float:
+        if self.cost_model is None:
+            return 0.0
+        return float(self.cost_model.cost(quantity, price, self._volume[slot]))
+
+    def _fill(self, slot: int, quantity: int, price: float, side: int, fee: float) -> None:
+        self.portfolio.apply_fill(slot, quantity * side, price)
+        self.portfolio.cash -= fee
+        self.trades.record(self._current_ts, slot, quantity, price, side, fee)
+
+    def _mark_volume(self, bar: Dict[str, pd.Series]) -> None:
+        """Remember the bar's volume for cost models that need it."""
+        if len(self._volume) != len(self.portfolio.symbols):
+            self._volume = np.resize(self._volume, len(self.portfolio.symbols))
+        if isinstance(bar, Bar):
+            self._volume[bar.slots] = bar.volume
+        else:
+            for sym, row in bar.items():
+                self._volume[self.portfolio.slot(sym)] = row.get("Volume", np.nan)
+
+    def buy(self, symbol: str, quantity: int) -> None:
+        slot, price = self._quote(symbol)
+        fee = self._fee(slot, quantity, price)
+        if price * quantity + fee > self.portfolio.cash:
             raise ValueError("Insufficient cash")
-        self.portfolio.cash -= cost
-        self.portfolio.positions[symbol] += quantity
-        self.trades.append(
-            Trade(
-                timestamp=self._current_ts,
+        self._fill(slot, quantity, price, BUY, fee)
+
+    def sell(self, symbol: str, quantity: int) -> None:
+        slot, price = self._quote(symbol)
+        qty = min(quantity, int(self.portfolio._qty[slot]))
+        if qty:
+            self._fill(slot, qty, price, SELL, self._fee(slot, qty, price))
+
+    def order(
+        self,
+        symbol: str,
+        quantity: int,
+        *,
+        side: str = "buy",
+        limit_price: Optional[float] = None,
+        stop_price: Optional[float] = None,
+    ) -> Order:
+        """Place a pending order, evaluated from the next bar onwards.
+
+        Without prices the order fills at the next bar's Open. A
+        ``limit_price`` makes it a limit order, a ``stop_price`` a stop order
+        and both together a stop-limit order.
+        """
+        self.portfolio.slot(symbol)
+        if stop_price is not None:
+            order_type = STOP_LIMIT if limit_price is not None else STOP
+        else:
+            order_type = LIMIT if limit_price is not None else MARKET
+        return self.orders.add(
+            Order(
                 symbol=symbol,
                 quantity=quantity,
-                price=float(price),
-                side="buy",
+                side=side,
+                order_type=order_type,
+                limit_price=limit_price,
+                stop_price=stop_price,
             )
         )
 
-    def sell(self, symbol: str, quantity: int) -> None:
+    def cancel(self, order: Order) -> None:
+        self.orders.cancel(order)
+
+    def _process_orders(self, bar: Dict[str, pd.Series]) -> None:
+        """Fill the pending orders triggered by *bar*."""
+        pf = self.portfolio
+        for symbol in self.orders.symbols:
+            row = bar.get(symbol)
+            if row is None:
+                continue
+            fills = self.orders.trigger(symbol, row["Open"], row["High"], row["Low"])
+            slot = pf.slot(symbol)
+            for order, price in fills:
+                price = float(price)
+                if order.side == "buy":
+                    qty, side = order.quantity, BUY
+                else:
+                    qty, side = min(order.quantity, int(pf._qty[slot])), SELL
+                fee = self._fee(slot, qty, price) if qty else 0.0
+                if not qty or (side == BUY and price * qty + fee > pf.cash):
+                    order.status = "rejected"
+                    continue
+                self._fill(slot, qty, price, side, fee)
+                order.status = "filled"
+                order.quantity = qty
+                order.fill_price = price
+                order.filled_at = self._current_ts
+
+    def rebalance(
+        self,
+        target_weights: Optional[Mapping[str, float]] = None,
+        *,
+        target_quantities: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        """Trade the named symbols to their targets in one vectorised batch.
+
+        ``target_weights`` are fractions of the current portfolio value;
+        ``target_quantities`` are share counts. Symbols not named are left
+        untouched. All sells execute before the buys, and if the buys cost
+        more than the cash available afterwards they are scaled down pro rata.
+        Transaction costs for each side are evaluated as one array operation.
+        """
+        if (target_weights is None) == (target_quantities is None):
+            raise ValueError("Pass exactly one of target_weights or target_quantities")
         if self._current_bar is None:
             raise RuntimeError("No market data available")
-        price = self._current_bar[symbol]["Close"]
-        owned = self.portfolio.positions.get(symbol, 0)
-        qty = min(quantity, owned)
-        self.portfolio.positions[symbol] = owned - qty
-        self.portfolio.cash += price * qty
-        if qty:
-            self.trades.append(
-                Trade(
-                    timestamp=self._current_ts,
-                    symbol=symbol,
-                    quantity=qty,
-                    price=float(price),
-                    side="sell",
-                )
-            )
+        targets = dict(target_weights if target_weights is not None else target_quantities)
+        if not targets:
+            return
+        pf = self.portfolio
+        n = len(targets)
+        slots = np.fromiter((pf.slot(sym) for sym in targets), dtype=np.intp, count=n)
+        goal = np.fromiter(targets.values(), dtype=np.float64, count=n)
+        prices = pf._price[slots]
+        priced = ~np.isnan(prices)
+        if target_weights is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                goal = np.trunc(pf.value() * goal / prices)
+        owned = pf._qty[slots]
+        diff = np.where(priced, goal, owned).astype(np.int64) - owned
 
+        sell = diff < 0
+        if sell.any():
+            qty = np.minimum(-diff[sell], owned[sell])
+            self._fill_batch(slots[sell], -qty, prices[sell], SELL)
+
+        buy = diff > 0
+        if buy.any():
+            qty, px, vol = diff[buy], prices[buy], self._volume[slots[buy]]
+            # Fixed and non-linear costs do not shrink proportionally, so
+            # rescale until the batch fits the available cash.
+            for _ in range(8):
+                total = float(qty @ px + self._fees(qty, px, vol).sum())
+                if total <= pf.cash:
+                    break
+                qty = np.floor(qty * (pf.cash / total)).astype(np.int64)
+            else:
+                qty = np.zeros_like(qty)
+            self._fill_batch(slots[buy], qty, px, BUY)
+
+    def _fees(self, quantities: np.ndarray, prices: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        if self.cost_model is None:
+            return np.zeros(len(quantities))
+        return np.broadcast_to(self.cost_model.cost(quantities, prices, volume), len(quantities))
+
+    def _fill_batch(
+        self, slots: np.ndarray, quantities: np.ndarray, prices: np.ndarray, side: int
+    ) -> None:
+        """Apply signed *quantities* and record the non-zero fills."""
+        traded = quantities != 0
+        slots, quantities, prices = slots[traded], quantities[traded], prices[traded]
+        fees = self._fees(np.abs(quantities), prices, self._volume[slots])
+        self.portfolio.apply_fills(slots, quantities, prices)
+        self.portfolio.cash -= float(fees.sum())
+        self.trades.record_batch(
+            self._current_ts, slots, np.abs(quantities), prices, np.full(len(slots), side), fees
+        )
+
+    def _register_columns(self) -> Dict[str, Dict[str, Optional[Callable]]]:
+        """Register the strategy's declared indicator and signal columns.
+
+        A declared column replaces a portal indicator of the same name for
+        the run. Returns, per column and symbol, the function it replaced
+        (``None`` if the run added it) for :meth:`_unregister_columns`.
+        """
+        portal = self.data_portal
+        columns = {**self.strategy.indicators(), **self.strategy.signals()}
+        replaced: Dict[str, Dict[str, Optional[Callable]]] = {}
+        for name, func in columns.items():
+            replaced[name] = {sym: portal.get_indicator(name, sym) for sym in portal.symbols}
+            portal.register_indicator(name, func)
+        if columns and self.check_lookahead:
+            try:
+                portal.check_lookahead()
+            except Exception:
+                self._unregister_columns(replaced)
+                raise
+        return replaced
+
+    def _unregister_columns(self, replaced: Dict[str, Dict[str, Optional[Callable]]]) -> None:
+        """Remove the columns a run added and restore the indicators it
+        replaced, so shared portals end up as they were before the run."""
+        for name, previous in replaced.items():
+            for sym, func in previous.items():
+                if func is None:
+                    self.data_portal.unregister_indicator(name, [sym])
+                else:
+                    self.data_portal.register_indicator(name, func, [sym])
+
+    # ------------------------------------------------------------------
+    # Checkpointing
+    # ------------------------------------------------------------------
+    def snapshot(self) -> bytes:
+        """Serialise the run state after the last completed bar.
+
+        Covers the portfolio, trade ledger, pending orders, the strategy
+        (pickled, so strategies may customise it via ``__getstate__``), the
+        equity recorder and the timestamp of the last processed bar.
+        """
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "portfolio": self.portfolio,
+            "trades": self.trades,
+            "orders": self.orders,
+            "strategy": self.strategy,
+            "recorder": self.recorder,
+            "cursor": self._cursor,
+            "volume": self._volume,
+        }
+        return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def restore(self, data: bytes, *, strategy: Optional[Strategy] = None) -> None:
+        """Load a :meth:`snapshot`; the next :meth:`run` continues after it.
+
+        Passing *strategy* replaces the pickled strategy instead of reusing it.
+        """
+        state = pickle.loads(data)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {state.get('version')}")
+        if state["portfolio"].symbols[: len(self.data_portal.symbols)] != list(
+            self.data_portal.symbols
+        ):
+            raise ValueError("Checkpoint symbols do not match the data portal")
+        self.portfolio = state["portfolio"]
+        self.trades = state["trades"]
+        self.orders = state["orders"]
+        self.strategy = strategy if strategy is not None else state["strategy"]
+        self.recorder = state["recorder"]
+        self._cursor = state["cursor"]
+        self._volume = state["volume"]
+        self._resume = True
+
+    def checkpoint(self, path: str | Path) -> Path:
+        """Atomically write :meth:`snapshot` to *path*."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(self.snapshot())
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return path
+
+    @classmethod
+    def resume(
+        cls,
+        path: str | Path,
+        data_portal: DataPortal,
+        *,
+        strategy: Optional[Strategy] = None,
+        **kwargs,
+    ) -> "Engine":
+        """Create an engine from a checkpoint file, ready to :meth:`run` on."""
+        engine = cls(data_portal, strategy, **kwargs)
+        engine.restore(Path(path).read_bytes(), strategy=strategy)
+        return engine
+
+    def fork(self, *, strategy: Optional[Strategy] = None, **params) -> "Engine":
+        """Independent copy of this engine's state to run with other parameters.
+
+        *params* are set as attributes on the copied strategy, so the fork
+        keeps the strategy's accumulated state; alternatively pass a fresh
+        *strategy*. Running the fork only replays the bars after the cursor.
+        """
+        clone = copy.copy(self)
+        clone.restore(self.snapshot(), strategy=strategy)
+        for name, value in params.items():
+            if not hasattr(clone.strategy, name):
+                raise AttributeError(f"{type(clone.strategy).__name__} has no parameter {name!r}")
+            setattr(clone.strategy, name, value)
+        return clone
+
+    # ------------------------------------------------------------------
     def run(
         self,
         *,
         start: Optional[pd.Timestamp] = None,
         end: Optional[pd.Timestamp] = None,
+        events: bool = False,
+        checkpoint_path: Optional[str | Path] = None,
+        checkpoint_every: int = 10_000,
     ) -> pd.DataFrame:
-        history: List[Dict[str, float]] = []
-        for ts, bar in self.data_portal.iter_bars(start=start, end=end):
-            self._current_bar = bar
-            self._current_ts = ts
-            self.strategy.on_bar(self, ts, bar)
-            history.append(
-                {
-                    "timestamp": ts,
-                    "value": self.portfolio.value(bar),
-                    "cash": self.portfolio.cash,
-                }
-            )
+        """Replay the portal through the strategy and return the equity curve.
+
+        With ``events=True`` bars come from :meth:`DataPortal.iter_events`:
+        every timestamp of any symbol is a step, and ``on_bar`` receives only
+        the symbols that updated at it.
+
+        Columns declared by the strategy (:meth:`Strategy.indicators` and
+        :meth:`Strategy.signals`) are registered on the portal for the
+        duration of the run and removed again afterwards; portal indicators
+        they shadow by name are restored. With
+        ``check_lookahead=True`` the portal's indicators are also verified
+        against truncated data, and :class:`~src.data.LookaheadError` is
+        raised if any of them peeks at later bars. The check recomputes every
+        indicator several times, so it is off by default; enable it while
+        developing a strategy rather than in sweeps.
+
+        The equity curve is sampled by :attr:`recorder` (every bar by
+        default; see :class:`~src.recorder.EquityRecorder`).
+
+        With *checkpoint_path* the state is written there every
+        *checkpoint_every* bars. After :meth:`restore` / :meth:`resume` /
+        :meth:`fork` the run continues after the restored cursor and the
+        returned curve includes the restored history.
+        """
+        rec = self.recorder
+        cursor = None
+        if self._resume:
+            self._resume = False
+            cursor = self._cursor
+            if cursor is not None:
+                if start is None or align_timestamp(start, self.data_portal.index) < cursor:
+                    start = cursor
+        else:
+            rec.reset(self.portfolio.symbols)
+        columns = self._register_columns()
+        if events:
+            bars = self.data_portal.iter_events(start=start, end=end)
+        else:
+            bars = self.data_portal.iter_bars(start=start, end=end)
+        if cursor is not None:
+            # Drop already-processed bars before the profiler counts them.
+            bars = itertools.dropwhile(lambda item: item[0] <= cursor, bars)
+        on_bar = self.strategy.on_bar
+        mark = self.portfolio.mark
+        observe = rec.observe
+        trades = self.trades
+        process_orders = self._process_orders
+        prof = self.profiler
+        if prof is not None:
+            bars = prof.wrap_iter("bars", bars)
+            on_bar = prof.wrap("strategy", on_bar, histogram=True)
+            mark = prof.wrap("valuation", mark)
+            process_orders = prof.wrap("orders", process_orders)
+            # Instance attributes shadow the methods so strategies calling
+            # ``engine.buy`` go through the timed wrappers.
+            self.buy = prof.wrap("orders", self.buy)
+            self.sell = prof.wrap("orders", self.sell)
+            self.rebalance = prof.wrap("orders", self.rebalance)
+            self.order = prof.wrap("orders", self.order)
+            prof.start()
+        try:
+            for ts, bar in bars:
+                self._current_bar = bar
+                self._current_ts = ts
+                mark(bar)
+                if self.cost_model is not None:
+                    self._mark_volume(bar)
+                if self.orders:
+                    process_orders(bar)
+                on_bar(self, ts, bar)
+                observe(ts, self.portfolio, len(trades))
+                self._cursor = ts
+                if checkpoint_path is not None and rec.bars % checkpoint_every == 0:
+                    self.checkpoint(checkpoint_path)
+        finally:
+            if prof is not None:
+                prof.stop()
+                del self.buy, self.sell, self.rebalance, self.order
+            self._unregister_columns(columns)
         self._current_bar = None
         self._current_ts = None
-        df = pd.DataFrame(history).set_index("timestamp")
+        rec.finish()
+        df = rec.to_frame()
+        if prof is not None:
+            df.attrs["profile"] = prof.report()
         return df
@@ -0,0 +1,251 @@
+"""Cross-sectional factor research: information coefficients, quantile
+returns, turnover and decay.
+
+Factors are (time × symbol) frames, e.g. from :func:`alpha_panel` or
+:func:`~src.alphas.alpha101.compute_alphas`. Forward returns for every horizon
+are stacked into one ``(horizons, bars, symbols)`` array, and blocks of
+factors are evaluated against all horizons and dates in single NumPy
+passes. No backtest is run.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .alphas.alpha101 import compute_alpha
+
+# Upper bound on elements per (factors, horizons, bars, symbols) block.
+_BLOCK_ELEMENTS = 1 << 24
+
+
+@dataclass
+class FactorReport:
+    name: str
+    ic: pd.DataFrame
+    summary: pd.DataFrame
+    quantile_returns: pd.DataFrame
+    spread: pd.Series
+    turnover: float
+    autocorrelation: pd.Series
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+def forward_returns(prices: pd.DataFrame, horizons: Iterable[int]) -> Dict[int, pd.DataFrame]:
+    """Simple return from each bar's price to the price *h* bars later."""
+    return {h: prices.shift(-h) / prices - 1 for h in horizons}
+
+
+def alpha_panel(
+    frames: Mapping[str, pd.DataFrame], names: Iterable[str]
+) -> Dict[str, pd.DataFrame]:
+    """Evaluate single-symbol ``ALPHAS`` per symbol into (time × symbol) frames."""
+    return {
+        name: pd.concat({sym: compute_alpha(df, name) for sym, df in frames.items()}, axis=1)
+        for name in names
+    }
+
+
+def _fingerprint(frame: pd.DataFrame) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(frame.to_numpy(dtype=float)).tobytes())
+    digest.update(repr((list(frame.columns), frame.index[:1].tolist(), frame.index[-1:].tolist())).encode())
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Kernels over (..., symbols) arrays
+# ---------------------------------------------------------------------------
+def _row_rank(x: np.ndarray, pct: bool = False) -> np.ndarray:
+    """Average-tie ranks along the last axis, NaN kept as NaN."""
+    flat = x.reshape(-1, x.shape[-1])
+    ranked = pd.DataFrame(flat).rank(axis=1, pct=pct).to_numpy()
+    return ranked.reshape(x.shape)
+
+
+def _row_mean(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    valid = ~np.isnan(x)
+    count = valid.sum(axis=-1)
+    total = np.where(valid, x, 0.0).sum(axis=-1)
+    return total / np.where(count == 0, np.nan, count), count
+
+
+def _rank_correlation(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Spearman correlation along the last axis over jointly valid entries."""
+    joint = np.isnan(x) | np.isnan(y)
+    rx = _row_rank(np.where(joint, np.nan, x))
+    ry = _row_rank(np.where(joint, np.nan, y))
+    rx = rx - _row_mean(rx)[0][..., None]
+    ry = ry - _row_mean(ry)[0][..., None]
+    num = np.nansum(rx * ry, axis=-1)
+    den = np.sqrt(np.nansum(rx * rx, axis=-1) * np.nansum(ry * ry, axis=-1))
+    n = (~joint).sum(axis=-1)
+    return np.where((n >= 3) & (den > 0), num / np.where(den == 0, 1.0, den), np.nan)
+
+
+def _time_stats(ic: np.ndarray) -> Dict[str, np.ndarray]:
+    """Mean, std, IR, t-stat and hit rate of IC series along the last axis."""
+    mean, n = _row_mean(ic)
+    dev = np.where(np.isnan(ic), 0.0, ic - mean[..., None])
+    std = np.sqrt((dev * dev).sum(axis=-1) / np.where(n > 1, n - 1, np.nan))
+    ir = mean / np.where(std == 0, np.nan, std)
+    hits = np.where(np.isnan(ic), 0.0, ic > 0).sum(axis=-1)
+    return {
+        "ic_mean": mean,
+        "ic_std": std,
+        "ir": ir,
+        "t_stat": ir * np.sqrt(n),
+        "hit_rate": hits / np.where(n == 0, np.nan, n),
+        "n": n.astype(float),
+    }
+
+
+###############################################################################
+
+# FactorAnalyzer
+
+###############################################################################
+
+
+class FactorAnalyzer:
+    """Evaluate many factors against one universe's forward returns.
+
+    Parameters
+    ----------
+    prices:
+        (time × symbol) prices used for forward returns.
+    horizons:
+        Forward-return horizons in bars.
+    quantiles:
+        Number of factor buckets per date for quantile returns and turnover.
+    lags:
+        Lags for the factor rank autocorrelation (default: *horizons*).
+
+    Reports are cached per factor name together with a fingerprint of its
+    values, so re-running with an extended factor set only evaluates the new
+    or changed factors.
+    """
+
+    def __init__(
+        self,
+        prices: pd.DataFrame,
+        *,
+        horizons: Sequence[int] = (1, 5, 10),
+        quantiles: int = 5,
+        lags: Optional[Sequence[int]] = None,
+    ) -> None:
+        if quantiles < 2:
+            raise ValueError("quantiles must be >= 2")
+        self.prices = prices.sort_index()
+        self.horizons = list(horizons)
+        self.quantiles = quantiles
+        self.lags = list(lags if lags is not None else horizons)
+        fwd = forward_returns(self.prices, self.horizons)
+        self._returns = np.stack([fwd[h].to_numpy(dtype=float) for h in self.horizons])
+        self._cache: Dict[str, Tuple[str, FactorReport]] = {}
+
+    @classmethod
+    def from_frames(
+        cls, frames: Mapping[str, pd.DataFrame], *, field: str = "Close", **kwargs
+    ) -> "FactorAnalyzer":
+        """Use *field* of per-symbol frames (e.g. ``DataStore.load``) as prices."""
+        prices = pd.concat({sym: df[field] for sym, df in frames.items()}, axis=1)
+        return cls(prices, **kwargs)
+
+    @classmethod
+    def from_store(cls, store, symbols: Iterable[str], **kwargs) -> "FactorAnalyzer":
+        return cls.from_frames({sym: store.load(sym) for sym in symbols}, **kwargs)
+
+    # ------------------------------------------------------------------
+    def _align(self, factor: pd.DataFrame) -> np.ndarray:
+        aligned = factor.reindex(index=self.prices.index, columns=self.prices.columns)
+        return aligned.to_numpy(dtype=float)
+
+    def analyze(self, factors: Mapping[str, pd.DataFrame]) -> Dict[str, FactorReport]:
+        """Reports for *factors*, computing only uncached or changed ones."""
+        stale: List[Tuple[str, str]] = []
+        for name, frame in factors.items():
+            key = _fingerprint(frame)
+            cached = self._cache.get(name)
+            if cached is None or cached[0] != key:
+                stale.append((name, key))
+        h, t, n = self._returns.shape
+        block = max(1, _BLOCK_ELEMENTS // max(1, h * t * n))
+        for start in range(0, len(stale), block):
+            batch = stale[start:start + block]
+            values = np.stack([self._align(factors[name]) for name, _ in batch])
+            for (name, key), report in zip(batch, self._evaluate([nm for nm, _ in batch], values)):
+                self._cache[name] = (key, report)
+        return {name: self._cache[name][1] for name in factors}
+
+    def summary(self, factors: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+        """IC statistics for every factor and horizon, plus the quantile spread."""
+        rows = []
+        for name, report in self.analyze(factors).items():
+            frame = report.summary.copy()
+            frame["spread"] = report.spread
+            frame["turnover"] = report.turnover
+            frame.index = pd.MultiIndex.from_product([[name], frame.index], names=["factor", "horizon"])
+            rows.append(frame)
+        return pd.concat(rows) if rows else pd.DataFrame()
+
+    # ------------------------------------------------------------------
+    def _evaluate(self, names: List[str], values: np.ndarray) -> List[FactorReport]:
+        """Reports for a ``(factors, bars, symbols)`` block."""
+        returns = self._returns
+        with np.errstate(all="ignore"):
+            # Rank IC: (factors, horizons, bars).
+            ic = _rank_correlation(values[:, None], returns[None])
+            stats = _time_stats(ic)
+
+            # Quantile buckets per date: 1 = lowest factor values.
+            pct = _row_rank(values, pct=True)
+            buckets = np.clip(np.ceil(pct * self.quantiles), 1, self.quantiles)
+            buckets[np.isnan(pct)] = 0
+            valid_r = ~np.isnan(returns)
+            r0 = np.where(valid_r, returns, 0.0)
+            qret = np.empty((len(names), len(self.horizons), self.quantiles))
+            for q in range(1, self.quantiles + 1):
+                member = (buckets == q)[:, None]
+                total = (member * r0[None]).sum(axis=-1)
+                count = (member & valid_r[None]).sum(axis=-1)
+                per_date = total / np.where(count == 0, np.nan, count)
+                qret[..., q - 1] = _row_mean(per_date)[0]
+
+            # Turnover of the top bucket between consecutive dates.
+            top = buckets == self.quantiles
+            size = top[:, 1:].sum(axis=-1)
+            stay = (top[:, 1:] & top[:, :-1]).sum(axis=-1)
+            turnover = _row_mean(np.where(size > 0, 1 - stay / np.where(size == 0, 1, size), np.nan))[0]
+
+            # Rank autocorrelation of the factor itself.
+            auto = np.full((len(names), len(self.lags)), np.nan)
+            for j, lag in enumerate(self.lags):
+                if 0 < lag < values.shape[1]:
+                    auto[:, j] = _row_mean(_rank_correlation(values[:, lag:], values[:, :-lag]))[0]
+
+        index = self.prices.index
+        horizons = pd.Index(self.horizons, name="horizon")
+        quantile_index = pd.Index(range(1, self.quantiles + 1), name="quantile")
+        reports = []
+        for i, name in enumerate(names):
+            summary = pd.DataFrame({k: v[i] for k, v in stats.items()}, index=horizons)
+            quantile_returns = pd.DataFrame(qret[i].T, index=quantile_index, columns=horizons)
+            reports.append(FactorReport(
+                name=name,
+                ic=pd.DataFrame(ic[i].T, index=index, columns=horizons),
+                summary=summary,
+                quantile_returns=quantile_returns,
+                spread=quantile_returns.iloc[-1] - quantile_returns.iloc[0],
+                turnover=float(turnover[i]),
+                autocorrelation=pd.Series(auto[i], index=pd.Index(self.lags, name="lag")),
+            ))
+        return reports
+
+
+__all__ = ["FactorAnalyzer", "FactorReport", "alpha_panel", "forward_returns"]
@@ -1,5 +1,22 @@
 """Common indicator functions."""
 
-from .technicals import volume, sma, ema, macd, kdj, atr
+from .technicals import volume, sma, ema, macd, kdj, atr, rsi, cti, ewo, bollinger
+from .incremental import IncrementalIndicator, SMA, EMA, ATR, KDJ
 
-__all__ = ["volume", "sma", "ema", "macd", "kdj", "atr"]
\ No newline at end of file
+__all__ = [
+    "volume",
+    "sma",
+    "ema",
+    "macd",
+    "kdj",
+    "atr",
+    "rsi",
+    "cti",
+    "ewo",
+    "bollinger",
+    "IncrementalIndicator",
+    "SMA",
+    "EMA",
+    "ATR",
+    "KDJ",
+]
\ No newline at end of file
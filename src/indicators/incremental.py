@@ -0,0 +1,139 @@
+"""O(1)-per-bar versions of the indicators in :mod:`.technicals`.
+
+Each indicator keeps only the state it needs (a bounded window or a single
+smoothed value) and is fed one bar row at a time, which makes them suitable
+for streaming use in :class:`~src.live.LiveEngine`. Outputs match the
+vectorised functions on gap-free data.
+"""
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, Mapping, Union
+
+Value = Union[float, Dict[str, float]]
+
+
+class IncrementalIndicator(ABC):
+    """Indicator updated with one bar row at a time."""
+
+    @abstractmethod
+    def update(self, row: Mapping[str, float]) -> Value:
+        """Consume *row* and return the current value (NaN until warm).
+
+        Multi-output indicators return a dict of column name → value.
+        """
+        raise NotImplementedError
+
+
+class _RollingMean:
+    """Mean of the last *window* values with a compensated running sum.
+
+    Adding and later subtracting every value from a plain float sum leaves
+    rounding residue that accumulates over a long stream; Neumaier's
+    compensation keeps the lost low-order bits in ``_comp``.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self._values: deque = deque(maxlen=window)
+        self._sum = 0.0
+        self._comp = 0.0
+
+    def _add(self, x: float) -> None:
+        total = self._sum + x
+        if abs(self._sum) >= abs(x):
+            self._comp += (self._sum - total) + x
+        else:
+            self._comp += (x - total) + self._sum
+        self._sum = total
+
+    def push(self, value: float) -> float:
+        if len(self._values) == self.window:
+            self._add(-self._values[0])
+        self._values.append(value)
+        self._add(value)
+        if len(self._values) < self.window:
+            return math.nan
+        return (self._sum + self._comp) / self.window
+
+
+class _Smoother:
+    """``ewm(alpha, adjust=False)`` seeded with the first non-NaN value."""
+
+    def __init__(self, alpha: float) -> None:
+        self.alpha = alpha
+        self.value = math.nan
+
+    def push(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class SMA(IncrementalIndicator):
+    """Simple moving average of *field*."""
+
+    def __init__(self, window: int = 10, field: str = "Close") -> None:
+        self.field = field
+        self._mean = _RollingMean(window)
+
+    def update(self, row: Mapping[str, float]) -> float:
+        return self._mean.push(float(row[self.field]))
+
+
+class EMA(IncrementalIndicator):
+    """Exponential moving average of *field* (``span=window, adjust=False``)."""
+
+    def __init__(self, window: int = 10, field: str = "Close") -> None:
+        self.field = field
+        self._ema = _Smoother(2.0 / (window + 1))
+
+    def update(self, row: Mapping[str, float]) -> float:
+        return self._ema.push(float(row[self.field]))
+
+
+class ATR(IncrementalIndicator):
+    """Average True Range over *window* bars."""
+
+    def __init__(self, window: int = 9) -> None:
+        self._mean = _RollingMean(window)
+        self._prev_close = math.nan
+
+    def update(self, row: Mapping[str, float]) -> float:
+        high, low, close = float(row["High"]), float(row["Low"]), float(row["Close"])
+        tr = high - low
+        if not math.isnan(self._prev_close):
+            tr = max(tr, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+        return self._mean.push(tr)
+
+
+class KDJ(IncrementalIndicator):
+    """KDJ oscillator returning ``{"K", "D", "J"}``."""
+
+    def __init__(self, n: int = 9, k_period: int = 3, d_period: int = 3) -> None:
+        self._highs: deque = deque(maxlen=n)
+        self._lows: deque = deque(maxlen=n)
+        self._k = _Smoother(1.0 / k_period)
+        self._d = _Smoother(1.0 / d_period)
+
+    def update(self, row: Mapping[str, float]) -> Dict[str, float]:
+        self._highs.append(float(row["High"]))
+        self._lows.append(float(row["Low"]))
+        rsv = math.nan
+        if len(self._highs) == self._highs.maxlen:
+            low, high = min(self._lows), max(self._highs)
+            if high > low:
+                rsv = (float(row["Close"]) - low) / (high - low) * 100
+        k = self._k.push(rsv)
+        d = self._d.push(k)
+        return {"K": k, "D": d, "J": 3 * k - 2 * d}
+
+
+__all__ = ["IncrementalIndicator", "SMA", "EMA", "ATR", "KDJ"]
@@ -60,4 +60,43 @@ def atr(df: pd.DataFrame, window: int = 9) -> pd.Series:
     return tr.rolling(window).mean()
 
 
-__all__ = ["volume", "sma", "ema", "macd", "kdj", "atr"]
+def rsi(df: pd.DataFrame, window: int = 14) -> pd.Series:
+    """Relative Strength Index from simple averages of gains and losses.
+
+    100 where the window has no losses; NaN until *window* changes exist.
+    """
+    delta = df["Close"].diff()
+    avg_gain = delta.clip(lower=0).rolling(window).mean()
+    avg_loss = (-delta).clip(lower=0).rolling(window).mean()
+    out = 100 - 100 / (1 + avg_gain / avg_loss)
+    return out.mask(avg_loss == 0, 100.0)
+
+
+def cti(df: pd.DataFrame, length: int = 20) -> pd.Series:
+    """Close change over the last *length* bars relative to the first of them
+    (the simplified trend measure of the freqtrade ports); 0 during warmup."""
+    close = df["Close"]
+    base = close.shift(length - 1)
+    out = (close - base) / base.where(base != 0)
+    out.iloc[:length] = 0.0
+    return out.fillna(0.0)
+
+
+def ewo(df: pd.DataFrame, fast: int = 50, slow: int = 200) -> pd.Series:
+    """Elliott Wave Oscillator: EMA spread in percent of Low; 0 until *slow*
+    bars are available."""
+    close = df["Close"]
+    spread = close.ewm(span=fast, adjust=False).mean() - close.ewm(span=slow, adjust=False).mean()
+    out = spread / df["Low"] * 100
+    out.iloc[: slow - 1] = 0.0
+    return out
+
+
+def bollinger(df: pd.DataFrame, window: int = 20, stds: float = 2.0) -> pd.DataFrame:
+    """Bollinger bands with columns BB_lower, BB_mid, BB_upper."""
+    mid = df["Close"].rolling(window).mean()
+    std = df["Close"].rolling(window).std()
+    return pd.DataFrame({"BB_lower": mid - stds * std, "BB_mid": mid, "BB_upper": mid + stds * std})
+
+
+__all__ = ["volume", "sma", "ema", "macd", "kdj", "atr", "rsi", "cti", "ewo", "bollinger"]
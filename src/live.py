@@ -0,0 +1,302 @@
+"""Streaming (live / paper-trading) execution of :class:`Strategy` objects.
+
+:class:`LiveEngine` consumes ``(timestamp, bar)`` pairs from an async
+:class:`BarSource` and drives the unchanged ``Strategy.on_bar`` API. Each
+bar is handled in O(symbols): incremental indicators are updated in place,
+the portfolio is marked, and orders are routed to a broker. The default
+:class:`PaperBroker` simulates fills like the backtest :class:`Engine`.
+Memory is bounded: indicators keep fixed-size state and the equity history
+is a ring buffer.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import (
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+
+from .costs import CostModel
+from .data import Bar, DataPortal
+from .engine import Engine
+from .indicators.incremental import IncrementalIndicator
+from .profiling import LatencyHistogram
+from .strategy import Strategy
+
+BarEvent = Tuple[pd.Timestamp, Mapping[str, pd.Series]]
+
+
+###############################################################################
+
+# Bar sources
+
+###############################################################################
+
+
+class BarSource(ABC):
+    """Async stream of ``(timestamp, {symbol: row})`` bars for ``symbols``."""
+
+    symbols: List[str]
+
+    @abstractmethod
+    def __aiter__(self) -> AsyncIterator[BarEvent]:
+        raise NotImplementedError
+
+
+class ReplayBarSource(BarSource):
+    """Replay a :class:`DataPortal` as a feed, optionally paced by *delay*
+    seconds between bars. Useful for testing strategies in live mode."""
+
+    def __init__(
+        self,
+        portal: DataPortal,
+        *,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        delay: float = 0.0,
+    ) -> None:
+        self.portal = portal
+        self.symbols = list(portal.symbols)
+        self.start = start
+        self.end = end
+        self.delay = delay
+
+    async def __aiter__(self) -> AsyncIterator[BarEvent]:
+        for ts, bar in self.portal.iter_bars(start=self.start, end=self.end):
+            yield ts, bar
+            await asyncio.sleep(self.delay)
+
+
+class QueueBarSource(BarSource):
+    """Feed pushed from elsewhere (e.g. a websocket callback) via :meth:`put`.
+
+    :meth:`close` ends the stream once the queued bars have been consumed.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, symbols: List[str], *, maxsize: int = 0) -> None:
+        self.symbols = list(symbols)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    async def put(self, timestamp: pd.Timestamp, bar: Mapping[str, pd.Series]) -> None:
+        await self.queue.put((pd.Timestamp(timestamp), bar))
+
+    async def close(self) -> None:
+        await self.queue.put(self._CLOSED)
+
+    async def __aiter__(self) -> AsyncIterator[BarEvent]:
+        while True:
+            item = await self.queue.get()
+            if item is self._CLOSED:
+                return
+            yield item
+
+
+###############################################################################
+
+# Brokers
+
+###############################################################################
+
+
+class PaperBroker:
+    """Simulated broker filling at the engine's current prices.
+
+    Fills are applied exactly as in a backtest; *on_fill* is called with
+    each resulting :class:`~src.portfolio.Trade`. A real broker adapter
+    implements the same two methods and submits the orders instead.
+    """
+
+    def __init__(self, *, on_fill: Optional[Callable[[object], None]] = None) -> None:
+        self.on_fill = on_fill
+
+    def fill(
+        self, engine: Engine, slot: int, quantity: int, price: float, side: int, fee: float
+    ) -> None:
+        Engine._fill(engine, slot, quantity, price, side, fee)
+        if self.on_fill is not None:
+            self.on_fill(engine.trades[-1])
+
+    def fill_batch(
+        self, engine: Engine, slots: np.ndarray, quantities: np.ndarray, prices: np.ndarray, side: int
+    ) -> None:
+        before = len(engine.trades)
+        Engine._fill_batch(engine, slots, quantities, prices, side)
+        if self.on_fill is not None:
+            for i in range(before, len(engine.trades)):
+                self.on_fill(engine.trades[i])
+
+
+###############################################################################
+
+# LiveEngine
+
+###############################################################################
+
+
+class _NoPortal:
+    """``data_portal`` of a :class:`LiveEngine`: live bars have no stored
+    history, so only ``symbols`` is available and anything else raises."""
+
+    def __init__(self, symbols: List[str]) -> None:
+        self.symbols = list(symbols)
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):  # keep copy/pickle protocol lookups working
+            raise AttributeError(name)
+        raise TypeError(f"LiveEngine has no DataPortal (accessed {name!r})")
+
+
+class LiveEngine(Engine):
+    """Run a strategy bar by bar against a streaming :class:`BarSource`.
+
+    ``buy`` / ``sell`` / ``order`` / ``rebalance`` behave as in
+    :class:`Engine` but executions go through :attr:`broker`. Only the last
+    *history_size* equity points are kept. Per-bar processing latency is
+    collected in :attr:`latency`.
+
+    There is no :class:`DataPortal`: portal features such as declared
+    strategy columns and the lookahead check are not available, and
+    :meth:`run` raises ``TypeError`` for strategies that declare columns.
+    """
+
+    def __init__(
+        self,
+        source: BarSource,
+        strategy: Strategy,
+        *,
+        starting_cash: float = 1_000_000.0,
+        cost_model: Optional[CostModel] = None,
+        broker: Optional[PaperBroker] = None,
+        history_size: int = 10_000,
+    ) -> None:
+        super().__init__(
+            _NoPortal(source.symbols), strategy, starting_cash=starting_cash, cost_model=cost_model
+        )
+        self.source = source
+        self.broker = broker or PaperBroker()
+        self.history: Deque[Tuple[pd.Timestamp, float, float]] = deque(maxlen=history_size)
+        self.latency = LatencyHistogram()
+        self.bars = 0
+        self._indicators: Dict[str, Dict[str, IncrementalIndicator]] = {}
+
+    # ------------------------------------------------------------------
+    def register_indicator(
+        self,
+        name: str,
+        factory: Callable[[], IncrementalIndicator],
+        symbols: Optional[List[str]] = None,
+    ) -> None:
+        """Attach a fresh ``factory()`` indicator to each symbol.
+
+        Its value is added to every row as column *name* (multi-output
+        indicators add their own column names).
+        """
+        for sym in symbols or self.source.symbols:
+            self._indicators.setdefault(sym, {})[name] = factory()
+
+    def _update_indicators(self, bar: Mapping[str, pd.Series]) -> Mapping[str, pd.Series]:
+        """Return *bar* with indicator columns added to copies of its rows;
+        the rows handed in by the source are left untouched."""
+        if isinstance(bar, Bar):
+            out = Bar(bar)
+            out.slots, out.close, out.volume = bar.slots, bar.close, bar.volume
+        else:
+            out = dict(bar)
+        for sym, row in bar.items():
+            indicators = self._indicators.get(sym)
+            if not indicators:
+                continue
+            row = out[sym] = row.copy()
+            for name, indicator in indicators.items():
+                value = indicator.update(row)
+                if isinstance(value, dict):
+                    for col, v in value.items():
+                        row[col] = v
+                else:
+                    row[name] = value
+        return out
+
+    def _register_columns(self) -> Dict[str, Dict[str, Optional[Callable]]]:
+        """Reject strategies that declare precomputed columns.
+
+        Live bars do not come from a :class:`DataPortal`, so vectorised
+        :meth:`Strategy.indicators` / :meth:`Strategy.signals` cannot be
+        applied (nor checked for lookahead); use :meth:`register_indicator`
+        with an incremental indicator instead.
+        """
+        columns = {**self.strategy.indicators(), **self.strategy.signals()}
+        if columns:
+            raise TypeError(
+                f"{type(self.strategy).__name__} declares columns {sorted(columns)}; "
+                "LiveEngine needs incremental indicators via register_indicator()"
+            )
+        return {}
+
+    def _unregister_columns(self, replaced: Dict[str, Dict[str, Optional[Callable]]]) -> None:
+        pass
+
+    # ------------------------------------------------------------------
+    def _fill(self, slot: int, quantity: int, price: float, side: int, fee: float) -> None:
+        self.broker.fill(self, slot, quantity, price, side, fee)
+
+    def _fill_batch(
+        self, slots: np.ndarray, quantities: np.ndarray, prices: np.ndarray, side: int
+    ) -> None:
+        self.broker.fill_batch(self, slots, quantities, prices, side)
+
+    # ------------------------------------------------------------------
+    def step(self, timestamp: pd.Timestamp, bar: Mapping[str, pd.Series]) -> None:
+        """Process a single bar synchronously."""
+        started = time.perf_counter()
+        self._current_bar = bar
+        self._current_ts = timestamp
+        if self._indicators:
+            bar = self._update_indicators(bar)
+        self.portfolio.mark(bar)
+        if self.cost_model is not None:
+            self._mark_volume(bar)
+        if self.orders:
+            self._process_orders(bar)
+        self.strategy.on_bar(self, timestamp, bar)
+        self.history.append((timestamp, self.portfolio.value(), self.portfolio.cash))
+        self.bars += 1
+        self.latency.add(time.perf_counter() - started)
+
+    async def run(self, *, max_bars: Optional[int] = None) -> pd.DataFrame:  # type: ignore[override]
+        """Consume the source until it ends (or *max_bars* bars)."""
+        self._register_columns()
+        async for ts, bar in self.source:
+            self.step(ts, bar)
+            if max_bars is not None and self.bars >= max_bars:
+                break
+        return self.results()
+
+    def results(self) -> pd.DataFrame:
+        """The retained equity history in the same layout as ``Engine.run``."""
+        df = pd.DataFrame(list(self.history), columns=["timestamp", "value", "cash"])
+        df = df.set_index("timestamp")
+        df.index = pd.DatetimeIndex(df.index).as_unit("ns")
+        return df
+
+
+__all__ = [
+    "BarSource",
+    "ReplayBarSource",
+    "QueueBarSource",
+    "PaperBroker",
+    "LiveEngine",
+]
@@ -0,0 +1,452 @@
+"""Adaptive parameter search over backtests.
+
+Instead of running every candidate over the full date range, candidates are
+first scored on a short prefix of it and only the best ``1/eta`` of each rung
+are promoted to an ``eta`` times longer prefix (successive halving).
+:meth:`Optimizer.hyperband` runs several halving brackets that trade the
+number of candidates against the length of their first evaluation.
+
+Candidates are drawn at random or, with ``sampler="tpe"``, from a
+tree-structured Parzen estimator fitted to the scores seen so far (as in
+BOHB). Evaluations of one rung run in parallel on a thread or process pool.
+"""
+from __future__ import annotations
+
+import contextlib
+import itertools
+import math
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .analysis import Report, analyze, performance
+from .data import DataPortal, DataStore
+from .data.datastore import align_timestamp
+from .engine import Engine
+from .strategy import make_strategy
+
+Params = Dict[str, Any]
+Objective = Callable[[Params, float], float]
+
+
+@dataclass(frozen=True)
+class Range:
+    """Continuous parameter range ``[low, high]``, optionally log-scaled or
+    rounded to integers."""
+
+    low: float
+    high: float
+    log: bool = False
+    integer: bool = False
+
+    def __post_init__(self) -> None:
+        if not self.low < self.high:
+            raise ValueError("Range needs low < high")
+        if self.log and self.low <= 0:
+            raise ValueError("A log Range needs low > 0")
+
+    def _bounds(self) -> Tuple[float, float]:
+        if self.log:
+            return math.log(self.low), math.log(self.high)
+        return self.low, self.high
+
+    def to_unit(self, value: float) -> float:
+        lo, hi = self._bounds()
+        return ((math.log(value) if self.log else value) - lo) / (hi - lo)
+
+    def from_unit(self, u: float) -> Union[int, float]:
+        lo, hi = self._bounds()
+        value = lo + float(np.clip(u, 0.0, 1.0)) * (hi - lo)
+        if self.log:
+            value = math.exp(value)
+        return int(round(value)) if self.integer else value
+
+
+Space = Mapping[str, Union[Sequence[Any], Range]]
+
+
+def grid(space: Space) -> List[Params]:
+    """Every combination of a space of discrete choices."""
+    for name, dim in space.items():
+        if isinstance(dim, Range):
+            raise ValueError(f"Parameter {name!r} is a Range; a grid needs discrete choices")
+    names = list(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def _key(params: Params) -> Tuple[Tuple[str, Any], ...]:
+    return tuple((name, params[name]) for name in sorted(params))
+
+
+# ---------------------------------------------------------------------------
+# Samplers
+# ---------------------------------------------------------------------------
+def _sample_random(space: Space, rng: np.random.Generator) -> Params:
+    params = {}
+    for name, dim in space.items():
+        if isinstance(dim, Range):
+            params[name] = dim.from_unit(rng.random())
+        else:
+            choices = list(dim)
+            params[name] = choices[int(rng.integers(len(choices)))]
+    return params
+
+
+def _bandwidth(points: np.ndarray) -> float:
+    if len(points) < 2:
+        return 0.25
+    return float(np.clip(np.std(points) * len(points) ** -0.2, 0.05, 0.5))
+
+
+def _parzen(u: np.ndarray, centers: np.ndarray, bandwidth: float) -> np.ndarray:
+    """Gaussian kernel density on [0, 1] mixed with a uniform prior."""
+    if not len(centers):
+        return np.ones_like(u)
+    z = (u[:, None] - centers[None, :]) / bandwidth
+    kde = np.exp(-0.5 * z * z).sum(axis=1) / (bandwidth * math.sqrt(2 * math.pi))
+    return (kde + 1.0) / (len(centers) + 1)
+
+
+def _sample_tpe(
+    space: Space,
+    observed: Sequence[Tuple[Params, float]],
+    rng: np.random.Generator,
+    *,
+    gamma: float = 0.25,
+    candidates: int = 24,
+) -> Params:
+    """Draw *candidates* from the density of the best *gamma* fraction and
+    return the one maximising ``l(x) / g(x)``."""
+    scores = np.array([score for _, score in observed])
+    order = np.argsort(-scores, kind="stable")
+    n_good = max(1, int(math.ceil(gamma * len(observed))))
+    good = [observed[i][0] for i in order[:n_good]]
+    bad = [observed[i][0] for i in order[n_good:]]
+
+    draws: Dict[str, List[Any]] = {}
+    log_ratio = np.zeros(candidates)
+    for name, dim in space.items():
+        if isinstance(dim, Range):
+            g = np.array([dim.to_unit(p[name]) for p in good])
+            b = np.array([dim.to_unit(p[name]) for p in bad])
+            bw = _bandwidth(g)
+            u = np.clip(g[rng.integers(len(g), size=candidates)] + rng.normal(0, bw, candidates), 0, 1)
+            log_ratio += np.log(_parzen(u, g, bw)) - np.log(_parzen(u, b, _bandwidth(b)))
+            draws[name] = [dim.from_unit(x) for x in u]
+        else:
+            choices = list(dim)
+            k = len(choices)
+            l = (np.bincount([choices.index(p[name]) for p in good], minlength=k) + 1) / (len(good) + k)
+            g = (np.bincount([choices.index(p[name]) for p in bad], minlength=k) + 1) / (len(bad) + k)
+            picks = rng.choice(k, size=candidates, p=l)
+            log_ratio += np.log(l[picks]) - np.log(g[picks])
+            draws[name] = [choices[i] for i in picks]
+    best = int(np.argmax(log_ratio))
+    return {name: values[best] for name, values in draws.items()}
+
+
+###############################################################################
+
+# Optimizer
+
+###############################################################################
+
+
+@dataclass
+class Trial:
+    params: Params
+    budget: float
+    score: float
+
+
+@dataclass
+class OptimizeResult:
+    best_params: Params
+    best_score: float
+    best_budget: float
+    trials: pd.DataFrame
+    # Sum of evaluated budgets, i.e. the work in full-range backtests.
+    cost: float
+
+
+class Optimizer:
+    """Successive halving / Hyperband search maximising *objective*.
+
+    Parameters
+    ----------
+    objective:
+        ``objective(params, budget) -> score`` where *budget* in ``(0, 1]`` is
+        the fraction of the data to evaluate on, e.g.
+        :class:`BacktestObjective`. Higher scores are better; NaN counts as
+        the worst score. Must be picklable for ``executor="process"``.
+    space:
+        ``{name: choices}`` with a sequence of discrete values or a
+        :class:`Range` per parameter.
+    min_budget:
+        Smallest budget; the rungs are ``eta**-s, ..., 1/eta, 1``.
+    eta:
+        Promotion rate; each rung keeps the best ``1/eta`` of its candidates.
+    sampler:
+        ``"random"`` or ``"tpe"``. TPE fits on the largest budget with at
+        least ``len(space) + 2`` scores and falls back to random sampling
+        until then; *random_fraction* of its draws stay random.
+    max_workers:
+        Parallel evaluations per rung (``1`` runs inline).
+    executor:
+        ``"process"`` (default) or ``"thread"``.
+
+    Scores are cached per parameter set and budget, so repeated candidates
+    and later calls on the same optimizer do not re-run backtests.
+    """
+
+    def __init__(
+        self,
+        objective: Objective,
+        space: Space,
+        *,
+        min_budget: float = 1 / 27,
+        eta: int = 3,
+        sampler: str = "random",
+        random_fraction: float = 1 / 3,
+        max_workers: int = 1,
+        executor: str = "process",
+        seed: Optional[int] = None,
+    ) -> None:
+        if eta < 2:
+            raise ValueError("eta must be >= 2")
+        if not 0 < min_budget <= 1:
+            raise ValueError("min_budget must be in (0, 1]")
+        if sampler not in ("random", "tpe"):
+            raise ValueError(f"Unknown sampler: {sampler!r}")
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor: {executor!r}")
+        self.objective = objective
+        self.space = dict(space)
+        self.eta = eta
+        self.sampler = sampler
+        self.random_fraction = random_fraction
+        self.max_workers = max_workers
+        self.executor = executor
+        self.rng = np.random.default_rng(seed)
+        rungs = int(math.floor(math.log(1 / min_budget, eta) + 1e-9))
+        self.budgets = [float(eta) ** (i - rungs) for i in range(rungs + 1)]
+        self.trials: List[Trial] = []
+        self._scores: Dict[Tuple[Any, float], float] = {}
+        self._pool: Optional[Executor] = None
+
+    # ------------------------------------------------------------------
+    @contextlib.contextmanager
+    def _workers(self) -> Iterator[None]:
+        """Keep one pool open for a whole search so workers reuse their data."""
+        if self._pool is not None or self.max_workers == 1:
+            yield
+            return
+        pool_cls = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+        with pool_cls(self.max_workers) as pool:
+            self._pool = pool
+            try:
+                yield
+            finally:
+                self._pool = None
+
+    def _evaluate(self, configs: List[Params], budget: float) -> List[float]:
+        todo = {}
+        for params in configs:
+            key = _key(params)
+            if (key, budget) not in self._scores:
+                todo.setdefault(key, params)
+        if todo:
+            pending = list(todo.values())
+            if self._pool is None or len(pending) < 2:
+                scores = [self.objective(p, budget) for p in pending]
+            else:
+                scores = list(self._pool.map(self.objective, pending, itertools.repeat(budget)))
+            for params, score in zip(pending, scores):
+                score = float(score)
+                if math.isnan(score):
+                    score = -math.inf
+                self._scores[(_key(params), budget)] = score
+                self.trials.append(Trial(dict(params), budget, score))
+        return [self._scores[(_key(p), budget)] for p in configs]
+
+    def _halving(self, configs: List[Params], budgets: Sequence[float]) -> None:
+        configs = list({_key(p): p for p in configs}.values())
+        for i, budget in enumerate(budgets):
+            scores = self._evaluate(configs, budget)
+            if i == len(budgets) - 1:
+                break
+            keep = max(1, len(configs) // self.eta)
+            order = np.argsort(-np.asarray(scores), kind="stable")[:keep]
+            configs = [configs[j] for j in order]
+
+    def _observations(self) -> List[Tuple[Params, float]]:
+        by_budget: Dict[float, List[Tuple[Params, float]]] = {}
+        for trial in self.trials:
+            by_budget.setdefault(trial.budget, []).append((trial.params, trial.score))
+        for budget in sorted(by_budget, reverse=True):
+            if len(by_budget[budget]) >= len(self.space) + 2:
+                return by_budget[budget]
+        return []
+
+    def sample(self, n: int) -> List[Params]:
+        """Draw *n* candidates with the configured sampler."""
+        observed = self._observations() if self.sampler == "tpe" else []
+        out = []
+        for _ in range(n):
+            if observed and self.rng.random() >= self.random_fraction:
+                out.append(_sample_tpe(self.space, observed, self.rng))
+            else:
+                out.append(_sample_random(self.space, self.rng))
+        return out
+
+    # ------------------------------------------------------------------
+    def successive_halving(
+        self,
+        configs: Optional[Sequence[Params]] = None,
+        *,
+        n_configs: Optional[int] = None,
+    ) -> OptimizeResult:
+        """One halving bracket from the smallest budget up to the full range.
+
+        Starts from *configs*, else *n_configs* sampled candidates, else the
+        full grid when every parameter is discrete.
+        """
+        if configs is None:
+            if n_configs is None and not any(isinstance(d, Range) for d in self.space.values()):
+                configs = grid(self.space)
+            else:
+                configs = self.sample(n_configs or self.eta ** (len(self.budgets) - 1))
+        with self._workers():
+            self._halving(list(configs), self.budgets)
+        return self.result()
+
+    def hyperband(self, *, iterations: int = 1) -> OptimizeResult:
+        """Run all Hyperband brackets *iterations* times.
+
+        Bracket ``s`` samples ``ceil((s_max + 1) / (s + 1) * eta**s)``
+        candidates and starts them at budget ``eta**-s``. With the TPE sampler
+        later brackets sample from the scores of earlier ones.
+        """
+        s_max = len(self.budgets) - 1
+        with self._workers():
+            for _ in range(iterations):
+                for s in range(s_max, -1, -1):
+                    n = int(math.ceil((s_max + 1) / (s + 1) * self.eta ** s))
+                    self._halving(self.sample(n), self.budgets[s_max - s:])
+        return self.result()
+
+    def result(self) -> OptimizeResult:
+        """Best candidate at the largest budget evaluated so far."""
+        if not self.trials:
+            raise RuntimeError("No trials have been run")
+        top = max(t.budget for t in self.trials)
+        best = max((t for t in self.trials if t.budget == top), key=lambda t: t.score)
+        trials = pd.DataFrame(
+            [{**t.params, "budget": t.budget, "score": t.score} for t in self.trials]
+        )
+        return OptimizeResult(
+            best_params=dict(best.params),
+            best_score=best.score,
+            best_budget=top,
+            trials=trials,
+            cost=float(sum(t.budget for t in self.trials)),
+        )
+
+
+###############################################################################
+
+# Backtest objective
+
+###############################################################################
+
+
+class BacktestObjective:
+    """Score a strategy class on a prefix of the date range.
+
+    A *budget* of ``b`` runs the engine over the first ``ceil(b * bars)``
+    bars between *start* and *end*. *metric* is a field of
+    :class:`~src.analysis.PerformanceReport` or ``metric(results, trades)``.
+    *fixed* parameters are passed to every candidate.
+
+    Each thread or worker process builds its own :class:`DataPortal` once and
+    reuses it, so indicator registration by one run never races another.
+    """
+
+    def __init__(
+        self,
+        store: DataStore,
+        symbols: Sequence[str],
+        strategy: type,
+        *,
+        metric: Union[str, Callable[[pd.DataFrame, Sequence], float]] = "sharpe_ratio",
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        fixed: Optional[Params] = None,
+        starting_cash: float = 1_000_000.0,
+        **engine_kwargs,
+    ) -> None:
+        self.store = store
+        self.symbols = list(symbols)
+        self.strategy = strategy
+        self.metric = metric
+        self.start = start
+        self.end = end
+        self.fixed = dict(fixed or {})
+        self.starting_cash = starting_cash
+        self.engine_kwargs = engine_kwargs
+        self._local = threading.local()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _portal(self) -> DataPortal:
+        portal = getattr(self._local, "portal", None)
+        if portal is None:
+            portal = self._local.portal = DataPortal(self.store, self.symbols, max_workers=1)
+        return portal
+
+    def window(self, budget: float) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """First and last timestamp evaluated for *budget*."""
+        index = self._portal().index
+        start, end = align_timestamp(self.start, index), align_timestamp(self.end, index)
+        if start is not None:
+            index = index[index >= start]
+        if end is not None:
+            index = index[index <= end]
+        if not len(index):
+            raise ValueError("No bars between start and end")
+        n = min(len(index), max(2, int(math.ceil(budget * len(index)))))
+        return index[0], index[n - 1]
+
+    def __call__(self, params: Params, budget: float = 1.0) -> float:
+        strategy = make_strategy(self.strategy, self.symbols, {**self.fixed, **params})
+        engine = Engine(
+            self._portal(), strategy, starting_cash=self.starting_cash, **self.engine_kwargs
+        )
+        start, end = self.window(budget)
+        results = engine.run(start=start, end=end)
+        if callable(self.metric):
+            return float(self.metric(results, engine.trades))
+        if self.metric in Report.__dataclass_fields__:
+            return float(getattr(analyze(results), self.metric))
+        return float(getattr(performance(results, engine.trades), self.metric))
+
+
+__all__ = [
+    "BacktestObjective",
+    "OptimizeResult",
+    "Optimizer",
+    "Range",
+    "Trial",
+    "grid",
+]
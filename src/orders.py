@@ -0,0 +1,206 @@
+"""Pending orders and the per-symbol, price-indexed order book."""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+MARKET = "market"
+LIMIT = "limit"
+STOP = "stop"
+STOP_LIMIT = "stop_limit"
+
+_INF = float("inf")
+
+
+@dataclass(eq=False)
+class Order:
+    """An order resting in the book until its trigger condition is met.
+
+    ``market`` orders fill at the next bar's Open. ``limit`` orders fill when
+    the bar trades through the limit, ``stop`` orders become market orders
+    once the stop is touched, and ``stop_limit`` orders become limit orders.
+    """
+
+    symbol: str
+    quantity: int
+    side: str
+    order_type: str = MARKET
+    limit_price: Optional[float] = None
+    stop_price: Optional[float] = None
+    id: int = 0
+    status: str = "open"
+    fill_price: Optional[float] = None
+    filled_at: Optional[pd.Timestamp] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.status == "open"
+
+
+# Each symbol has four books of ``(price, seq, order)`` tuples sorted by
+# price. "low" books trigger when the bar's Low reaches down to the price
+# (buy limits, sell stops); "high" books trigger when the High reaches up to
+# it (sell limits, buy stops).
+_BOOKS = {
+    ("buy", LIMIT): "low",
+    ("sell", STOP): "low",
+    ("sell", LIMIT): "high",
+    ("buy", STOP): "high",
+}
+
+_Entry = Tuple[float, int, Order]
+
+
+class _SymbolBook:
+    __slots__ = ("market", "limit_low", "limit_high", "stop_low", "stop_high")
+
+    def __init__(self) -> None:
+        self.market: List[Order] = []
+        self.limit_low: List[_Entry] = []
+        self.limit_high: List[_Entry] = []
+        self.stop_low: List[_Entry] = []
+        self.stop_high: List[_Entry] = []
+
+    def __len__(self) -> int:
+        return (
+            len(self.market)
+            + len(self.limit_low)
+            + len(self.limit_high)
+            + len(self.stop_low)
+            + len(self.stop_high)
+        )
+
+    def book_for(self, order: Order, kind: str) -> List[_Entry]:
+        direction = _BOOKS[(order.side, kind)]
+        return getattr(self, f"{kind}_{direction}")
+
+
+def _pop_low(book: List[_Entry], low: float) -> List[_Entry]:
+    """Remove and return entries priced at or above *low*."""
+    i = bisect_left(book, (low,))
+    hit = book[i:]
+    del book[i:]
+    return hit
+
+
+def _pop_high(book: List[_Entry], high: float) -> List[_Entry]:
+    """Remove and return entries priced at or below *high*."""
+    i = bisect_left(book, (high, _INF))
+    hit = book[:i]
+    del book[:i]
+    return hit
+
+
+class OrderBook:
+    """Pending orders indexed by symbol and trigger price.
+
+    Only symbols with resting orders are visited each bar, and within a
+    symbol's book a bisection on the bar's High/Low selects exactly the
+    orders that trigger, so untouched orders cost nothing.
+    """
+
+    def __init__(self) -> None:
+        self._books: Dict[str, _SymbolBook] = {}
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return sum(len(b) for b in self._books.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._books)
+
+    def __iter__(self) -> Iterator[Order]:
+        for book in self._books.values():
+            yield from book.market
+            for name in ("limit_low", "limit_high", "stop_low", "stop_high"):
+                yield from (entry[2] for entry in getattr(book, name))
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._books)
+
+    # ------------------------------------------------------------------
+    def add(self, order: Order) -> Order:
+        if order.side not in ("buy", "sell"):
+            raise ValueError(f"Unknown side: {order.side}")
+        if order.quantity <= 0:
+            raise ValueError("Order quantity must be positive")
+        if order.order_type in (LIMIT, STOP_LIMIT) and order.limit_price is None:
+            raise ValueError(f"{order.order_type} order requires limit_price")
+        if order.order_type in (STOP, STOP_LIMIT) and order.stop_price is None:
+            raise ValueError(f"{order.order_type} order requires stop_price")
+        order.id = self._next_id
+        self._next_id += 1
+        book = self._books.setdefault(order.symbol, _SymbolBook())
+        if order.order_type == MARKET:
+            book.market.append(order)
+        elif order.order_type == LIMIT:
+            insort(book.book_for(order, LIMIT), (order.limit_price, order.id, order))
+        elif order.order_type in (STOP, STOP_LIMIT):
+            insort(book.book_for(order, STOP), (order.stop_price, order.id, order))
+        else:
+            raise ValueError(f"Unknown order type: {order.order_type}")
+        return order
+
+    def cancel(self, order: Order) -> None:
+        book = self._books.get(order.symbol)
+        if book is None or not order.is_open:
+            return
+        if order.order_type == MARKET:
+            book.market.remove(order)
+        else:
+            if order.order_type == LIMIT:
+                entries, price = book.book_for(order, LIMIT), order.limit_price
+            else:
+                entries, price = book.book_for(order, STOP), order.stop_price
+            i = bisect_left(entries, (price, order.id))
+            if i < len(entries) and entries[i][2] is order:
+                del entries[i]
+        order.status = "cancelled"
+        if not len(book):
+            del self._books[order.symbol]
+
+    # ------------------------------------------------------------------
+    def trigger(self, symbol: str, open_: float, high: float, low: float) -> List[Tuple[Order, float]]:
+        """Pop the orders for *symbol* that execute on a bar and their prices.
+
+        Stop-limit orders whose stop triggers but whose limit is not
+        marketable at the trigger price become limit orders; they still fill
+        on this bar if its range reaches the limit.
+        """
+        book = self._books[symbol]
+        fills: List[Tuple[Order, float]] = [(o, open_) for o in book.market]
+        book.market.clear()
+
+        for _, _, order in _pop_low(book.stop_low, low):
+            fills.append((order, min(open_, order.stop_price)))
+        for _, _, order in _pop_high(book.stop_high, high):
+            fills.append((order, max(open_, order.stop_price)))
+
+        resting: List[Tuple[Order, float]] = []
+        for order, price in fills:
+            if order.order_type != STOP_LIMIT:
+                continue
+            if (order.side == "buy" and price > order.limit_price) or (
+                order.side == "sell" and price < order.limit_price
+            ):
+                order.order_type = LIMIT
+                insort(book.book_for(order, LIMIT), (order.limit_price, order.id, order))
+                resting.append((order, price))
+        if resting:
+            fills = [f for f in fills if f not in resting]
+
+        for _, _, order in _pop_low(book.limit_low, low):
+            fills.append((order, min(open_, order.limit_price)))
+        for _, _, order in _pop_high(book.limit_high, high):
+            fills.append((order, max(open_, order.limit_price)))
+
+        if not len(book):
+            del self._books[symbol]
+        return fills
+
+
+__all__ = ["Order", "OrderBook", "MARKET", "LIMIT", "STOP", "STOP_LIMIT"]
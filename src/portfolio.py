@@ -0,0 +1,289 @@
+"""Array-backed portfolio state and columnar trade ledger."""
+from __future__ import annotations
+
+from collections.abc import Mapping, MutableMapping, Sequence
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data.datastore import Bar
+
+BUY = 1
+SELL = -1
+_SIDES = {BUY: "buy", SELL: "sell"}
+
+
+@dataclass
+class Trade:
+    timestamp: pd.Timestamp
+    symbol: str
+    quantity: int
+    price: float
+    side: str
+    cost: float = 0.0
+
+
+###############################################################################
+
+# Portfolio – position vector · price vector
+
+###############################################################################
+
+
+class Positions(MutableMapping):
+    """Dict-like live view of a :class:`Portfolio`'s position vector."""
+
+    def __init__(self, portfolio: "Portfolio") -> None:
+        self._portfolio = portfolio
+
+    def __getitem__(self, symbol: str) -> int:
+        p = self._portfolio
+        return int(p._qty[p._slots[symbol]])
+
+    def __setitem__(self, symbol: str, quantity: int) -> None:
+        p = self._portfolio
+        slot = p.add_symbol(symbol)
+        p._holdings += (quantity - p._qty[slot]) * p._mark_price(slot)
+        p._qty[slot] = quantity
+
+    def __delitem__(self, symbol: str) -> None:
+        self[symbol] = 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._portfolio.symbols)
+
+    def __len__(self) -> int:
+        return len(self._portfolio.symbols)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class Portfolio:
+    """Cash plus a position vector marked against a price vector.
+
+    Each symbol owns a fixed slot in the ``int64`` quantity and ``float64``
+    price arrays. The market value of the holdings (``qty · price``) is kept
+    up to date as prices are marked and fills are applied, so :meth:`value`
+    is O(1) regardless of the number of symbols.
+    """
+
+    def __init__(self, cash: float, positions: Optional[Mapping[str, int]] = None) -> None:
+        self.cash = float(cash)
+        self.symbols: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._qty = np.zeros(0, dtype=np.int64)
+        self._price = np.zeros(0, dtype=np.float64)
+        self._holdings = 0.0
+        self._marked: object = None
+        for sym, qty in (positions or {}).items():
+            self.positions[sym] = qty
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_marked"] = None  # identity cache only; do not pickle the bar
+        return state
+
+    # ------------------------------------------------------------------
+    @property
+    def positions(self) -> Positions:
+        return Positions(self)
+
+    def slot(self, symbol: str) -> int:
+        return self._slots[symbol]
+
+    def add_symbol(self, symbol: str) -> int:
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = self._slots[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self._qty = np.append(self._qty, 0)
+            self._price = np.append(self._price, np.nan)
+        return slot
+
+    def price(self, symbol: str) -> float:
+        """Last marked price of *symbol*."""
+        return float(self._price[self._slots[symbol]])
+
+    def _mark_price(self, slot: int) -> float:
+        price = self._price[slot]
+        return 0.0 if np.isnan(price) else float(price)
+
+    # ------------------------------------------------------------------
+    def mark(self, prices: Mapping[str, pd.Series]) -> None:
+        """Mark the portfolio to the Close prices of a bar."""
+        if isinstance(prices, Bar):
+            self.mark_slots(prices.slots, prices.close)
+        else:
+            slots = np.fromiter((self.add_symbol(s) for s in prices), dtype=np.intp)
+            close = np.fromiter((prices[s]["Close"] for s in prices), dtype=np.float64)
+            self.mark_slots(slots, close)
+        self._marked = prices
+
+    def mark_slots(self, slots: np.ndarray, close: np.ndarray) -> None:
+        """Set the prices at *slots*; missing (NaN) prices keep the old mark."""
+        close = np.where(np.isnan(close), self._price[slots], close)
+        if len(slots) == len(self._price):
+            self._price[slots] = close
+            self._holdings = float(self._qty @ np.nan_to_num(self._price))
+        else:
+            old = np.nan_to_num(self._price[slots])
+            self._price[slots] = close
+            self._holdings += float(self._qty[slots] @ (np.nan_to_num(close) - old))
+
+    def value(self, prices: Optional[Mapping[str, pd.Series]] = None) -> float:
+        """Cash plus holdings, optionally marking to *prices* first."""
+        if prices is not None and prices is not self._marked:
+            self.mark(prices)
+        return self.cash + self._holdings
+
+    def apply_fill(self, slot: int, quantity: int, price: float) -> None:
+        """Apply a signed fill of *quantity* at *price* to cash and positions."""
+        self._qty[slot] += quantity
+        self.cash -= quantity * price
+        self._holdings += quantity * self._mark_price(slot)
+
+    def apply_fills(self, slots: np.ndarray, quantities: np.ndarray, prices: np.ndarray) -> None:
+        """Vectorised :meth:`apply_fill` for distinct *slots*."""
+        self._qty[slots] += quantities
+        self.cash -= float(quantities @ prices)
+        self._holdings += float(quantities @ np.nan_to_num(self._price[slots]))
+
+
+###############################################################################
+
+# TradeLedger – columnar, preallocated trade log
+
+###############################################################################
+
+
+class TradeLedger(Sequence):
+    """Columnar trade log backed by growable NumPy arrays.
+
+    Behaves like a read-only list of :class:`Trade` objects (materialised on
+    access) while recording only scalars into preallocated columns.
+    """
+
+    def __init__(self, symbols: List[str], capacity: int = 1024) -> None:
+        self.symbols = symbols
+        self._n = 0
+        self._tz = None
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._slot = np.empty(capacity, dtype=np.int32)
+        self._qty = np.empty(capacity, dtype=np.int64)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._side = np.empty(capacity, dtype=np.int8)
+        self._cost = np.empty(capacity, dtype=np.float64)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for name in ("_ts", "_slot", "_qty", "_price", "_side", "_cost"):
+            state[name] = state[name][: self._n].copy()
+        return state
+
+    # ------------------------------------------------------------------
+    def _reserve(self, extra: int) -> None:
+        need = self._n + extra
+        cap = len(self._ts)
+        if need <= cap:
+            return
+        cap = max(need, cap * 2, 16)
+        for name in ("_ts", "_slot", "_qty", "_price", "_side", "_cost"):
+            old = getattr(self, name)
+            new = np.empty(cap, dtype=old.dtype)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
+    def record(
+        self,
+        timestamp: pd.Timestamp,
+        slot: int,
+        quantity: int,
+        price: float,
+        side: int,
+        cost: float = 0.0,
+    ) -> None:
+        self._reserve(1)
+        i = self._n
+        self._tz = timestamp.tz
+        self._ts[i] = timestamp.value
+        self._slot[i] = slot
+        self._qty[i] = quantity
+        self._price[i] = price
+        self._side[i] = side
+        self._cost[i] = cost
+        self._n = i + 1
+
+    def record_batch(
+        self,
+        timestamp: pd.Timestamp,
+        slots: np.ndarray,
+        quantities: np.ndarray,
+        prices: np.ndarray,
+        sides: np.ndarray,
+        costs: Optional[np.ndarray] = None,
+    ) -> None:
+        k = len(slots)
+        if not k:
+            return
+        self._reserve(k)
+        i, j = self._n, self._n + k
+        self._tz = timestamp.tz
+        self._ts[i:j] = timestamp.value
+        self._slot[i:j] = slots
+        self._qty[i:j] = quantities
+        self._price[i:j] = prices
+        self._side[i:j] = sides
+        self._cost[i:j] = 0.0 if costs is None else costs
+        self._n = j
+
+    def append(self, trade: Trade) -> None:
+        slot = self.symbols.index(trade.symbol)
+        side = BUY if trade.side == "buy" else SELL
+        self.record(
+            pd.Timestamp(trade.timestamp), slot, trade.quantity, trade.price, side, trade.cost
+        )
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("trade index out of range")
+        return Trade(
+            timestamp=pd.Timestamp(int(self._ts[i]), tz=self._tz),
+            symbol=self.symbols[self._slot[i]],
+            quantity=int(self._qty[i]),
+            price=float(self._price[i]),
+            side=_SIDES[int(self._side[i])],
+            cost=float(self._cost[i]),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the ledger as a DataFrame without materialising objects."""
+        n = self._n
+        ts = pd.DatetimeIndex(self._ts[:n].view("datetime64[ns]"))
+        if self._tz is not None:
+            ts = ts.tz_localize("UTC").tz_convert(self._tz)
+        return pd.DataFrame(
+            {
+                "timestamp": ts,
+                "symbol": pd.Categorical.from_codes(self._slot[:n], categories=self.symbols)
+                if n
+                else pd.Categorical([], categories=self.symbols),
+                "quantity": self._qty[:n],
+                "price": self._price[:n],
+                "side": np.where(self._side[:n] == BUY, "buy", "sell"),
+                "cost": self._cost[:n],
+            }
+        )
+
+
+__all__ = ["Portfolio", "Positions", "Trade", "TradeLedger", "BUY", "SELL"]
@@ -0,0 +1,151 @@
+"""Opt-in per-phase timing instrumentation for :class:`~src.engine.Engine`.
+
+The engine only touches the profiler when one is attached, so a run without
+profiling executes exactly the same loop as before. With a profiler attached
+the hot callables are wrapped once per run and every call is timed.
+"""
+from __future__ import annotations
+
+import bisect
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Latency histogram bucket upper bounds in microseconds; the last bucket is
+# open-ended.
+LATENCY_BUCKETS_US: Tuple[float, ...] = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000, 50_000,
+)
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    seconds: float = 0.0
+    allocations: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "allocations": self.allocations,
+        }
+
+
+@dataclass
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (microseconds)."""
+
+    bounds: Tuple[float, ...] = LATENCY_BUCKETS_US
+    counts: List[int] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds * 1e6)] += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        labels = [f"<={b:g}us" for b in self.bounds] + [f">{self.bounds[-1]:g}us"]
+        return dict(zip(labels, self.counts))
+
+
+class Profiler:
+    """Collect cumulative per-phase timings for an engine run.
+
+    Phases recorded by the engine:
+
+    * ``bars`` – building the per-bar data dict in the ``DataPortal``.
+    * ``strategy`` – ``strategy.on_bar`` (inclusive of order handling).
+    * ``orders`` – ``Engine.buy`` / ``Engine.sell`` / ``Engine.rebalance`` /
+      ``Engine.order`` calls and pending-order fills.
+    * ``valuation`` – marking the portfolio to the bar's prices.
+
+    ``track_allocations`` additionally records the net number of memory
+    blocks allocated by each phase (``sys.getallocatedblocks``).
+    """
+
+    def __init__(self, *, track_allocations: bool = True) -> None:
+        self.track_allocations = track_allocations
+        self.phases: Dict[str, PhaseStats] = {}
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.bars = 0
+        self.wall_time = 0.0
+        self._started: float | None = None
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        self._started = time.perf_counter()
+
+    def stop(self) -> None:
+        if self._started is not None:
+            self.wall_time += time.perf_counter() - self._started
+            self._started = None
+
+    def phase(self, name: str) -> PhaseStats:
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats()
+        return stats
+
+    # ------------------------------------------------------------------
+    def wrap(
+        self, name: str, func: Callable[..., Any], *, histogram: bool = False
+    ) -> Callable[..., Any]:
+        """Return *func* wrapped so each call is accounted to phase *name*."""
+        stats = self.phase(name)
+        hist = self.histograms.setdefault(name, LatencyHistogram()) if histogram else None
+        clock = time.perf_counter
+        blocks = sys.getallocatedblocks if self.track_allocations else None
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            b0 = blocks() if blocks else 0
+            t0 = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                dt = clock() - t0
+                stats.calls += 1
+                stats.seconds += dt
+                if blocks:
+                    stats.allocations += blocks() - b0
+                if hist is not None:
+                    hist.add(dt)
+
+        return timed
+
+    def wrap_iter(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Yield from *iterable*, timing each ``next`` as phase *name*."""
+        stats = self.phase(name)
+        clock = time.perf_counter
+        blocks = sys.getallocatedblocks if self.track_allocations else None
+        it = iter(iterable)
+        while True:
+            b0 = blocks() if blocks else 0
+            t0 = clock()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            stats.calls += 1
+            stats.seconds += clock() - t0
+            if blocks:
+                stats.allocations += blocks() - b0
+            self.bars += 1
+            yield item
+
+    # ------------------------------------------------------------------
+    def report(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable summary of the collected timings."""
+        return {
+            "bars": self.bars,
+            "wall_time": self.wall_time,
+            "bars_per_sec": self.bars / self.wall_time if self.wall_time else 0.0,
+            "phases": {name: s.as_dict() for name, s in self.phases.items()},
+            "histograms": {name: h.as_dict() for name, h in self.histograms.items()},
+        }
+
+
+__all__ = ["Profiler", "PhaseStats", "LatencyHistogram", "LATENCY_BUCKETS_US"]
@@ -0,0 +1,185 @@
+"""Columnar equity-curve recorder for :class:`~src.engine.Engine` runs."""
+from __future__ import annotations
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+_DAY_NS = 86_400 * 10**9
+
+EVERY_BAR = "bar"
+ON_TRADE = "trade"
+END_OF_DAY = "day"
+_MODES = (EVERY_BAR, ON_TRADE, END_OF_DAY)
+
+
+class EquityRecorder:
+    """Record value, cash and optionally positions into preallocated arrays.
+
+    Parameters
+    ----------
+    mode:
+        ``"bar"`` records every *every*-th bar, ``"trade"`` only bars on
+        which a fill happened, ``"day"`` the last bar of each calendar day
+        (in the timestamps' time zone).
+    every:
+        Sampling interval for ``"bar"`` mode.
+    positions:
+        Also record the quantity of every symbol and the gross exposure
+        (``Σ|qty·price| / value``).
+
+    Whatever the mode, the first bar (except in ``"day"`` mode) and the last
+    bar of a run are always recorded, so total-return statistics are exact.
+    If a resumed or forked run observes more bars, that last row is taken
+    back unless the mode would have selected it anyway, so the combined
+    curve matches an uninterrupted run.
+    """
+
+    def __init__(
+        self,
+        mode: str = EVERY_BAR,
+        *,
+        every: int = 1,
+        positions: bool = False,
+        capacity: int = 1024,
+    ) -> None:
+        if mode not in _MODES:
+            raise ValueError(f"Unknown recording mode: {mode!r}")
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        self.mode = mode
+        self.every = every
+        self.positions = positions
+        self.capacity = capacity
+        self.reset([])
+
+    def reset(self, symbols: List[str]) -> None:
+        """Discard recorded rows and start recording for *symbols*."""
+        self.symbols = list(symbols)
+        self.bars = 0
+        self._n = 0
+        self._pending = False
+        self._final = False
+        self._day: Optional[int] = None
+        self._n_trades = 0
+        self._tz = None
+        cap = self.capacity
+        self._ts = np.empty(cap, dtype=np.int64)
+        self._value = np.empty(cap, dtype=np.float64)
+        self._cash = np.empty(cap, dtype=np.float64)
+        width = len(self.symbols) if self.positions else 0
+        self._qty = np.empty((cap, width), dtype=np.int64)
+        self._exposure = np.empty(cap, dtype=np.float64)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        keep = self._n + self._pending
+        for name in ("_ts", "_value", "_cash", "_qty", "_exposure"):
+            state[name] = state[name][:keep].copy()
+        return state
+
+    def __len__(self) -> int:
+        return self._n
+
+    # ------------------------------------------------------------------
+    def _reserve(self) -> None:
+        need = self._n + 2
+        cap = len(self._ts)
+        if need <= cap:
+            return
+        cap = max(need, cap * 2, 16)
+        for name in ("_ts", "_value", "_cash", "_qty", "_exposure"):
+            old = getattr(self, name)
+            new = np.empty((cap,) + old.shape[1:], dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def observe(self, timestamp: pd.Timestamp, portfolio, n_trades: int) -> None:
+        """Offer the state after a bar; kept or dropped according to the mode.
+
+        The row is always written to the next free slot and only committed
+        (made permanent) when the mode selects it, so a later bar can
+        overwrite an uncommitted row without any allocation.
+        """
+        if self._final:
+            # Reopen the row committed by finish(); the mode decides again.
+            self._n -= 1
+            self._pending = True
+            self._final = False
+        self._reserve()
+        ns = timestamp.value
+        if self.mode == END_OF_DAY:
+            offset = timestamp.utcoffset()
+            day = (ns + (pd.Timedelta(offset).value if offset is not None else 0)) // _DAY_NS
+            if self._pending and day != self._day:
+                self._n += 1
+            self._day = day
+        i = self._n
+        self._tz = timestamp.tz
+        self._ts[i] = ns
+        value = portfolio.value()
+        self._value[i] = value
+        self._cash[i] = portfolio.cash
+        if self.positions:
+            qty = portfolio._qty[: self._qty.shape[1]]
+            self._qty[i] = qty
+            gross = float(np.abs(qty) @ np.nan_to_num(np.abs(portfolio._price[: len(qty)])))
+            self._exposure[i] = gross / value if value else np.nan
+        self._pending = True
+
+        if self.mode == EVERY_BAR:
+            commit = self.bars % self.every == 0
+        elif self.mode == ON_TRADE:
+            commit = self.bars == 0 or n_trades != self._n_trades
+        else:
+            commit = False
+        self._n_trades = n_trades
+        self.bars += 1
+        if commit:
+            self._n += 1
+            self._pending = False
+
+    def finish(self) -> None:
+        """Commit the last observed bar if the mode skipped it.
+
+        The row stays provisional: a further :meth:`observe` (a resumed run)
+        uncommits it again.
+        """
+        if self._pending:
+            self._n += 1
+            self._pending = False
+            self._final = True
+
+    # ------------------------------------------------------------------
+    @property
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        """Timestamp of the last observed bar, committed or not."""
+        i = self._n + self._pending - 1
+        return pd.Timestamp(int(self._ts[i]), tz=self._tz) if i >= 0 else None
+
+    def _index(self) -> pd.DatetimeIndex:
+        idx = pd.DatetimeIndex(self._ts[: self._n].view("datetime64[ns]"), name="timestamp")
+        if self._tz is not None:
+            idx = idx.tz_localize("UTC").tz_convert(self._tz)
+        return idx
+
+    def to_frame(self) -> pd.DataFrame:
+        """Recorded rows as the ``value`` / ``cash`` (/ ``exposure``) frame
+        returned by ``Engine.run``; columns are views on the arrays."""
+        n = self._n
+        cols = {"value": self._value[:n], "cash": self._cash[:n]}
+        if self.positions:
+            cols["exposure"] = self._exposure[:n]
+        return pd.DataFrame(cols, index=self._index(), copy=False)
+
+    def positions_frame(self) -> pd.DataFrame:
+        """Recorded quantities, one column per symbol (``positions=True``)."""
+        if not self.positions:
+            raise ValueError("Recorder was created with positions=False")
+        return pd.DataFrame(
+            self._qty[: self._n], index=self._index(), columns=self.symbols, copy=False
+        )
+
+
+__all__ = ["EquityRecorder", "EVERY_BAR", "ON_TRADE", "END_OF_DAY"]
@@ -0,0 +1,142 @@
+"""Bootstrap / Monte-Carlo robustness analysis of backtest results.
+
+Resamples are generated as index matrices, so thousands of resampled equity
+curves are evaluated as a single ``(bars, samples)`` array. The metrics are
+the vectorised ones behind :func:`~src.analysis.analyze`, and the
+``observed`` column equals its point estimates.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .analysis import _equity_metrics, infer_periods_per_year, round_trips
+
+DEFAULT_PERCENTILES = (5.0, 50.0, 95.0)
+METRICS = (
+    "total_return",
+    "annual_return",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "volatility",
+    "max_drawdown",
+)
+
+
+def block_bootstrap_indices(
+    n: int, n_samples: int, block_size: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Circular block-bootstrap indices of shape ``(n_samples, n)``."""
+    block_size = max(1, min(block_size, n))
+    blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_samples, blocks))
+    idx = starts[:, :, None] + np.arange(block_size)
+    return idx.reshape(n_samples, -1)[:, :n] % n
+
+
+def _bootstrap_chunk(
+    returns: np.ndarray,
+    n_samples: int,
+    block_size: int,
+    periods_per_year: float,
+    risk_free_rate: float,
+    seed: np.random.SeedSequence,
+) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    idx = block_bootstrap_indices(len(returns), n_samples, block_size, rng)
+    sampled = returns[idx].T
+    values = np.vstack([np.ones(n_samples), np.cumprod(1 + sampled, axis=0)])
+    m = _equity_metrics(values, periods_per_year, risk_free_rate)
+    return {k: m[k] for k in METRICS}
+
+
+def _trade_path_drawdown(pnl: np.ndarray, start_value: float) -> np.ndarray:
+    """Max drawdown of each row of a ``(paths, trades)`` P&L matrix."""
+    paths = start_value + np.cumsum(pnl, axis=1)
+    paths = np.hstack([np.full((len(pnl), 1), start_value), paths])
+    peak = np.maximum.accumulate(paths, axis=1)
+    return ((paths - peak) / peak).min(axis=1)
+
+
+def bootstrap_analysis(
+    results: pd.DataFrame,
+    trades: Optional[Sequence] = None,
+    *,
+    n_samples: int = 1000,
+    block_size: Optional[int] = None,
+    percentiles: Iterable[float] = DEFAULT_PERCENTILES,
+    risk_free_rate: float = 0.0,
+    periods_per_year: Optional[float] = None,
+    seed: Optional[int] = None,
+    n_jobs: int = 1,
+) -> pd.DataFrame:
+    """Percentile bands of key metrics under block-bootstrapped returns.
+
+    Parameters
+    ----------
+    results:
+        DataFrame returned by ``Engine.run``.
+    trades:
+        Optional ``Engine.trades``; adds a ``trade_shuffle_max_drawdown`` row
+        from reordering closed round trips.
+    block_size:
+        Length of resampled blocks, preserving short-range autocorrelation.
+        Defaults to ``sqrt(n_bars)``.
+    n_jobs:
+        Number of worker processes; samples are split into equal chunks with
+        independent random streams.
+
+    Returns
+    -------
+    DataFrame indexed by metric with an ``observed`` column plus one column
+    per percentile (``p5``, ``p50``, ...).
+    """
+    value = results["value"].to_numpy(dtype=np.float64)
+    returns = np.nan_to_num(value[1:] / value[:-1] - 1)
+    if not len(returns):
+        raise ValueError("Need at least two bars to bootstrap")
+    ppy = periods_per_year or infer_periods_per_year(results.index)
+    block_size = block_size or max(1, int(round(len(returns) ** 0.5)))
+    percentiles = list(percentiles)
+
+    root = np.random.SeedSequence(seed)
+    jobs = max(1, min(n_jobs, n_samples))
+    sizes = [n_samples // jobs + (i < n_samples % jobs) for i in range(jobs)]
+    args = [
+        (returns, size, block_size, ppy, risk_free_rate, child)
+        for size, child in zip(sizes, root.spawn(jobs))
+    ]
+    if jobs == 1:
+        chunks = [_bootstrap_chunk(*args[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunks = list(pool.map(_bootstrap_chunk, *zip(*args)))
+    samples = {k: np.concatenate([c[k] for c in chunks]) for k in METRICS}
+
+    observed = _equity_metrics(value[:, None], ppy, risk_free_rate)
+    rows = {k: observed[k][0] for k in METRICS}
+
+    if trades is not None and len(trades):
+        pnl = round_trips(trades)["pnl"].to_numpy(dtype=np.float64)
+        if len(pnl):
+            rng = np.random.default_rng(root.spawn(1)[0])
+            shuffled = rng.permuted(np.broadcast_to(pnl, (n_samples, len(pnl))), axis=1)
+            key = "trade_shuffle_max_drawdown"
+            samples[key] = _trade_path_drawdown(shuffled, value[0])
+            rows[key] = _trade_path_drawdown(pnl[None, :], value[0])[0]
+
+    table = pd.DataFrame(
+        {
+            f"p{p:g}": [np.percentile(samples[k], p) for k in samples]
+            for p in percentiles
+        },
+        index=list(samples),
+    )
+    table.insert(0, "observed", [rows[k] for k in samples])
+    return table
+
+
+__all__ = ["bootstrap_analysis", "block_bootstrap_indices", "DEFAULT_PERCENTILES"]
@@ -0,0 +1,443 @@
+"""Declarative entry/exit rules compiled to vectorised signal columns.
+
+A :class:`RuleSet` combines indicator definitions with entry and exit
+conditions. Conditions are :class:`Expr` trees, written either with Python
+operators (``(col("rsi") < 30) & (col("close") < col("ema8") * 0.956)``) or
+as strings in a restricted Python syntax (``"rsi < 30 and close < ema8 *
+0.956"``). Strings are parsed with :mod:`ast` and never executed. Each
+condition is evaluated once over the whole frame to a boolean mask, and
+:func:`position_state` turns the masks into a long/flat position per bar.
+
+Rule sets can also be loaded from YAML::
+
+    name: friend
+    indicators:
+      rsi: {func: rsi, window: 14}
+      ema8: {func: ema, window: 8}
+      fisher: "tanh(0.1 * (rsi - 50))"
+    entry:
+      - rsi < 30 and close < ema8 * 0.956
+    exit: rsi > 70
+"""
+from __future__ import annotations
+
+import ast
+import operator
+from dataclasses import dataclass, field
+from functools import partial, reduce
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .indicators import technicals
+from .strategy import ColumnFunc
+
+
+class RuleError(ValueError):
+    """A rule cannot be parsed or refers to an unknown column or function."""
+
+
+def _truth(value: Any) -> Any:
+    if isinstance(value, pd.Series):
+        return value.fillna(False).astype(bool) if value.dtype != bool else value
+    return bool(value)
+
+
+def _prev(x: Any, n: int = 1) -> Any:
+    return x.shift(int(n)) if isinstance(x, pd.Series) else x
+
+
+def _crossed_above(a: Any, b: Any) -> Any:
+    return _truth(a > b) & _truth(_prev(a) <= _prev(b))
+
+
+def _crossed_below(a: Any, b: Any) -> Any:
+    return _truth(a < b) & _truth(_prev(a) >= _prev(b))
+
+
+_BINARY: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "and": lambda a, b: _truth(a) & _truth(b),
+    "or": lambda a, b: _truth(a) | _truth(b),
+}
+
+FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "prev": _prev,
+    "abs": np.abs,
+    "exp": np.exp,
+    "log": np.log,
+    "sqrt": np.sqrt,
+    "tanh": np.tanh,
+    "crossed_above": _crossed_above,
+    "crossed_below": _crossed_below,
+}
+
+
+###############################################################################
+
+# Expressions
+
+###############################################################################
+
+
+class Expr:
+    """A column expression, evaluated over a whole frame by :meth:`evaluate`.
+
+    Instances are also column functions (``expr(df)``), so they can be
+    registered as indicators directly.
+    """
+
+    __slots__ = ("op", "args")
+
+    def __init__(self, op: str, *args: Any) -> None:
+        self.op = op
+        self.args = args
+
+    def __getstate__(self) -> Tuple[str, Tuple[Any, ...]]:
+        return self.op, self.args
+
+    def __setstate__(self, state: Tuple[str, Tuple[Any, ...]]) -> None:
+        self.op, self.args = state
+
+    # -- building ------------------------------------------------------
+    def _bin(self, op: str, other: Any, reverse: bool = False) -> "Expr":
+        other = other if isinstance(other, Expr) else Expr("const", other)
+        return Expr(op, other, self) if reverse else Expr(op, self, other)
+
+    def __add__(self, other):
+        return self._bin("+", other)
+
+    def __radd__(self, other):
+        return self._bin("+", other, True)
+
+    def __sub__(self, other):
+        return self._bin("-", other)
+
+    def __rsub__(self, other):
+        return self._bin("-", other, True)
+
+    def __mul__(self, other):
+        return self._bin("*", other)
+
+    def __rmul__(self, other):
+        return self._bin("*", other, True)
+
+    def __truediv__(self, other):
+        return self._bin("/", other)
+
+    def __rtruediv__(self, other):
+        return self._bin("/", other, True)
+
+    def __lt__(self, other):
+        return self._bin("<", other)
+
+    def __le__(self, other):
+        return self._bin("<=", other)
+
+    def __gt__(self, other):
+        return self._bin(">", other)
+
+    def __ge__(self, other):
+        return self._bin(">=", other)
+
+    def __eq__(self, other):  # type: ignore[override]
+        return self._bin("==", other)
+
+    def __ne__(self, other):  # type: ignore[override]
+        return self._bin("!=", other)
+
+    def __and__(self, other):
+        return self._bin("and", other)
+
+    def __or__(self, other):
+        return self._bin("or", other)
+
+    def __neg__(self):
+        return Expr("neg", self)
+
+    def __invert__(self):
+        return Expr("not", self)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    # -- evaluation ----------------------------------------------------
+    def evaluate(self, df: pd.DataFrame) -> Any:
+        op, args = self.op, self.args
+        if op == "col":
+            return _column(df, args[0])
+        if op == "const":
+            return args[0]
+        values = [a.evaluate(df) for a in args]
+        if op in _BINARY:
+            return _BINARY[op](*values)
+        if op == "neg":
+            return -values[0]
+        if op == "not":
+            value = _truth(values[0])
+            return ~value if isinstance(value, pd.Series) else not value
+        return FUNCTIONS[op](*values)
+
+    def __call__(self, df: pd.DataFrame) -> pd.Series:
+        value = self.evaluate(df)
+        if not isinstance(value, pd.Series):
+            value = pd.Series(value, index=df.index)
+        return value
+
+    def __repr__(self) -> str:
+        if self.op == "col":
+            return str(self.args[0])
+        if self.op == "const":
+            return repr(self.args[0])
+        if self.op in _BINARY:
+            return f"({self.args[0]!r} {self.op} {self.args[1]!r})"
+        if self.op == "neg":
+            return f"-{self.args[0]!r}"
+        if self.op == "not":
+            return f"not {self.args[0]!r}"
+        return f"{self.op}({', '.join(map(repr, self.args))})"
+
+
+def col(name: str) -> Expr:
+    """Reference to column *name* (``close`` also matches ``Close``)."""
+    return Expr("col", name)
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    cap = name[:1].upper() + name[1:]
+    if cap in df.columns:
+        return df[cap]
+    raise RuleError(f"Unknown column {name!r}")
+
+
+_AST_BINARY = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/"}
+_AST_COMPARE = {ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=", ast.Eq: "==", ast.NotEq: "!="}
+
+
+def parse(text: str) -> Expr:
+    """Parse a condition or column expression.
+
+    Allowed are names (columns), numbers, ``+ - * /``, chained comparisons,
+    ``and``/``or``/``not`` and calls to :data:`FUNCTIONS`.
+    """
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise RuleError(f"Invalid rule {text!r}: {exc.msg}") from None
+    return _convert(tree.body, text)
+
+
+def _convert(node: ast.AST, text: str) -> Expr:
+    if isinstance(node, ast.BoolOp):
+        op = "and" if isinstance(node.op, ast.And) else "or"
+        return reduce(lambda a, b: Expr(op, a, b), [_convert(v, text) for v in node.values])
+    if isinstance(node, ast.UnaryOp):
+        operand = _convert(node.operand, text)
+        if isinstance(node.op, ast.Not):
+            return Expr("not", operand)
+        if isinstance(node.op, ast.USub):
+            return Expr("neg", operand)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+    if isinstance(node, ast.BinOp) and type(node.op) in _AST_BINARY:
+        return Expr(_AST_BINARY[type(node.op)], _convert(node.left, text), _convert(node.right, text))
+    if isinstance(node, ast.Compare):
+        operands = [_convert(node.left, text)] + [_convert(c, text) for c in node.comparators]
+        parts = [
+            Expr(_AST_COMPARE[type(op)], operands[i], operands[i + 1])
+            for i, op in enumerate(node.ops)
+            if type(op) in _AST_COMPARE
+        ]
+        if len(parts) != len(node.ops):
+            raise RuleError(f"Unsupported comparison in {text!r}")
+        return reduce(lambda a, b: Expr("and", a, b), parts)
+    if isinstance(node, ast.Name):
+        return col(node.id)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, bool)):
+        return Expr("const", node.value)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        if node.func.id not in FUNCTIONS:
+            raise RuleError(f"Unknown function {node.func.id!r} in {text!r}")
+        return Expr(node.func.id, *(_convert(a, text) for a in node.args))
+    raise RuleError(f"Unsupported syntax {type(node).__name__} in {text!r}")
+
+
+###############################################################################
+
+# Position state machine
+
+###############################################################################
+
+
+def position_state(entry: Sequence[bool], exit: Sequence[bool]) -> np.ndarray:
+    """Long (1) / flat (0) state per bar.
+
+    A flat position opens on a bar whose *entry* is true and a long one
+    closes on a bar whose *exit* is true; the state is what is held after
+    the bar. Only bars with a signal are visited.
+    """
+    entry = np.asarray(entry, dtype=bool)
+    exit = np.asarray(exit, dtype=bool)
+    out = np.zeros(len(entry), dtype=np.int8)
+    holding, since = False, 0
+    for i in np.flatnonzero(entry | exit):
+        if not holding and entry[i]:
+            holding, since = True, i
+        elif holding and exit[i]:
+            out[since:i] = 1
+            holding = False
+    if holding:
+        out[since:] = 1
+    return out
+
+
+def _any(conditions: List[Expr], df: pd.DataFrame) -> pd.Series:
+    if not conditions:
+        return pd.Series(False, index=df.index)
+    masks = [_truth(c(df)) for c in conditions]
+    return reduce(operator.or_, masks)
+
+
+def _position_column(entry: str, exit: str, df: pd.DataFrame) -> pd.Series:
+    return pd.Series(position_state(df[entry], df[exit]), index=df.index)
+
+
+###############################################################################
+
+# RuleSet
+
+###############################################################################
+
+RuleLike = Union[str, Expr]
+
+
+def _indicator(name: str, spec: Any) -> ColumnFunc:
+    if isinstance(spec, (str, Expr)):
+        return parse(spec) if isinstance(spec, str) else spec
+    if callable(spec):
+        return spec
+    if isinstance(spec, Mapping):
+        params = dict(spec)
+        if "expr" in params:
+            return parse(params["expr"])
+        func_name = params.pop("func", name)
+        if func_name not in technicals.__all__:
+            raise RuleError(f"Unknown indicator function {func_name!r} for {name!r}")
+        return partial(getattr(technicals, func_name), **params)
+    raise RuleError(f"Invalid indicator definition for {name!r}: {spec!r}")
+
+
+@dataclass
+class RuleSet:
+    """Indicators plus entry/exit conditions for a long/flat strategy.
+
+    Any true *entry* condition opens a position and any true *exit*
+    condition closes it. Indicators are computed in order, so later ones
+    (and all conditions) may refer to earlier columns.
+    """
+
+    entry: List[RuleLike]
+    exit: List[RuleLike]
+    indicators: Dict[str, Any] = field(default_factory=dict)
+    name: str = "rules"
+
+    def __post_init__(self) -> None:
+        self.entry = [parse(c) if isinstance(c, str) else c for c in _as_list(self.entry)]
+        self.exit = [parse(c) if isinstance(c, str) else c for c in _as_list(self.exit)]
+        self.indicators = {name: _indicator(name, spec) for name, spec in self.indicators.items()}
+
+    @classmethod
+    def from_dict(cls, spec: Mapping[str, Any]) -> "RuleSet":
+        unknown = set(spec) - {"entry", "exit", "indicators", "name"}
+        if unknown:
+            raise RuleError(f"Unknown rule set keys: {sorted(unknown)}")
+        return cls(
+            entry=spec.get("entry", []),
+            exit=spec.get("exit", []),
+            indicators=dict(spec.get("indicators") or {}),
+            name=spec.get("name", "rules"),
+        )
+
+    @classmethod
+    def from_yaml_text(cls, text: str) -> "RuleSet":
+        """Parse YAML text holding a :meth:`from_dict` spec (requires PyYAML)."""
+        try:
+            import yaml
+        except ImportError:  # pragma: no cover - optional dependency
+            raise ImportError("pip install pyyaml to load rule sets from YAML") from None
+        spec = yaml.safe_load(text)
+        if not isinstance(spec, Mapping):
+            raise RuleError(
+                f"YAML rule set must be a mapping, got {type(spec).__name__} "
+                "(use from_yaml_file to load a path)"
+            )
+        return cls.from_dict(spec)
+
+    @classmethod
+    def from_yaml_file(cls, path: Union[str, Path]) -> "RuleSet":
+        """Load a rule set from the YAML file at *path*."""
+        return cls.from_yaml_text(Path(path).read_text())
+
+    # ------------------------------------------------------------------
+    @property
+    def entry_column(self) -> str:
+        return f"{self.name}_entry"
+
+    @property
+    def exit_column(self) -> str:
+        return f"{self.name}_exit"
+
+    @property
+    def position_column(self) -> str:
+        return f"{self.name}_position"
+
+    def signals(self) -> Dict[str, ColumnFunc]:
+        """Entry mask, exit mask and position columns, in that order."""
+        return {
+            self.entry_column: partial(_any, self.entry),
+            self.exit_column: partial(_any, self.exit),
+            self.position_column: partial(_position_column, self.entry_column, self.exit_column),
+        }
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return *df* with all indicator and signal columns added."""
+        df = df.copy()
+        for name, func in {**self.indicators, **self.signals()}.items():
+            result = func(df)
+            if isinstance(result, pd.DataFrame):
+                for column in result.columns:
+                    df[column] = result[column]
+            else:
+                df[name] = result
+        return df
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    if isinstance(value, (str, Expr)):
+        return [value]
+    return list(value)
+
+
+__all__ = [
+    "Expr",
+    "FUNCTIONS",
+    "RuleError",
+    "RuleSet",
+    "col",
+    "parse",
+    "position_state",
+]
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+"""Run a distributed backtest worker against a coordinator.
+
+Example::
+
+    PYTHONPATH=. python src/scripts/backtest_worker.py --connect 10.0.0.5:7070 --root market_data
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+
+from src.distributed import Worker
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Serve backtest tasks from a coordinator")
+    p.add_argument("--connect", required=True, help="Coordinator address host:port")
+    p.add_argument("--root", default="./market_data", help="Data folder")
+    p.add_argument("--name", default=None, help="Worker name (default host:pid)")
+    p.add_argument("--cache", type=int, default=8, help="Portals kept between tasks")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    host, port = args.connect.rsplit(":", 1)
+    worker = Worker(
+        (host, int(port)), Path(args.root).expanduser(), name=args.name, cache_size=args.cache
+    )
+    handled = worker.serve()
+    logging.info("Handled %d tasks", handled)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,14 @@ scripts/fetch_data.py
 Bulk-download daily OHLCV data from Yahoo Finance and save it to your local
 DataStore directory in Parquet format.
 
+Symbols are fetched concurrently; symbols already on disk only download the
+bars after their last stored timestamp.
+
 Usage
 -----
 $ python scripts/fetch_data.py             # default symbols + dates
 $ python scripts/fetch_data.py --symbols AMZN TSLA --start 2015-01-01
+$ python scripts/fetch_data.py --symbols-file sp500.txt --workers 16 --rate-limit 5
 """
 
 from __future__ import annotations
@@ -16,9 +20,7 @@ from __future__ import annotations
 import argparse
 import logging
 from pathlib import Path
-from typing import List
-
-from src.data import DataStore, download_history
+from src.data import DataStore, bulk_download
 
 ###############################################################################
 # CLI argument parsing
@@ -47,6 +49,20 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Last date (inclusive). Omit for 'today'",
     )
+    p.add_argument(
+        "--symbols-file",
+        default=None,
+        help="File with one ticker per line (added to --symbols)",
+    )
+    p.add_argument("--interval", default="1d", help="Bar interval (default: %(default)s)")
+    p.add_argument("--workers", type=int, default=8, help="Concurrent downloads")
+    p.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="Max provider requests per second across workers",
+    )
+    p.add_argument("--retries", type=int, default=3, help="Retries per symbol")
     return p.parse_args()
 
 
@@ -65,24 +81,27 @@ def main():
     store = DataStore(Path(args.root).expanduser(), cache_size=None)
     log.info("Saving data to %s", store.root)
 
-    failures: List[str] = []
+    symbols = list(args.symbols)
+    if args.symbols_file:
+        symbols += Path(args.symbols_file).read_text().split()
 
-    for sym in args.symbols:
-        try:
-            df = download_history(
-                sym,
-                start=args.start,
-                end=args.end,
-                store=store,
-                interval="1d"
-            )
-            log.info("✔ %s (%d rows)", sym, len(df))
-        except Exception as exc:
-            log.error("✖ %s – %s", sym, exc)
-            failures.append(sym)
+    result = bulk_download(
+        symbols,
+        store,
+        start=args.start,
+        end=args.end,
+        interval=args.interval,
+        max_workers=args.workers,
+        rate_limit=args.rate_limit,
+        retries=args.retries,
+    )
+    for sym, rows in sorted(result.rows.items()):
+        log.info("✔ %s (%d new rows)", sym, rows)
+    for sym, err in sorted(result.failures.items()):
+        log.error("✖ %s – %s", sym, err)
 
-    if failures:
-        log.warning("Download finished with errors: %s", ", ".join(failures))
+    if result.failures:
+        log.warning("Download finished with errors: %s", ", ".join(sorted(result.failures)))
     else:
         log.info("All done!")
 
@@ -14,11 +14,14 @@ from . import (
     analyze,
     download_history,
 )
-from .strategy import Strategy
+from .data.datastore import align_timestamp
+from .profiling import Profiler
+from .singleflight import SingleFlight
+from .strategy import Strategy, make_strategy
 import importlib
 import inspect
 import pkgutil
-from .indicators import sma, ema, macd, volume, kdj, atr
+from .indicators import sma, ema, macd, volume, kdj, atr, rsi, cti, ewo, bollinger
 
 
 
@@ -33,6 +36,10 @@ store = DataStore(DATA_ROOT)
 # Cache DataPortal instances keyed by tuple of symbols to preserve indicators
 _PORTALS: Dict[tuple, DataPortal] = {}
 
+# Concurrent identical requests (e.g. several dashboard tabs opening at once)
+# wait for one computation instead of repeating it.
+_FLIGHT = SingleFlight()
+
 
 _INDICATORS: Dict[str, Callable[..., Any]] = {
     "sma": sma,
@@ -41,6 +48,10 @@ _INDICATORS: Dict[str, Callable[..., Any]] = {
     "volume": volume,
     "kdj": kdj,
     "atr": atr,
+    "rsi": rsi,
+    "cti": cti,
+    "ewo": ewo,
+    "bollinger": bollinger,
 }
 
 _STRATEGIES: Dict[str, Callable[..., Any]] = {}
@@ -70,9 +81,17 @@ def _get_portal(symbols: str | List[str]) -> DataPortal:
     if isinstance(symbols, str):
         symbols = [symbols]
     key = tuple(sorted(symbols))
-    if key not in _PORTALS:
-        _PORTALS[key] = DataPortal(store, list(key))
-    return _PORTALS[key]
+    portal = _PORTALS.get(key)
+    if portal is None:
+        portal = _FLIGHT.do(("portal", key), _create_portal, key)
+    return portal
+
+
+def _create_portal(key: tuple) -> DataPortal:
+    portal = _PORTALS.get(key)
+    if portal is None:
+        portal = _PORTALS[key] = DataPortal(store, list(key))
+    return portal
 
 
 # ---------------------------------------------------------------------------
@@ -92,6 +111,7 @@ class BacktestRequest(BaseModel):
     end: Optional[str] = None
     params: Optional[Dict[str, Any]] = None
     cash: float = 1_000_000.0
+    profile: bool = False
 
 
 class FetchRequest(BaseModel):
@@ -106,11 +126,15 @@ class FetchRequest(BaseModel):
 @app.get("/data/{symbol}")
 def get_data(symbol: str, start: Optional[str] = None, end: Optional[str] = None):
     """Return price data for *symbol* as a list of records."""
+    return _FLIGHT.do(("data", symbol, start, end), _get_data, symbol, start, end)
+
+
+def _get_data(symbol: str, start: Optional[str], end: Optional[str]):
     portal = _get_portal(symbol)
     df = portal._series[symbol].enhance()
     if start or end:
-        start_ts = pd.to_datetime(start) if start else df.index.min()
-        end_ts = pd.to_datetime(end) if end else df.index.max()
+        start_ts = align_timestamp(start, df.index) if start else df.index.min()
+        end_ts = align_timestamp(end, df.index) if end else df.index.max()
         df = df.loc[start_ts:end_ts]
     records = df.reset_index().rename(columns={"index": "timestamp"}).to_dict("records")
     return {"symbol": symbol, "data": records}
@@ -135,6 +159,11 @@ def add_indicator(req: IndicatorRequest):
 
 @app.post("/backtest")
 def run_backtest(req: BacktestRequest):
+    key = ("backtest", req.model_dump_json())
+    return _FLIGHT.do(key, _run_backtest, req)
+
+
+def _run_backtest(req: BacktestRequest):
     refresh_strategies()
     strat_cls = _STRATEGIES.get(req.strategy)
     if strat_cls is None:
@@ -146,24 +175,24 @@ def run_backtest(req: BacktestRequest):
     portal.register_indicator("sma", sma)
     portal.register_indicator("atr", atr)
     portal.register_indicator("kdj", kdj)
-    params = req.params or {}
-    sig = inspect.signature(strat_cls)
-    if "symbols" in sig.parameters:
-        strategy = strat_cls(symbols, **params)
-    else:
-        if len(symbols) != 1:
-            raise HTTPException(status_code=400, detail="Strategy expects a single symbol")
-        strategy = strat_cls(symbols[0], **params)
-    engine = Engine(portal, strategy, starting_cash=req.cash)
+    try:
+        strategy = make_strategy(strat_cls, symbols, req.params)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    profiler = Profiler() if req.profile else None
+    engine = Engine(portal, strategy, starting_cash=req.cash, profiler=profiler)
     start_ts = pd.to_datetime(req.start) if req.start else None
     end_ts = pd.to_datetime(req.end) if req.end else None
     results = engine.run(start=start_ts, end=end_ts)
     report = analyze(results)
-    return {
+    response = {
         "report": report.__dict__,
         "history": results.reset_index().to_dict("records"),
         "trades": [t.__dict__ for t in engine.trades],
     }
+    if profiler is not None:
+        response["profile"] = profiler.report()
+    return response
 
 
 @app.get("/strategies")
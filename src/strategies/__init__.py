@@ -8,6 +8,7 @@ from .kdj import KDJStrategy
 from .alpha101 import Alpha101Strategy
 from .alpha_weight import AlphaWeightStrategy
 from .pullback_strategy import PullbackStrategy
+from .rule_strategy import RuleStrategy
 
 __all__ = [
     "MovingAverageCrossStrategy",
@@ -18,4 +19,5 @@ __all__ = [
     "Alpha101Strategy",
     "AlphaWeightStrategy",
     "PullbackStrategy",
+    "RuleStrategy",
 ]
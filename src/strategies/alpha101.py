@@ -1,19 +1,36 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, List, Mapping, Optional
 
 import pandas as pd
 
 from ..strategy import Strategy
-from ..alphas.alpha101 import ALPHAS
+from ..alphas.alpha101 import ALPHAS, Panel, compute_alphas
 
 
 class Alpha101Strategy(Strategy):
-    """Example strategy using a combination of Alpha101 signals."""
+    """Example strategy using a combination of Alpha101 signals.
 
-    def __init__(self, symbol: str) -> None:
+    With ``panel=True`` the signal is the sum of the paper formulas *names*
+    (all available ones by default). They are computed once across every
+    symbol of the engine's portal, instead of re-running ``ALPHAS`` on the
+    growing history each bar.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        *,
+        panel: bool = False,
+        names: Optional[List[str]] = None,
+        groups: Optional[Mapping[str, Mapping[str, object]]] = None,
+    ) -> None:
         self.symbol = symbol
+        self.panel = panel
+        self.names = names
+        self.groups = groups
         self.history = pd.DataFrame()
+        self._score: Optional[pd.Series] = None
 
     def on_bar(
         self,
@@ -21,6 +38,11 @@ class Alpha101Strategy(Strategy):
         timestamp: pd.Timestamp,
         data: Dict[str, pd.Series],
     ) -> None:
+        if self.panel:
+            score = self._panel_score(engine, timestamp)
+            if score is not None:
+                self._trade(engine, score)
+            return
         row = data[self.symbol]
         self.history = pd.concat([self.history, row.to_frame().T])
         scores = []
@@ -34,7 +56,17 @@ class Alpha101Strategy(Strategy):
                 continue
         if not scores:
             return
-        score = sum(scores)
+        self._trade(engine, sum(scores))
+
+    def _panel_score(self, engine: "Engine", timestamp: pd.Timestamp) -> Optional[float]:
+        if self._score is None:
+            panel = Panel.from_portal(engine.data_portal, groups=self.groups)
+            frames = compute_alphas(panel, self.names)
+            self._score = sum(f[self.symbol].fillna(0.0) for f in frames.values())
+        value = self._score.get(timestamp)
+        return None if value is None or pd.isna(value) else float(value)
+
+    def _trade(self, engine: "Engine", score: float) -> None:
         if score > 0:
             engine.buy(self.symbol, 1)
         elif score < 0:
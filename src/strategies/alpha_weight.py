@@ -1,20 +1,37 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Mapping, Optional
 
 import pandas as pd
 
 from ..strategy import Strategy
-from ..alphas.alpha101 import compute_alpha
+from ..alphas.alpha101 import Panel, compute_alpha, compute_alphas
 
 
 class AlphaWeightStrategy(Strategy):
-    """Allocate portfolio weights based on Alpha101 values across symbols."""
+    """Allocate portfolio weights based on Alpha101 values across symbols.
 
-    def __init__(self, symbols: List[str], alpha_name: str = "alpha001") -> None:
+    By default *alpha_name* is one of the single-symbol ``ALPHAS``,
+    recomputed from each symbol's history. With ``panel=True`` it names a
+    paper formula instead. That formula is evaluated once, cross-sectionally,
+    over the engine's portal (optionally with industry *groups*), and each
+    bar reads its row.
+    """
+
+    def __init__(
+        self,
+        symbols: List[str],
+        alpha_name: str = "alpha001",
+        *,
+        panel: bool = False,
+        groups: Optional[Mapping[str, Mapping[str, object]]] = None,
+    ) -> None:
         self.symbols = symbols
         self.alpha_name = alpha_name
+        self.panel = panel
+        self.groups = groups
         self.history: Dict[str, pd.DataFrame] = {sym: pd.DataFrame() for sym in symbols}
+        self._alpha: Optional[pd.DataFrame] = None
 
     # ------------------------------------------------------------------
     def on_bar(
@@ -23,6 +40,31 @@ class AlphaWeightStrategy(Strategy):
         timestamp: pd.Timestamp,
         data: Dict[str, pd.Series],
     ) -> None:
+        if self.panel:
+            scores = self._panel_scores(engine, timestamp)
+        else:
+            scores = self._history_scores(data)
+        if not scores:
+            return
+
+        # Convert scores to long-only weights via rank
+        ranks = pd.Series(scores).rank(pct=True)
+        total = ranks.sum()
+        if total == 0:
+            return
+        # Sells execute before buys inside the batch
+        engine.rebalance(target_weights=ranks / total)
+
+    def _panel_scores(self, engine: "Engine", timestamp: pd.Timestamp) -> Dict[str, float]:
+        if self._alpha is None:
+            panel = Panel.from_portal(engine.data_portal, groups=self.groups)
+            self._alpha = compute_alphas(panel, [self.alpha_name])[self.alpha_name]
+        if timestamp not in self._alpha.index:
+            return {}
+        row = self._alpha.loc[timestamp, self.symbols]
+        return {sym: float(val) for sym, val in row.items() if pd.notna(val)}
+
+    def _history_scores(self, data: Dict[str, pd.Series]) -> Dict[str, float]:
         # Append latest rows to history
         for sym in self.symbols:
             row = data[sym]
@@ -37,35 +79,7 @@ class AlphaWeightStrategy(Strategy):
                     scores[sym] = float(val)
             except Exception:
                 continue
-
-        if not scores:
-            return
-
-        # Convert scores to long-only weights via rank
-        ranks = pd.Series(scores).rank(pct=True)
-        total = ranks.sum()
-        if total == 0:
-            return
-        weights = {sym: ranks[sym] / total for sym in scores}
-
-        # Determine position changes first, then execute sells before buys
-        changes: List[tuple[str, int]] = []
-        for sym, weight in weights.items():
-            price = data[sym]["Close"]
-            portfolio_value = engine.portfolio.value(data)
-            target_qty = int((portfolio_value * weight) / price)
-            owned = engine.portfolio.positions.get(sym, 0)
-            diff = target_qty - owned
-            if diff:
-                changes.append((sym, diff))
-
-        for sym, diff in changes:
-            if diff < 0:
-                engine.sell(sym, -diff)
-
-        for sym, diff in changes:
-            if diff > 0:
-                engine.buy(sym, diff)
+        return scores
 
 
 __all__ = ["AlphaWeightStrategy"]
@@ -3,11 +3,41 @@ from __future__ import annotations
 from typing import Dict, List
 import pandas as pd
 
+from ..rules import RuleSet
 from ..strategy import Strategy
 
+# The same entry/exit logic as a declarative rule set, for RuleStrategy.
+FRIEND_RULES = RuleSet(
+    name="friend",
+    indicators={
+        "rsi": {"func": "rsi", "window": 14},
+        "rsi_fast": {"func": "rsi", "window": 4},
+        "rsi_slow": {"func": "rsi", "window": 20},
+        "ema8": {"func": "ema", "window": 8},
+        "ema16": {"func": "ema", "window": 16},
+        "sma15": {"func": "sma", "window": 15},
+        "cti": {"func": "cti", "length": 20},
+        "ewo": {"func": "ewo", "fast": 50, "slow": 200},
+    },
+    entry=[
+        # buy_ewo
+        "rsi_fast < 50 and close < ema8 * 0.956 and ewo > -1.238"
+        " and close < ema16 * 0.986 and rsi < 30",
+        # buy_1
+        "rsi_slow < prev(rsi_slow) and rsi_fast < 63 and rsi > 16"
+        " and close < sma15 * 0.932 and cti < -0.8",
+    ],
+    exit=["rsi_fast > 70"],
+)
+
 
 class FriendStrategy(Strategy):
-    """Simplified version of the example freqtrade strategy."""
+    """Simplified version of the example freqtrade strategy.
+
+    Recomputes its indicators from the full history on every bar. For long
+    series use ``RuleStrategy(symbol, FRIEND_RULES)``, which evaluates the
+    same rules vectorised.
+    """
 
     def __init__(self, symbol: str) -> None:
         self.symbol = symbol
@@ -97,4 +127,4 @@ class FriendStrategy(Strategy):
             self.in_position = False
 
 
-__all__ = ["FriendStrategy"]
+__all__ = ["FriendStrategy", "FRIEND_RULES"]
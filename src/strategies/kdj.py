@@ -1,14 +1,35 @@
 from __future__ import annotations
 
+from functools import partial
 from typing import Dict
 
 import pandas as pd
 
+from ..indicators import atr, kdj, sma
+from ..orders import Order
 from ..strategy import Strategy
 
 
+def _entry_signal(df: pd.DataFrame) -> pd.Series:
+    trend = df["kdj_sma_trend"]
+    return (df["Close"] > trend) & (trend > df["kdj_sma"]) & (df["J"] < 20)
+
+
+def _exit_signal(df: pd.DataFrame) -> pd.Series:
+    return df["Close"] < df["kdj_sma"]
+
+
 class KDJStrategy(Strategy):
-    """Trading strategy using the KDJ indicator with SMA exits and ATR stop."""
+    """Trading strategy using the KDJ indicator with SMA exits and ATR stop.
+
+    The KDJ, SMA and ATR columns and the entry/exit signals are declared
+    via :meth:`indicators` / :meth:`signals` and precomputed by the engine.
+
+    The ATR stop is placed as a resting stop order when the position is
+    opened, so the engine fills it intrabar once the Low touches the level.
+    An entry during the ATR warm-up gets its stop on the first bar with a
+    valid ATR.
+    """
 
     def __init__(
         self,
@@ -25,7 +46,28 @@ class KDJStrategy(Strategy):
         self.prev_d: float | None = None
         self.in_position = False
         self.entry_price: float | None = None
-        self.history = pd.DataFrame()
+        self.stop_order: Order | None = None
+
+    def indicators(self):
+        return {
+            "kdj": kdj,
+            "kdj_sma": partial(sma, window=self.sma_window),
+            "kdj_sma_trend": partial(sma, window=20),
+            "kdj_atr": partial(atr, window=self.atr_window),
+        }
+
+    def signals(self):
+        return {"kdj_entry": _entry_signal, "kdj_exit": _exit_signal}
+
+    def _place_stop(self, engine: "Engine", atr_value: float) -> None:
+        if pd.isna(atr_value):
+            return
+        self.stop_order = engine.order(
+            self.symbol,
+            50,
+            side="sell",
+            stop_price=self.entry_price - self.stop_mult * atr_value,
+        )
 
     def on_bar(
         self,
@@ -34,48 +76,32 @@ class KDJStrategy(Strategy):
         data: Dict[str, pd.Series],
     ) -> None:
         row = data[self.symbol]
-        self.history = pd.concat([self.history, row.to_frame().T])
         k = row.get("K")
         d = row.get("D")
-        j = row.get("J")
-        if k is None or d is None or j is None:
+        if k is None or d is None:
             return
-        close = row["Close"]
-        sma = self.history["Close"].rolling(self.sma_window).mean().iloc[-1]
-        sma60 = self.history["Close"].rolling(20).mean().iloc[-1]
-
-        high = self.history["High"]
-        low = self.history["Low"]
-        prev_close = self.history["Close"].shift()
-        tr = pd.concat(
-            [high - low, (high - prev_close).abs(), (low - prev_close).abs()],
-            axis=1,
-        ).max(axis=1)
-        atr = tr.rolling(self.atr_window).mean().iloc[-1]
+
+        if self.in_position and engine.portfolio.positions[self.symbol] == 0:
+            # The resting ATR stop was filled
+            self.in_position = False
+            self.entry_price = None
+            self.stop_order = None
 
         if self.prev_k is not None and self.prev_d is not None:
-            if (
-                # self.prev_k < self.prev_d
-                # and k > d
-                # and j < 20
-                close > sma60
-                and sma60 > sma
-                and j < 20
-                and not self.in_position
-            ):
+            if row["kdj_entry"] and not self.in_position:
                 engine.buy(self.symbol, 50)
                 self.in_position = True
-                self.entry_price = float(close)
-            elif self.in_position:
-                stop = (
-                    self.entry_price - self.stop_mult * atr
-                    if self.entry_price is not None and not pd.isna(atr)
-                    else None
-                )
-                if close < sma or (stop is not None and close <= stop):
-                    engine.sell(self.symbol, 50)
-                    self.in_position = False
-                    self.entry_price = None
+                self.entry_price = float(row["Close"])
+                self._place_stop(engine, row["kdj_atr"])
+            elif self.in_position and row["kdj_exit"]:
+                if self.stop_order is not None:
+                    engine.cancel(self.stop_order)
+                engine.sell(self.symbol, 50)
+                self.in_position = False
+                self.entry_price = None
+                self.stop_order = None
+            elif self.in_position and self.stop_order is None:
+                self._place_stop(engine, row["kdj_atr"])
         self.prev_k = k
         self.prev_d = d
 
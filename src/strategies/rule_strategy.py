@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Union
+
+import pandas as pd
+
+from ..rules import RuleSet
+from ..strategy import Strategy
+from .friend_strategy import FRIEND_RULES
+from .support_ft_strategy import SUPPORT_FT_RULES
+
+RULE_SETS: Dict[str, RuleSet] = {
+    "friend": FRIEND_RULES,
+    "support_ft": SUPPORT_FT_RULES,
+}
+
+
+class RuleStrategy(Strategy):
+    """Long/flat strategy driven by a declarative :class:`~src.rules.RuleSet`.
+
+    The rule set's indicators, entry/exit masks and position column are
+    precomputed by the engine, so ``on_bar`` only compares the precomputed
+    target with the current holding.
+
+    Parameters
+    ----------
+    symbol: str
+        Trading symbol.
+    rules: RuleSet | Mapping | str | Path
+        A rule set, a dict spec (see :meth:`RuleSet.from_dict`), the name of a
+        bundled set in ``RULE_SETS``, any other string as YAML text or a
+        :class:`~pathlib.Path` to a YAML file.
+    quantity: int, optional
+        Shares bought on entry when *trade_pct* is None.
+    trade_pct: float | None, optional
+        Portion of portfolio value to invest on entry instead.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        rules: Union[RuleSet, Mapping[str, Any], str, Path] = "friend",
+        quantity: int = 1,
+        trade_pct: Optional[float] = None,
+    ) -> None:
+        self.symbol = symbol
+        if isinstance(rules, Path):
+            rules = RuleSet.from_yaml_file(rules)
+        elif isinstance(rules, str):
+            rules = RULE_SETS[rules] if rules in RULE_SETS else RuleSet.from_yaml_text(rules)
+        elif not isinstance(rules, RuleSet):
+            rules = RuleSet.from_dict(rules)
+        self.rules = rules
+        self.quantity = quantity
+        self.trade_pct = trade_pct
+        self.in_position = False
+
+    def indicators(self):
+        return dict(self.rules.indicators)
+
+    def signals(self):
+        return self.rules.signals()
+
+    def _entry_qty(self, engine: "Engine", price: float) -> int:
+        if self.trade_pct is None:
+            return self.quantity
+        return max(int(engine.portfolio.value(engine._current_bar) * self.trade_pct / price), 1)
+
+    def on_bar(
+        self,
+        engine: "Engine",
+        timestamp: pd.Timestamp,
+        data: Dict[str, pd.Series],
+    ) -> None:
+        row = data[self.symbol]
+        target = row.get(self.rules.position_column)
+        if target is None or pd.isna(target):
+            return
+        if target > 0 and not self.in_position:
+            engine.buy(self.symbol, self._entry_qty(engine, row["Close"]))
+            self.in_position = True
+        elif target <= 0 and self.in_position:
+            owned = engine.portfolio.positions.get(self.symbol, 0)
+            if owned > 0:
+                engine.sell(self.symbol, owned)
+            self.in_position = False
+
+
+__all__ = ["RuleStrategy", "RULE_SETS"]
@@ -6,12 +6,39 @@ import numpy as np
 
 from src.engine import Engine
 
+from ..rules import RuleSet
 from ..strategy import Strategy
 
+# The same entry/exit logic as a declarative rule set, for RuleStrategy.
+SUPPORT_FT_RULES = RuleSet(
+    name="support_ft",
+    indicators={
+        "rsi": {"func": "rsi", "window": 14},
+        "rsi_fast": {"func": "rsi", "window": 4},
+        "ema12": {"func": "ema", "window": 12},
+        "ema16": {"func": "ema", "window": 16},
+        "ema26": {"func": "ema", "window": 26},
+        "cti": {"func": "cti", "length": 20},
+        "ewo": {"func": "ewo", "fast": 50, "slow": 200},
+        "bollinger": {"func": "bollinger", "window": 20},
+        "fisher": "tanh(0.1 * (rsi - 50))",
+    },
+    entry=[
+        # buy_dip
+        "close < ema16 * 0.982 and ewo < -10.0 and cti < -0.9 and rsi < 35",
+        # buy_uptrend
+        "ema26 > ema12 and ema26 - ema12 > open * 0.025 and close < BB_lower",
+    ],
+    exit=["fisher > 0.4 or rsi_fast > 70"],
+)
+
 
 class SupportFTStrategy(Strategy):
     """Simplified version of the complex freqtrade strategy.
 
+    ``RuleStrategy(symbol, SUPPORT_FT_RULES, quantity=10)`` runs the same
+    rules vectorised.
+
     Parameters
     ----------
     symbol: str
@@ -141,6 +168,6 @@ class SupportFTStrategy(Strategy):
                     self.in_position = False
 
 
-__all__ = ["SupportFTStrategy"]
+__all__ = ["SupportFTStrategy", "SUPPORT_FT_RULES"]
 
 
@@ -1,13 +1,34 @@
 from __future__ import annotations
 
+import inspect
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Any, Callable, Dict, List, Mapping, Optional
 
 import pandas as pd
 
+ColumnFunc = Callable[[pd.DataFrame], "pd.Series | pd.DataFrame"]
+
 
 class Strategy(ABC):
-    """Base class for trading strategies."""
+    """Base class for trading strategies.
+
+    Subclasses may declare the columns they read in ``on_bar`` through
+    :meth:`indicators` and :meth:`signals`. The engine registers them on the
+    data portal before the run, so they are computed once, vectorised over
+    the whole series, and ``on_bar`` only reads the current row.
+    """
+
+    def indicators(self) -> Dict[str, ColumnFunc]:
+        """Indicator columns to precompute, as ``name -> f(frame)``.
+
+        Functions returning a DataFrame add each of its columns.
+        """
+        return {}
+
+    def signals(self) -> Dict[str, ColumnFunc]:
+        """Derived signal columns, computed after :meth:`indicators` so they
+        may read those columns from the frame."""
+        return {}
 
     @abstractmethod
     def on_bar(
@@ -18,3 +39,19 @@ class Strategy(ABC):
     ) -> None:
         """Handle a new bar of market data."""
         raise NotImplementedError
+
+
+def make_strategy(
+    strategy_cls: type, symbols: List[str], params: Optional[Mapping[str, Any]] = None
+) -> Strategy:
+    """Instantiate *strategy_cls* for *symbols*.
+
+    Strategies with a ``symbols`` parameter get the whole list, others the
+    single symbol (``ValueError`` if there are several).
+    """
+    params = params or {}
+    if "symbols" in inspect.signature(strategy_cls).parameters:
+        return strategy_cls(symbols, **params)
+    if len(symbols) != 1:
+        raise ValueError(f"{strategy_cls.__name__} trades a single symbol")
+    return strategy_cls(symbols[0], **params)
@@ -4,6 +4,7 @@ import pandas as pd
 import numpy as np
 
 from src.alphas.alpha101 import compute_alpha
+from src.alphas.panel import Panel
 
 
 def test_alpha001():
@@ -18,3 +19,67 @@ def test_alpha004():
     result = compute_alpha(df, "alpha004")
     assert result.dropna().equals(pd.Series([-1.0, -1.0], index=[8, 9]))
 
+
+
+def _ohlcv_frames(n: int = 300, symbols=("AAA", "BBB", "CCC", "DDD")):
+    rng = np.random.default_rng(1)
+    index = pd.date_range("2020-01-01", periods=n, freq="D")
+    frames = {}
+    for sym in symbols:
+        close = 50 * np.exp(rng.normal(0, 0.01, n).cumsum())
+        open_ = close * (1 + rng.normal(0, 0.003, n))
+        frames[sym] = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) * 1.01,
+            "Low": np.minimum(open_, close) * 0.99,
+            "Close": close,
+            "Volume": rng.integers(1_000, 9_000, n).astype(float),
+        }, index=index)
+    return frames
+
+
+def test_panel_derives_and_caches_inputs():
+    frames = _ohlcv_frames(40)
+    panel = Panel.from_frames(frames)
+    close = panel["close"]
+    pd.testing.assert_frame_equal(panel["returns"], close.pct_change())
+    pd.testing.assert_frame_equal(panel["vwap"], (panel["high"] + panel["low"] + close) / 3)
+    adv = panel["adv20"]
+    assert panel["adv20"] is adv
+    pd.testing.assert_frame_equal(adv, panel["volume"].rolling(20).mean())
+    assert "cap" not in panel
+
+
+def test_compute_alphas_full_library():
+    from src.alphas.alpha101 import compute_alphas
+    from src.alphas.formulas import FORMULAS
+
+    assert len(FORMULAS) == 101
+    frames = _ohlcv_frames()
+    groups = {"sector": {"AAA": "tech", "BBB": "tech", "CCC": "energy", "DDD": "energy"}}
+    panel = Panel.from_frames(frames, groups=groups)
+    alphas = compute_alphas(panel)
+    assert set(alphas) == set(FORMULAS) - {"alpha056"}
+    for name, frame in alphas.items():
+        assert frame.shape == (300, 4), name
+        assert frame.iloc[-30:].notna().any().any(), name
+
+    a101 = alphas["alpha101"]
+    expected = (panel["close"] - panel["open"]) / (panel["high"] - panel["low"] + 0.001)
+    pd.testing.assert_frame_equal(a101, expected)
+
+    # The legacy single-symbol alphas are untouched.
+    df = pd.DataFrame({"Close": [1.0, 2.0, 4.0]})
+    assert compute_alpha(df, "alpha001").iloc[-1] == 1.0
+
+
+def test_alpha_weight_strategy_panel_mode(tmp_path):
+    from src import AlphaWeightStrategy, DataPortal, DataStore, Engine
+
+    for sym, df in _ohlcv_frames(60).items():
+        df.assign(**{"Adj Close": df["Close"]}).to_csv(tmp_path / f"{sym}.csv")
+    portal = DataPortal(DataStore(tmp_path), ["AAA", "BBB", "CCC", "DDD"])
+    strat = AlphaWeightStrategy(["AAA", "BBB", "CCC", "DDD"], "alpha101", panel=True)
+    engine = Engine(portal, strat, starting_cash=10_000.0)
+    engine.run()
+    assert len(engine.trades) > 0
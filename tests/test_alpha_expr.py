@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.alphas.alpha101 import alpha007
+from src.alphas.expr import AlphaProgram, ExpressionError, evaluate
+
+
+def _panel(n: int = 90, symbols=("AAA", "BBB", "CCC", "DDD")):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2020-01-01", periods=n, freq="D")
+    close = pd.DataFrame(100 + rng.normal(0, 1, (n, len(symbols))).cumsum(axis=0),
+                         index=index, columns=list(symbols))
+    volume = pd.DataFrame(rng.integers(1_000, 5_000, (n, len(symbols))).astype(float),
+                          index=index, columns=list(symbols))
+    return {"close": close, "open": close.shift(1).bfill(), "volume": volume}
+
+
+def test_shared_subexpressions_are_computed_once():
+    program = AlphaProgram({
+        "a": "rank(delta(close, 7))",
+        "b": "-1 * sign(delta(close, 7)) + rank(delta(close, 7))",
+        "c": "close * volume + volume * close",
+    })
+    keys = program._nodes
+    assert sum(op == "delta" for op, _, _ in keys) == 1
+    assert sum(op == "rank" for op, _, _ in keys) == 1
+    assert sum(op == "*" for op, args, _ in keys if len(args) == 2) == 2  # -1*sign, close*volume
+    assert program.fields == {"close", "volume"}
+
+
+def test_matches_hand_written_alpha007():
+    fields = _panel()
+    formula = ("(sum(volume, 20) / 20 < volume) ? "
+               "((-1 * ts_rank(abs(delta(close, 7)), 60)) * sign(delta(close, 7))) : -1")
+    result = evaluate(formula, fields)
+    for sym in fields["close"]:
+        df = pd.DataFrame({"Close": fields["close"][sym], "Volume": fields["volume"][sym]})
+        pd.testing.assert_series_equal(result[sym], alpha007(df), check_names=False)
+
+
+def test_cross_sectional_and_group_operators():
+    fields = _panel()
+    close = fields["close"]
+    ranked = evaluate("rank(close)", fields)
+    pd.testing.assert_frame_equal(ranked, close.rank(axis=1, pct=True))
+
+    groups = {"sector": {"AAA": "x", "BBB": "x", "CCC": "y", "DDD": "y"}}
+    neutral = evaluate("IndNeutralize(close, IndClass.sector)", fields, groups=groups)
+    assert np.allclose(neutral[["AAA", "BBB"]].sum(axis=1), 0)
+    assert np.allclose(neutral[["CCC", "DDD"]].sum(axis=1), 0)
+
+    decay = evaluate("decay_linear(close, 3)", fields)["AAA"]
+    expected = (close["AAA"] * 3 + close["AAA"].shift(1) * 2 + close["AAA"].shift(2)) / 6
+    pd.testing.assert_series_equal(decay, expected, check_names=False)
+
+    # Fractional windows are floored; min/max with a window are rolling.
+    pd.testing.assert_frame_equal(evaluate("ts_min(close, 5.9)", fields), close.rolling(5).min())
+    pd.testing.assert_frame_equal(evaluate("min(close, 5)", fields), close.rolling(5).min())
+    both = evaluate("max(close, open)", fields)
+    pd.testing.assert_frame_equal(both, np.maximum(close, fields["open"]))
+
+
+@pytest.mark.parametrize("formula", ["rank(close", "delay(close, volume)", "foo(close)", "close +"])
+def test_invalid_formulas_raise(formula):
+    with pytest.raises(ExpressionError):
+        AlphaProgram({"bad": formula})
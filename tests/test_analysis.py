@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import (
+    analyze,
+    batch_analyze,
+    infer_periods_per_year,
+    performance,
+    round_trips,
+)
+from src.portfolio import Trade
+
+
+def test_infer_periods_per_year():
+    daily = pd.bdate_range("2020-01-01", periods=30)
+    hourly = pd.DatetimeIndex(
+        [d + pd.Timedelta(hours=h) for d in daily for h in range(9, 16)]
+    )
+    assert infer_periods_per_year(daily) == 252.0
+    assert infer_periods_per_year(hourly) == 252.0 * 7
+    assert infer_periods_per_year(pd.date_range("2020-01-01", periods=30, freq="D")) == 365.0
+    assert infer_periods_per_year(pd.date_range("2020-01-03", periods=30, freq="W-FRI")) == 52.0
+
+
+def test_batch_analyze_matches_single_curve():
+    index = pd.bdate_range("2020-01-01", periods=6)
+    curves = pd.DataFrame(
+        {"a": [100, 110, 99, 120, 118, 125], "b": [100, 90, 95, 80, 85, 100]},
+        index=index,
+        dtype=float,
+    )
+    table = batch_analyze(curves)
+    for name in curves:
+        single = analyze(curves[[name]].rename(columns={name: "value"}))
+        assert table.loc[name, "sharpe_ratio"] == pytest.approx(single.sharpe_ratio)
+        assert table.loc[name, "max_drawdown"] == pytest.approx(single.max_drawdown)
+    assert table.loc["b", "max_drawdown_duration"] == 4
+
+
+def test_performance_trade_stats():
+    index = pd.bdate_range("2020-01-01", periods=4)
+    results = pd.DataFrame(
+        {"value": [100.0, 101.0, 103.0, 102.0], "cash": [100.0, 90.0, 90.0, 102.0]},
+        index=index,
+    )
+    trades = [
+        Trade(index[1], "AAA", 10, 1.0, "buy"),
+        Trade(index[3], "AAA", 5, 1.4, "sell"),
+        Trade(index[3], "AAA", 5, 0.8, "sell"),
+    ]
+    trips = round_trips(trades)
+    assert list(trips["pnl"]) == pytest.approx([2.0, -1.0])
+
+    report = performance(results, trades)
+    assert report.num_trades == 2
+    assert report.win_rate == 0.5
+    assert report.profit_factor == pytest.approx(2.0)
+    assert report.avg_holding_days == pytest.approx(4.0)
+    assert report.exposure == 0.5
+    assert np.isfinite(report.sortino_ratio)
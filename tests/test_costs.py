@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import DataPortal, DataStore, Engine, Strategy
+from src.costs import (
+    BpsSlippage,
+    FixedCommission,
+    PerShareCommission,
+    SquareRootImpact,
+    VolumeParticipationSlippage,
+)
+
+
+def _write_sample_csv(root: Path, symbol: str, closes, volume=1000):
+    dates = pd.date_range("2020-01-01", periods=len(closes), freq="D")
+    df = pd.DataFrame(
+        {
+            "Open": closes,
+            "High": closes,
+            "Low": closes,
+            "Close": closes,
+            "Adj Close": closes,
+            "Volume": volume,
+        },
+        index=dates,
+    )
+    df.to_csv(root / f"{symbol}.csv", date_format="%Y-%m-%d")
+
+
+class WeightsStrategy(Strategy):
+    def __init__(self, weights):
+        self.weights = weights
+
+    def on_bar(self, engine: Engine, timestamp: pd.Timestamp, data: Dict[str, pd.Series]) -> None:
+        engine.rebalance(target_weights=self.weights)
+
+
+def test_cost_models_vectorised_match_scalar():
+    model = (
+        FixedCommission(1.0)
+        + PerShareCommission(0.01, minimum=0.5)
+        + BpsSlippage(10)
+        + VolumeParticipationSlippage(0.1)
+        + SquareRootImpact(1.0, volatility=0.02)
+    )
+    qty = np.array([0, 10, 400])
+    price = np.array([5.0, 10.0, 20.0])
+    volume = np.array([1000.0, np.nan, 1000.0])
+    batch = model.cost(qty, price, volume)
+    scalar = [float(model.cost(q, p, v)) for q, p, v in zip(qty, price, volume)]
+    assert batch == pytest.approx(scalar)
+    assert batch[0] == 0.0
+    # 10 shares, unknown volume → full participation
+    assert batch[1] == pytest.approx(1.0 + 0.5 + 0.1 + 10.0 + 2.0)
+
+
+def test_engine_applies_costs_and_respects_cash(tmp_path: Path):
+    _write_sample_csv(tmp_path, "AAA", [1.0, 1.0])
+    portal = DataPortal(DataStore(tmp_path), ["AAA"])
+    engine = Engine(
+        portal,
+        WeightsStrategy({"AAA": 1.0}),
+        starting_cash=100.0,
+        cost_model=FixedCommission(2.0),
+    )
+    engine.run()
+
+    # 98 shares + 2.0 commission exhausts the cash on the first bar
+    assert engine.portfolio.positions["AAA"] == 98
+    assert engine.portfolio.cash == pytest.approx(0.0)
+    assert engine.trades.to_frame()["cost"].sum() == pytest.approx(2.0)
@@ -16,6 +16,7 @@ import pytest
 
 # Import the module under test – adjust import path as needed.
 from src.data import DataStore, DataPortal
+from src.data.dtypes import compact_series
 
 ###############################################################################
 # Helpers
@@ -97,6 +98,143 @@ def test_datastore_list_symbols(tmp_path: Path):
     store = DataStore(tmp_path)
     assert store.list_symbols() == ["AAA", "CCC"]
 
+
+def test_datastore_write_normalises_and_appends(tmp_path: Path):
+    """write() canonicalises schema/dtypes; append() merges overlaps atomically."""
+    idx = pd.date_range("2020-01-01 09:30", periods=3, freq="h")
+    raw = pd.DataFrame(
+        {"open": [1, 2, 3], "HIGH": [1, 2, 3], "low": [1, 2, 3], "close": [1, 2, 3],
+         "adj_close": [1, 2, 3], "volume": [10.0, 20.0, 30.0]},
+        index=idx,
+    )
+    store = DataStore(tmp_path, price_dtype="float32", tz="UTC")
+    store.write("aaa", raw, fmt="csv")
+    df = store.load("AAA")
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+    assert str(df.index.tz) == "UTC"
+    assert df.index[1].hour == 10  # intraday timestamps survive the CSV round trip
+
+    overlap = raw.iloc[2:].assign(close=9.0)
+    tail = raw.iloc[2:].set_axis(idx[2:] + pd.Timedelta(hours=1))
+    assert store.append("AAA", pd.concat([overlap, tail])) == 1
+    df = store.load("AAA")
+    assert len(df) == 4 and df["Close"].iloc[2] == 9.0
+    assert df["Volume"].dtype == "int64"
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith(".")]
+
+
+def test_last_timestamp_reads_only_the_tail(tmp_path: Path, monkeypatch):
+    """last_timestamp matches a full load without reading the whole file."""
+    from src.data import datastore
+
+    idx = pd.date_range("2020-01-01 09:30", periods=500, freq="min")
+    df = pd.DataFrame({"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": 1.0, "Volume": 1}, index=idx)
+    store = DataStore(tmp_path)
+    store.write("CSV", df, fmt="csv")
+    store.write("PQ", df, fmt="parquet")
+    (tmp_path / "EMPTY.csv").write_text("Date,Open,High,Low,Close,Volume\n")
+
+    def full_read(path):
+        raise AssertionError("full read")
+
+    monkeypatch.setattr(DataStore, "_read_file", staticmethod(full_read))
+    expected = pd.Timestamp("2020-01-01 17:49")
+    assert store.last_timestamp("CSV") == expected
+    assert store.last_timestamp("PQ") == expected
+    assert store.last_timestamp("EMPTY") is None
+    assert store.last_timestamp("MISSING") is None
+    assert datastore._last_line(tmp_path / "CSV.csv", block=16).startswith("2020-01-01 17:49")
+
+
+def test_portal_mixes_legacy_and_normalised_files(tmp_path: Path):
+    """With a tz set, naive legacy files load in it like freshly written ones."""
+    _write_sample_csv(tmp_path, "OLD", [1.0, 2.0, 3.0])
+    assert DataStore(tmp_path).load("OLD").index.tz is None  # default: as stored
+    store = DataStore(tmp_path, tz="UTC")
+    fresh = pd.read_csv(tmp_path / "OLD.csv", index_col=0, parse_dates=[0])
+    store.write("NEW", fresh.assign(Close=[4.0, 5.0, 6.0]))
+
+    portal = DataPortal(store, ["OLD", "NEW"])
+    assert str(portal.index.tz) == "UTC"
+    bars = list(portal.iter_bars())
+    assert [bar["NEW"]["Close"] for _, bar in bars] == [4.0, 5.0, 6.0]
+    assert portal.get_bar(pd.Timestamp("2020-01-02"), "OLD")["Close"] == 2.0
+    assert store.last_timestamp("OLD") == store.last_timestamp("NEW")
+    assert str(store.last_timestamp("OLD").tz) == "UTC"
+
+
+def test_compact_mode_downcasts_data_and_indicators(tmp_path: Path):
+    """compact=True stores prices/indicators as float32 and volume as int32."""
+    _write_sample_csv(tmp_path, "AAA", [10.0, 10.5, 10.3])
+    store = DataStore(tmp_path, compact=True)
+    portal = DataPortal(store, ["AAA"])
+    portal.register_indicator("SMA_2", lambda df: df["Close"].rolling(2).mean())
+
+    frame = portal._series["AAA"].enhance()
+    assert frame["Close"].dtype == "float32"
+    assert frame["SMA_2"].dtype == "float32"
+    assert frame["Volume"].dtype == "int32"
+    # Signed, so falling volume gives negative differences instead of wrapping.
+    assert compact_series(pd.Series([5, 2])).diff().iloc[-1] == -3
+    assert compact_series(pd.Series([3_000_000_000, 1])).dtype == "int64"
+    assert portal.field_matrix("Close").dtype == "float64"
+    assert DataPortal(store, ["AAA"], compact=False)._series["AAA"].compact is False
+
+
+def test_data_portal_iter_events_merges_asynchronous_indexes(tmp_path: Path):
+    """iter_events yields each timestamp once with only the symbols updating."""
+    a = pd.DataFrame({"Close": [1.0, 2.0, 3.0], "Volume": 1},
+                     index=pd.to_datetime(["2020-01-01 09:30", "2020-01-01 09:31", "2020-01-01 09:33"]))
+    b = pd.DataFrame({"Close": [10.0, 20.0], "Volume": 2},
+                     index=pd.to_datetime(["2020-01-01 09:31", "2020-01-01 09:32"]))
+    a.to_csv(tmp_path / "AAA.csv")
+    b.to_csv(tmp_path / "BBB.csv")
+    portal = DataPortal(DataStore(tmp_path), ["AAA", "BBB"])
+
+    events = list(portal.iter_events())
+    assert [ts.minute for ts, _ in events] == [30, 31, 32, 33]
+    assert [sorted(bar) for _, bar in events] == [["AAA"], ["AAA", "BBB"], ["BBB"], ["AAA"]]
+    _, bar = events[1]
+    assert list(bar.slots) == [0, 1] and list(bar.close) == [2.0, 10.0]
+    assert list(events[2][1].slots) == [1] and list(events[2][1].volume) == [2.0]
+
+    clipped = list(portal.iter_events(start=pd.Timestamp("2020-01-01 09:31"),
+                                      end=pd.Timestamp("2020-01-01 09:32")))
+    assert len(clipped) == 2
+
+
+def test_data_portal_parallel_and_background_build(tmp_path: Path):
+    """Parallel, process-pool and background builds match a sequential one."""
+    from functools import partial
+
+    from src.indicators.technicals import sma
+
+    for sym, base in [("AAA", 10.0), ("BBB", 20.0), ("CCC", 30.0)]:
+        _write_sample_csv(tmp_path, sym, [base + i for i in range(6)])
+    store = DataStore(tmp_path)
+    symbols = ["AAA", "BBB", "CCC"]
+
+    frames = []
+    for kwargs in ({"max_workers": 1}, {"max_workers": 3}, {"executor": "process", "max_workers": 2}):
+        portal = DataPortal(store, symbols, **kwargs)
+        portal.register_indicator("SMA_3", partial(sma, window=3))
+        frames.append(portal.enhance_all())
+    for other in frames[1:]:
+        for sym in symbols:
+            pd.testing.assert_frame_equal(frames[0][sym], other[sym])
+
+    portal = DataPortal(store, symbols, background=True)
+    assert portal.wait_ready(timeout=10) is portal and portal.ready()
+    assert len(portal.index) == 6
+
+    broken = DataPortal(store, ["AAA", "MISSING"], background=True)
+    with pytest.raises(FileNotFoundError):
+        broken.wait_ready(timeout=10)
+    assert not broken.ready()
+    with pytest.raises(ValueError):
+        DataPortal(store, symbols, executor="gpu")
+
+
 ###############################################################################
 # Clean‑up utility (optional) – ensure tmp dirs removed on Windows
 ###############################################################################
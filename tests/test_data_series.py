@@ -21,3 +21,48 @@ def test_series_indicator_registration():
     series.unregister_indicator("vol2")
     enhanced2 = series.enhance()
     assert "vol2" not in enhanced2.columns
+
+
+def test_series_higher_timeframe_alignment_without_lookahead():
+    idx = pd.date_range("2020-01-06 09:00", periods=4, freq="h").append(
+        pd.date_range("2020-01-07 09:00", periods=4, freq="h")
+    )
+    closes = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0]
+    df = pd.DataFrame(
+        {"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": 10},
+        index=idx,
+    )
+    series = DataSeries(df)
+    calls = []
+
+    def daily_range(d):
+        calls.append(len(d))
+        return d["High"] - d["Low"]
+
+    series.register_indicator("range", daily_range, timeframe="1D")
+    enhanced = series.enhance()
+
+    assert enhanced["Close_1D"].isna().sum() == 3  # day 1 unknown until its last bar
+    assert enhanced["Close_1D"].iloc[3] == 4.0
+    assert list(enhanced["Close_1D"].iloc[4:7]) == [4.0, 4.0, 4.0]
+    assert enhanced["Close_1D"].iloc[7] == 8.0
+    assert enhanced["Volume_1D"].iloc[3] == 40
+    assert enhanced["range_1D"].iloc[7] == 3.0
+    assert calls == [2]  # computed once on the two daily bars
+
+
+def test_lookahead_check_covers_higher_timeframes():
+    idx = pd.date_range("2020-01-06 09:00", periods=4, freq="h")
+    for day in range(1, 6):
+        idx = idx.append(pd.date_range(f"2020-01-{6 + day:02d} 09:00", periods=4, freq="h"))
+    closes = [float(i % 7 + 1) for i in range(len(idx))]
+    df = pd.DataFrame(
+        {"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": 10},
+        index=idx,
+    )
+    series = DataSeries(df)
+    series.register_indicator("prev_close", lambda d: d["Close"].shift(1), timeframe="1D")
+    assert series.lookahead_columns() == []
+
+    series.register_indicator("next_close", lambda d: d["Close"].shift(-1), timeframe="1D")
+    assert series.lookahead_columns() == ["next_close_1D"]
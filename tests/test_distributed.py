@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import socket
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.distributed import BacktestTask, Coordinator, spawn_workers
+
+
+def _write_symbol(root: Path, symbol: str, seed: int, n: int = 120) -> None:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(rng.normal(0, 0.02, n).cumsum())
+    dates = pd.date_range("2020-01-01", periods=n, freq="D")
+    pd.DataFrame(
+        {
+            "Open": close,
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": 1000,
+        },
+        index=dates,
+    ).to_csv(root / f"{symbol}.csv", date_format="%Y-%m-%d")
+
+
+def _tasks():
+    return [
+        BacktestTask("MovingAverageCrossStrategy", [sym], {"short_window": s, "long_window": 30})
+        for s in (3, 5, 8, 10, 12, 15)
+        for sym in ("AAA", "BBB")
+    ]
+
+
+def test_coordinator_runs_tasks_on_local_workers(tmp_path: Path):
+    _write_symbol(tmp_path, "AAA", 1)
+    _write_symbol(tmp_path, "BBB", 2)
+    tasks = _tasks() + [BacktestTask("NoSuchStrategy", ["AAA"])]
+    with Coordinator(retries=1) as coord:
+        procs = spawn_workers(coord.address, tmp_path, 2)
+        table = coord.run(tasks, timeout=60)
+    for proc in procs:
+        proc.join(timeout=10)
+
+    assert list(table.index) == list(range(len(tasks)))
+    ok = table[table["error"].isna()]
+    assert len(ok) == 12
+    assert ok["final_value"].notna().all()
+    # Data locality: each worker loads a symbol once and then reuses it.
+    assert ok["cache_hit"].sum() >= len(ok) - 4
+    failed = table.loc[12]
+    assert "Unknown strategy" in failed["error"]
+    assert failed["attempts"] == 2
+
+
+def test_task_is_retried_when_worker_disconnects(tmp_path: Path):
+    _write_symbol(tmp_path, "AAA", 1)
+    task = BacktestTask("MovingAverageCrossStrategy", ["AAA"], {"short_window": 5, "long_window": 20})
+    with Coordinator() as coord:
+        coord.submit([task])
+        # A worker that takes the task and then drops the connection.
+        with socket.create_connection(coord.address) as sock, sock.makefile("rwb") as f:
+            f.write(json.dumps({"op": "hello", "worker": "flaky", "portals": []}).encode() + b"\n")
+            f.flush()
+            assert json.loads(f.readline())["op"] == "task"
+        spawn_workers(coord.address, tmp_path, 1)
+        (row,) = list(coord.results(timeout=60))
+
+    assert row["error"] is None
+    assert row["attempts"] == 2
+    assert row["worker"] != "flaky"
+
+
+def test_results_raise_when_no_worker_remains():
+    task = BacktestTask("MovingAverageCrossStrategy", ["AAA"])
+    with Coordinator(retries=5, worker_grace=0.5) as coord:
+        coord.submit([task])
+        with socket.create_connection(coord.address) as sock, sock.makefile("rwb") as f:
+            f.write(json.dumps({"op": "hello", "worker": "gone", "portals": []}).encode() + b"\n")
+            f.flush()
+            assert json.loads(f.readline())["op"] == "task"
+        with pytest.raises(RuntimeError, match="No worker connected"):
+            list(coord.results())
+
+
+def test_locality_prefers_exact_cached_portal():
+    with Coordinator() as coord:
+        coord.submit(
+            [BacktestTask("S", ["AAA", "BBB"]), BacktestTask("S", ["AAA"]), BacktestTask("S", ["BBB"])]
+        )
+        worker = coord._join("w", [["AAA", "BBB"], ["BBB"]])
+        # ["AAA"] overlaps the cached symbols but has no portal of its own.
+        assert [coord._assign(worker).task.symbols for _ in range(2)] == [
+            ["AAA", "BBB"],
+            ["BBB"],
+        ]
+
+
+def test_task_is_requeued_after_a_malformed_reply(tmp_path: Path):
+    _write_symbol(tmp_path, "AAA", 1)
+    task = BacktestTask("MovingAverageCrossStrategy", ["AAA"], {"short_window": 5, "long_window": 20})
+    with Coordinator() as coord:
+        coord.submit([task])
+        with socket.create_connection(coord.address) as sock, sock.makefile("rwb") as f:
+            f.write(json.dumps({"op": "hello", "worker": "broken", "portals": []}).encode() + b"\n")
+            f.flush()
+            job_id = json.loads(f.readline())["id"]
+            f.write(json.dumps({"id": job_id, "rows": {}}).encode() + b"\n")
+            f.flush()
+            # The coordinator drops the connection instead of crashing on it.
+            assert f.readline() == b""
+        spawn_workers(coord.address, tmp_path, 1)
+        (row,) = list(coord.results(timeout=60))
+
+    assert row["error"] is None
+    assert row["attempts"] == 2
+    assert row["worker"] != "broken"
@@ -6,7 +6,8 @@ from typing import Dict, List
 import pandas as pd
 import pytest
 
-from src import DataPortal, DataStore, Engine, Strategy
+from src import DataPortal, DataStore, Engine, Profiler, Strategy
+from src.profiling import LatencyHistogram
 
 
 def _write_sample_csv(root: Path, symbol: str, closes: List[float]):
@@ -51,3 +52,196 @@ def test_engine_buy_and_hold(tmp_path: Path):
 
     final_value = results.iloc[-1]["value"]
     assert pytest.approx(final_value, rel=1e-6) == 12.0
+
+
+class LimitOnceStrategy(BuyOnceStrategy):
+    def on_bar(self, engine: Engine, timestamp: pd.Timestamp, data: Dict[str, pd.Series]) -> None:
+        if not self.done:
+            engine.order("AAA", 1, limit_price=0.5)
+            self.done = True
+
+
+def test_engine_profiler_collects_phases(tmp_path: Path):
+    _write_sample_csv(tmp_path, "AAA", [1.0, 2.0, 3.0])
+    store = DataStore(tmp_path)
+    portal = DataPortal(store, ["AAA"])
+    profiler = Profiler()
+    engine = Engine(portal, BuyOnceStrategy(), starting_cash=10.0, profiler=profiler)
+    results = engine.run()
+
+    report = results.attrs["profile"]
+    assert report["bars"] == 3
+    assert report["phases"]["strategy"]["calls"] == 3
+    assert report["phases"]["orders"]["calls"] == 1
+    assert report["phases"]["valuation"]["calls"] == 3
+    assert sum(report["histograms"]["strategy"].values()) == 3
+    # Wrappers are removed after the run
+    assert "buy" not in vars(engine)
+
+    profiler = Profiler()
+    results = Engine(portal, LimitOnceStrategy(), starting_cash=10.0, profiler=profiler).run()
+    # One engine.order call plus the pending-order checks on the next two bars.
+    assert results.attrs["profile"]["phases"]["orders"]["calls"] == 3
+
+    ckpt = tmp_path / "run.ckpt"
+    Engine(portal, BuyOnceStrategy(), starting_cash=10.0).run(
+        end=pd.Timestamp("2020-01-02"), checkpoint_path=ckpt, checkpoint_every=1
+    )
+    resumed = Engine.resume(ckpt, portal, profiler=Profiler()).run()
+    assert resumed.attrs["profile"]["bars"] == 1  # the restored cursor bar is not counted
+
+
+def test_latency_histogram_buckets():
+    hist = LatencyHistogram(bounds=(1, 10))
+    for seconds in (0.5e-6, 1e-6, 2e-6, 10e-6, 11e-6):
+        hist.add(seconds)
+    assert hist.counts == [2, 2, 1]
+
+
+class RebalanceStrategy(Strategy):
+    def __init__(self, targets):
+        self.targets = targets
+
+    def on_bar(self, engine: Engine, timestamp: pd.Timestamp, data: Dict[str, pd.Series]) -> None:
+        engine.rebalance(target_weights=self.targets.pop(0))
+
+
+def test_engine_rebalance_sells_before_buys_and_caps_cash(tmp_path: Path):
+    _write_sample_csv(tmp_path, "AAA", [1.0, 1.0])
+    _write_sample_csv(tmp_path, "BBB", [2.0, 2.0])
+    store = DataStore(tmp_path)
+    portal = DataPortal(store, ["AAA", "BBB"])
+    strat = RebalanceStrategy([{"AAA": 1.0}, {"AAA": 0.0, "BBB": 1.0}])
+    engine = Engine(portal, strat, starting_cash=10.0)
+    engine.run()
+
+    assert engine.portfolio.positions == {"AAA": 0, "BBB": 5}
+    assert pytest.approx(engine.portfolio.cash) == 0.0
+    sides = [t.side for t in engine.trades]
+    assert sides == ["buy", "sell", "buy"]
+
+
+def test_compact_mode_analyze_within_float32_tolerance(tmp_path: Path):
+    from src.analysis import analyze
+    from src.data.dtypes import FLOAT32_REL_ERROR
+
+    closes = [100.0 + 0.37 * i + (i % 7) * 0.11 for i in range(60)]
+    _write_sample_csv(tmp_path, "AAA", closes)
+    reports = []
+    for compact in (False, True):
+        portal = DataPortal(DataStore(tmp_path, compact=compact), ["AAA"])
+        results = Engine(portal, BuyOnceStrategy(), starting_cash=1000.0).run()
+        reports.append(analyze(results))
+    full, small = reports
+    tol = 4 * FLOAT32_REL_ERROR
+    assert small.final_value == pytest.approx(full.final_value, rel=tol)
+    assert small.total_return == pytest.approx(full.total_return, abs=tol)
+    assert small.max_drawdown == pytest.approx(full.max_drawdown, abs=tol)
+
+
+def test_engine_event_mode_marks_only_updated_symbols(tmp_path: Path):
+    _write_sample_csv(tmp_path, "AAA", [1.0, 2.0, 3.0, 4.0])
+    _write_sample_csv(tmp_path, "BBB", [10.0, 20.0])
+    portal = DataPortal(DataStore(tmp_path), ["AAA", "BBB"])
+    seen = []
+
+    class Recorder(BuyOnceStrategy):
+        def on_bar(self, engine, timestamp, data):
+            seen.append(sorted(data))
+            super().on_bar(engine, timestamp, data)
+
+    engine = Engine(portal, Recorder(), starting_cash=100.0)
+    results = engine.run(events=True)
+    assert seen == [["AAA", "BBB"], ["AAA", "BBB"], ["AAA"], ["AAA"]]
+    # BBB keeps its last mark (20) after its series ends
+    assert results["value"].iloc[-1] == pytest.approx(100.0 - 11.0 + 4.0 + 20.0)
+
+
+class ThresholdStrategy(Strategy):
+    """Buys one share whenever Close exceeds *threshold*; state is the count."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.seen = 0
+
+    def on_bar(self, engine, timestamp, data):
+        self.seen += 1
+        if data["AAA"]["Close"] > self.threshold:
+            engine.buy("AAA", 1)
+
+
+def test_engine_checkpoint_resume_and_fork(tmp_path: Path):
+    closes = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    _write_sample_csv(tmp_path, "AAA", closes)
+    portal = DataPortal(DataStore(tmp_path), ["AAA"])
+    full = Engine(portal, ThresholdStrategy(2.5), starting_cash=100.0).run()
+
+    ckpt = tmp_path / "run.ckpt"
+    engine = Engine(portal, ThresholdStrategy(2.5), starting_cash=100.0)
+    engine.run(end=pd.Timestamp("2020-01-03"), checkpoint_path=ckpt, checkpoint_every=3)
+
+    resumed = Engine.resume(ckpt, portal)
+    out = resumed.run()
+    pd.testing.assert_frame_equal(out, full)
+    assert resumed.strategy.seen == len(closes)
+    assert len(resumed.trades) == 4
+
+    fork = Engine.resume(ckpt, portal).fork(threshold=4.5)
+    forked = fork.run()
+    assert fork.strategy.seen == len(closes)  # prefix was not replayed
+    assert len(fork.trades) == 3  # 1 from the shared prefix + 2 after it
+    pd.testing.assert_frame_equal(forked.iloc[:3], full.iloc[:3])
+
+
+class DeclaredColumnsStrategy(Strategy):
+    def __init__(self, peek: bool = False):
+        self.peek = peek
+        self.rows = []
+
+    def indicators(self):
+        if self.peek:
+            return {"next_close": lambda df: df["Close"].shift(-1)}
+        return {"sma2": lambda df: df["Close"].rolling(2).mean()}
+
+    def signals(self):
+        return {"up": lambda df: df["Close"] > df.get("sma2", df["Close"])}
+
+    def on_bar(self, engine, timestamp, data):
+        self.rows.append(data["AAA"])
+
+
+def test_engine_registers_declared_columns_and_rejects_lookahead(tmp_path: Path):
+    from src.data import LookaheadError
+
+    _write_sample_csv(tmp_path, "AAA", [1.0, 2.0, 1.5, 3.0, 4.0, 3.5])
+    portal = DataPortal(DataStore(tmp_path), ["AAA"])
+    strat = DeclaredColumnsStrategy()
+    Engine(portal, strat).run()
+    assert [r["sma2"] for r in strat.rows[1:3]] == [1.5, 1.75]
+    assert [bool(r["up"]) for r in strat.rows] == [False, True, False, True, True, False]
+    # The run's columns do not stay on the (possibly shared) portal.
+    assert not {"sma2", "up"} & set(portal.enhance_all()["AAA"].columns)
+
+    with pytest.raises(LookaheadError, match="next_close"):
+        Engine(
+            DataPortal(DataStore(tmp_path), ["AAA"]),
+            DeclaredColumnsStrategy(peek=True),
+            check_lookahead=True,
+        ).run()
+    # Off by default: the peeking column is computed without a check.
+    Engine(DataPortal(DataStore(tmp_path), ["AAA"]), DeclaredColumnsStrategy(peek=True)).run()
+
+
+def test_engine_restores_portal_indicators_shadowed_by_a_run(tmp_path: Path):
+    _write_sample_csv(tmp_path, "AAA", [1.0, 2.0, 1.5, 3.0, 4.0, 3.5])
+    portal = DataPortal(DataStore(tmp_path), ["AAA"])
+    sma3 = lambda df: df["Close"].rolling(3).mean()  # noqa: E731
+    portal.register_indicator("sma2", sma3)
+    strat = DeclaredColumnsStrategy()
+    Engine(portal, strat).run()
+    # The run used its own column; the user's indicator survives it.
+    assert strat.rows[1]["sma2"] == 1.5
+    assert portal.get_indicator("sma2", "AAA") is sma3
+    frame = portal.enhance_all()["AAA"]
+    assert frame["sma2"].iloc[2] == pytest.approx(1.5)
+    assert "up" not in frame.columns
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.factors import FactorAnalyzer, alpha_panel, forward_returns
+
+
+def _prices(n: int = 120, m: int = 12) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    index = pd.bdate_range("2021-01-01", periods=n)
+    returns = rng.normal(0, 0.02, (n, m))
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=index,
+                        columns=[f"S{i:02d}" for i in range(m)])
+
+
+def test_rank_ic_and_quantiles_of_known_factors():
+    prices = _prices()
+    analyzer = FactorAnalyzer(prices, horizons=(1, 5), quantiles=4)
+    fwd1 = forward_returns(prices, [1])[1]
+    noise = pd.DataFrame(np.random.default_rng(9).normal(size=prices.shape),
+                         index=prices.index, columns=prices.columns)
+    static = pd.DataFrame(np.tile(np.arange(prices.shape[1], dtype=float), (len(prices), 1)),
+                          index=prices.index, columns=prices.columns)
+    reports = analyzer.analyze({"oracle": fwd1, "inverse": -fwd1, "noise": noise, "static": static})
+
+    oracle = reports["oracle"]
+    assert np.allclose(oracle.ic[1].dropna(), 1.0)
+    assert oracle.summary.loc[1, "hit_rate"] == 1.0
+    assert oracle.spread[1] > 0
+    assert (oracle.quantile_returns[1].diff().dropna() > 0).all()
+    assert np.allclose(reports["inverse"].ic[1].dropna(), -1.0)
+    assert abs(reports["noise"].summary.loc[1, "ic_mean"]) < 0.1
+
+    # IC equals a per-date Spearman correlation.
+    mask = fwd1.isna()
+    expected = noise.mask(mask).rank(axis=1).corrwith(fwd1.rank(axis=1), axis=1)
+    pd.testing.assert_series_equal(reports["noise"].ic[1], expected, check_names=False)
+
+    assert reports["static"].turnover == 0.0
+    assert np.allclose(reports["static"].autocorrelation, 1.0)
+    assert 0.0 < reports["noise"].turnover <= 1.0
+
+    table = analyzer.summary({"oracle": fwd1, "noise": noise})
+    assert list(table.index.get_level_values("horizon")) == [1, 5, 1, 5]
+    assert {"ic_mean", "ir", "t_stat", "spread", "turnover"} <= set(table.columns)
+
+
+def test_reports_are_cached_per_factor():
+    prices = _prices(40, 5)
+    frames = {sym: pd.DataFrame({"Close": prices[sym]}) for sym in prices}
+    factors = alpha_panel(frames, ["alpha001"])
+    analyzer = FactorAnalyzer.from_frames(frames, horizons=(1,))
+    first = analyzer.analyze(factors)["alpha001"]
+    assert analyzer.analyze(factors)["alpha001"] is first
+    changed = {"alpha001": factors["alpha001"] * -1}
+    assert analyzer.analyze(changed)["alpha001"] is not first
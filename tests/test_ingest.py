@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.data import DataStore, HistoryProvider, bulk_download, update_history
+
+
+def _bars(start: str, periods: int, base: float = 1.0) -> pd.DataFrame:
+    closes = [base + i for i in range(periods)]
+    return pd.DataFrame(
+        {
+            "Open": closes,
+            "High": closes,
+            "Low": closes,
+            "Close": closes,
+            "Adj Close": closes,
+            "Volume": 1000,
+        },
+        index=pd.date_range(start, periods=periods, freq="D", tz="UTC"),
+    )
+
+
+class FakeProvider(HistoryProvider):
+    """Serves a fixed history and records the requested ranges."""
+
+    def __init__(self, history: pd.DataFrame, fail_first: int = 0):
+        self.history = history
+        self.fail_first = fail_first
+        self.calls = []
+
+    def fetch(self, symbol, start, end, interval):
+        start = pd.Timestamp(start)
+        if start.tz is None:
+            start = start.tz_localize("UTC")
+        self.calls.append((symbol, start))
+        if self.fail_first:
+            self.fail_first -= 1
+            raise ConnectionError("flaky")
+        if symbol == "BAD":
+            raise ValueError("unknown symbol")
+        if symbol == "BUG":
+            raise KeyError("Close")
+        return self.history.loc[start:].copy()
+
+
+def test_update_history_fetches_only_tail(tmp_path: Path):
+    store = DataStore(tmp_path)
+    provider = FakeProvider(_bars("2020-01-01", 5))
+    assert update_history("AAA", store, provider, start="2020-01-01") == 5
+
+    provider.history = _bars("2020-01-01", 8)
+    assert update_history("AAA", store, provider, start="2020-01-01") == 3
+    assert provider.calls[-1] == ("AAA", pd.Timestamp("2020-01-05", tz="UTC"))
+    df = store.load("AAA")
+    assert len(df) == 8 and df.index.is_unique
+    assert not list(tmp_path.glob(".AAA.*"))
+
+
+def test_bulk_download_retries_and_collects_failures(tmp_path: Path):
+    store = DataStore(tmp_path)
+    provider = FakeProvider(_bars("2020-01-01", 3), fail_first=1)
+    result = bulk_download(
+        ["AAA", "BBB", "BAD"],
+        store,
+        provider,
+        start="2020-01-01",
+        max_workers=2,
+        rate_limit=1000,
+        retries=2,
+        backoff=0.0,
+    )
+    assert result.rows == {"AAA": 3, "BBB": 3}
+    assert "BAD" in result.failures
+    assert store.list_symbols() == ["AAA", "BBB"]
+
+
+def test_non_transient_errors_are_not_retried(tmp_path: Path):
+    provider = FakeProvider(_bars("2020-01-01", 3))
+    with pytest.raises(KeyError):
+        update_history("BUG", DataStore(tmp_path), provider, retries=3, backoff=0.0)
+    assert len(provider.calls) == 1
+    with pytest.raises(KeyError):
+        bulk_download(["AAA", "BUG"], DataStore(tmp_path), provider, backoff=0.0)
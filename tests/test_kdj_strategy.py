@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from types import SimpleNamespace
 from typing import List
 
 import pandas as pd
@@ -38,3 +39,38 @@ def test_kdj_strategy(tmp_path: Path):
     assert len(results) == len(closes)
     df = portal._series["XXX"].enhance()
     assert {"K", "D", "J"}.issubset(df.columns)
+
+
+class _StubEngine:
+    def __init__(self):
+        self.calls = []
+        self.portfolio = SimpleNamespace(positions={"XXX": 0})
+
+    def buy(self, symbol, quantity):
+        self.calls.append(("buy", quantity))
+        self.portfolio.positions[symbol] += quantity
+
+    def order(self, symbol, quantity, *, side, stop_price):
+        self.calls.append((side, stop_price))
+        return object()
+
+
+def _row(close, atr, entry=False):
+    return pd.Series(
+        {"K": 50.0, "D": 50.0, "Close": close, "kdj_entry": entry, "kdj_exit": False, "kdj_atr": atr}
+    )
+
+
+def test_kdj_stop_placed_after_atr_warmup():
+    strat = KDJStrategy("XXX")
+    engine = _StubEngine()
+    ts = pd.Timestamp("2020-01-01")
+    strat.on_bar(engine, ts, {"XXX": _row(10.0, float("nan"))})
+    strat.on_bar(engine, ts, {"XXX": _row(10.0, float("nan"), entry=True)})
+    strat.on_bar(engine, ts, {"XXX": _row(11.0, float("nan"))})
+    assert engine.calls == [("buy", 50)]
+
+    strat.on_bar(engine, ts, {"XXX": _row(11.0, 1.5)})
+    strat.on_bar(engine, ts, {"XXX": _row(12.0, 1.0)})
+    # One stop, from the entry price and the first valid ATR.
+    assert engine.calls == [("buy", 50), ("sell", 10.0 - 2.0 * 1.5)]
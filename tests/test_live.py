@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import DataPortal, DataStore, Engine, Strategy
+from src.indicators import ATR, KDJ, SMA, atr, kdj, sma
+from src.live import LiveEngine, PaperBroker, QueueBarSource, ReplayBarSource
+
+
+def _write_sample_csv(root: Path, symbol: str, closes: List[float]):
+    dates = pd.date_range("2020-01-01", periods=len(closes), freq="D")
+    df = pd.DataFrame(
+        {
+            "Open": closes,
+            "High": [c * 1.02 for c in closes],
+            "Low": [c * 0.98 for c in closes],
+            "Close": closes,
+            "Adj Close": closes,
+            "Volume": 1000,
+        },
+        index=dates,
+    )
+    df.to_csv(root / f"{symbol}.csv", date_format="%Y-%m-%d")
+
+
+class CrossStrategy(Strategy):
+    """Long when Close is above its 3-bar SMA, flat otherwise."""
+
+    def on_bar(self, engine, timestamp, data: Dict[str, pd.Series]) -> None:
+        row = data["AAA"]
+        if np.isnan(row["SMA3"]):
+            return
+        held = engine.portfolio.positions["AAA"]
+        if row["Close"] > row["SMA3"] and not held:
+            engine.buy("AAA", 10)
+        elif row["Close"] < row["SMA3"] and held:
+            engine.sell("AAA", held)
+
+
+CLOSES = [10, 11, 12, 11, 10, 9, 10, 12, 13, 12, 11, 12.5]
+
+
+def test_live_replay_matches_backtest(tmp_path: Path):
+    _write_sample_csv(tmp_path, "AAA", CLOSES)
+    store = DataStore(tmp_path)
+
+    portal = DataPortal(store, ["AAA"])
+    portal.register_indicator("SMA3", lambda df: sma(df, 3))
+    expected = Engine(portal, CrossStrategy(), starting_cash=1000.0).run()
+
+    fills = []
+    live = LiveEngine(
+        ReplayBarSource(DataPortal(store, ["AAA"])),
+        CrossStrategy(),
+        starting_cash=1000.0,
+        broker=PaperBroker(on_fill=fills.append),
+        history_size=5,
+    )
+    live.register_indicator("SMA3", lambda: SMA(3))
+    results = asyncio.run(live.run())
+
+    assert len(results) == 5  # bounded history
+    pd.testing.assert_series_equal(results["value"], expected["value"].iloc[-5:])
+    assert len(fills) == len(live.trades) > 0
+    assert live.bars == len(CLOSES)
+    assert sum(live.latency.counts) == len(CLOSES)
+
+
+def test_queue_source_streams_plain_rows():
+    rows = []
+
+    async def main():
+        source = QueueBarSource(["AAA"])
+        live = LiveEngine(source, CrossStrategy(), starting_cash=1000.0)
+        live.register_indicator("SMA3", lambda: SMA(3))
+        task = asyncio.create_task(live.run())
+        for i, close in enumerate(CLOSES[:6]):
+            row = pd.Series({"Open": close, "High": close, "Low": close, "Close": close})
+            rows.append(row)
+            await source.put(pd.Timestamp("2024-01-01") + pd.Timedelta(minutes=i), {"AAA": row})
+        await source.close()
+        return await task
+
+    results = asyncio.run(main())
+    # Indicator columns go on copies, not on the caller's rows.
+    assert all("SMA3" not in row.index for row in rows)
+    assert len(results) == 6
+    assert results["value"].iloc[-1] == pytest.approx(1000.0 + 10 * (11 - 12))
+
+
+def test_incremental_indicators_match_vectorised():
+    rng = np.random.default_rng(0)
+    close = 100 + rng.standard_normal(50).cumsum()
+    df = pd.DataFrame({"High": close + 1, "Low": close - 1.5, "Close": close})
+    a, k = ATR(9), KDJ()
+    got_atr = [a.update(row) for _, row in df.iterrows()]
+    got_kdj = pd.DataFrame([k.update(row) for _, row in df.iterrows()])
+    np.testing.assert_allclose(got_atr, atr(df, 9), equal_nan=True)
+    np.testing.assert_allclose(got_kdj.to_numpy(), kdj(df).to_numpy(), equal_nan=True)
+
+
+class DeclaredSmaStrategy(CrossStrategy):
+    def indicators(self):
+        return {"SMA3": lambda df: sma(df, 3)}
+
+
+def test_live_engine_rejects_declared_columns(tmp_path: Path):
+    _write_sample_csv(tmp_path, "AAA", CLOSES)
+    source = ReplayBarSource(DataPortal(DataStore(tmp_path), ["AAA"]))
+    live = LiveEngine(source, DeclaredSmaStrategy(), starting_cash=1000.0)
+    with pytest.raises(TypeError, match="register_indicator"):
+        asyncio.run(live.run())
+    assert live.bars == 0
+
+
+def test_incremental_sma_does_not_drift():
+    sma3 = SMA(3)
+    for close in [1e17, 1.0, 1.0, 1.0]:
+        value = sma3.update({"Close": close})
+    assert value == 1.0
+    for close in np.random.default_rng(1).uniform(1e6, 1e7, 100_000):
+        sma3.update({"Close": close})
+    for close in [0.1, 0.2, 0.3]:
+        value = sma3.update({"Close": close})
+    assert value == pytest.approx(0.2, rel=1e-12)
+
+
+def test_live_engine_has_no_data_portal():
+    live = LiveEngine(QueueBarSource(["AAA"]), CrossStrategy())
+    assert live.data_portal.symbols == ["AAA"]
+    with pytest.raises(TypeError, match="no DataPortal"):
+        live.data_portal.iter_bars()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import DataStore
+from src.optimize import BacktestObjective, Optimizer, Range, grid
+from src.strategies import KDJStrategy
+
+
+def _quadratic(params, budget):
+    # Noise shrinks with the budget, like a short backtest window.
+    noise = np.sin(params["x"] * 7.0 + params["n"]) * (1 - budget) * 0.1
+    return -(params["x"] - 0.3) ** 2 - 0.01 * abs(params["n"] - 4) + noise
+
+
+def test_successive_halving_prunes_grid():
+    space = {"x": list(np.linspace(0, 1, 9)), "n": [2, 4, 8]}
+    opt = Optimizer(_quadratic, space, min_budget=1 / 9, eta=3)
+    result = opt.successive_halving()
+
+    rungs = result.trials.groupby("budget").size()
+    assert rungs.tolist() == [27, 9, 3]
+    assert result.best_budget == 1.0
+    assert result.best_params["n"] == 4
+    assert abs(result.best_params["x"] - 0.3) < 0.1
+    assert result.cost < len(grid(space)) / 2
+
+
+def test_hyperband_with_tpe_and_threads():
+    space = {"x": Range(0.0, 1.0), "n": Range(1, 10, integer=True)}
+    opt = Optimizer(
+        _quadratic, space, min_budget=1 / 9, sampler="tpe", max_workers=2,
+        executor="thread", seed=0,
+    )
+    result = opt.hyperband(iterations=2)
+    assert abs(result.best_params["x"] - 0.3) < 0.15
+    assert isinstance(result.best_params["n"], int)
+    # Cached candidates are not evaluated twice at the same budget.
+    assert not result.trials.duplicated(["x", "n", "budget"]).any()
+
+
+def test_backtest_objective_budgets(tmp_path: Path):
+    rng = np.random.default_rng(5)
+    dates = pd.date_range("2020-01-01", periods=240, freq="D")
+    close = 100 * np.exp(rng.normal(0, 0.02, len(dates)).cumsum())
+    pd.DataFrame(
+        {
+            "Open": close,
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": 1000,
+        },
+        index=dates,
+    ).to_csv(tmp_path / "XXX.csv", date_format="%Y-%m-%d")
+
+    objective = BacktestObjective(DataStore(tmp_path), ["XXX"], KDJStrategy, metric="total_return")
+    start, end = objective.window(0.25)
+    assert (end - start).days == 59
+
+    opt = Optimizer(
+        objective, {"sma_window": [10, 20, 40], "atr_window": [5, 9]},
+        min_budget=1 / 3, max_workers=2, executor="process",
+    )
+    result = opt.successive_halving()
+    assert len(result.trials) == 6 + 2
+    assert result.best_score == pytest.approx(objective(result.best_params, 1.0))
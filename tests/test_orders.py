@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+import pytest
+
+from src import DataPortal, DataStore, Engine, Strategy
+from src.orders import LIMIT, STOP_LIMIT, Order, OrderBook
+
+
+def _write_ohlc_csv(root: Path, symbol: str, bars: List[tuple]):
+    dates = pd.date_range("2020-01-01", periods=len(bars), freq="D")
+    o, h, l, c = zip(*bars)
+    df = pd.DataFrame(
+        {"Open": o, "High": h, "Low": l, "Close": c, "Adj Close": c, "Volume": 1000},
+        index=dates,
+    )
+    df.to_csv(root / f"{symbol}.csv", date_format="%Y-%m-%d")
+
+
+class ScriptedStrategy(Strategy):
+    def __init__(self, actions: Dict[int, list]):
+        self.actions = actions
+        self.bar = 0
+        self.orders: List[Order] = []
+
+    def on_bar(self, engine: Engine, timestamp: pd.Timestamp, data) -> None:
+        for kind, kwargs in self.actions.get(self.bar, []):
+            if kind == "order":
+                self.orders.append(engine.order(**kwargs))
+            else:
+                getattr(engine, kind)(**kwargs)
+        self.bar += 1
+
+
+def test_order_book_triggers_only_crossed_prices():
+    book = OrderBook()
+    low = book.add(Order("AAA", 1, "buy", LIMIT, limit_price=9.0))
+    far = book.add(Order("AAA", 1, "buy", LIMIT, limit_price=5.0))
+    fills = book.trigger("AAA", open_=10.0, high=10.5, low=8.5)
+    assert [(o.id, p) for o, p in fills] == [(low.id, 9.0)]
+    assert list(book) == [far]
+    book.cancel(far)
+    assert not book and far.status == "cancelled"
+
+
+def test_engine_stop_and_next_open_orders(tmp_path: Path):
+    _write_ohlc_csv(
+        tmp_path,
+        "AAA",
+        [(10, 10, 10, 10), (11, 12, 10.5, 11), (9, 9.5, 8, 8.5), (8, 8, 8, 8)],
+    )
+    portal = DataPortal(DataStore(tmp_path), ["AAA"])
+    strat = ScriptedStrategy(
+        {
+            0: [("order", dict(symbol="AAA", quantity=2))],
+            1: [("order", dict(symbol="AAA", quantity=2, side="sell", stop_price=10.0))],
+        }
+    )
+    engine = Engine(portal, strat, starting_cash=100.0)
+    engine.run()
+
+    buy, stop = strat.orders
+    # Market order fills at the next bar's Open
+    assert buy.fill_price == 11.0
+    # Gap below the stop fills at the Open
+    assert stop.status == "filled" and stop.fill_price == 9.0
+    assert engine.portfolio.positions["AAA"] == 0
+    assert pytest.approx(engine.portfolio.cash) == 100.0 - 22.0 + 18.0
+
+
+def test_stop_limit_rests_as_limit_when_gapped():
+    book = OrderBook()
+    order = book.add(Order("AAA", 1, "buy", STOP_LIMIT, limit_price=10.5, stop_price=10.0))
+    assert book.trigger("AAA", open_=11.0, high=11.5, low=10.8) == []
+    assert order.order_type == LIMIT
+    fills = book.trigger("AAA", open_=10.7, high=10.9, low=10.4)
+    assert fills == [(order, 10.5)]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.portfolio import BUY, SELL, Portfolio, Trade, TradeLedger
+
+
+def test_portfolio_incremental_valuation():
+    pf = Portfolio(cash=100.0, positions={"AAA": 0, "BBB": 0})
+    bar = {"AAA": pd.Series({"Close": 2.0}), "BBB": pd.Series({"Close": 5.0})}
+    pf.mark(bar)
+    pf.apply_fill(pf.slot("AAA"), 10, 2.0)
+    assert pf.positions["AAA"] == 10
+    assert pytest.approx(pf.cash) == 80.0
+    assert pytest.approx(pf.value()) == 100.0
+
+    pf.mark_slots(np.array([0]), np.array([3.0]))
+    assert pytest.approx(pf.value()) == 110.0
+    # NaN prices keep the previous mark
+    pf.mark_slots(np.array([0, 1]), np.array([np.nan, 6.0]))
+    assert pytest.approx(pf.value()) == 110.0
+    assert pf.positions == {"AAA": 10, "BBB": 0}
+
+
+def test_trade_ledger_grows_and_materialises():
+    ledger = TradeLedger(["AAA", "BBB"], capacity=1)
+    ts = pd.Timestamp("2020-01-01")
+    ledger.record(ts, 0, 5, 1.5, BUY)
+    ledger.record_batch(ts, np.array([0, 1]), np.array([2, 3]), np.array([1.0, 2.0]), np.array([SELL, BUY]))
+
+    assert len(ledger) == 3
+    assert ledger[0] == Trade(ts, "AAA", 5, 1.5, "buy")
+    assert ledger[-1].symbol == "BBB"
+    frame = ledger.to_frame()
+    assert list(frame["side"]) == ["buy", "sell", "buy"]
+    assert list(frame["symbol"]) == ["AAA", "AAA", "BBB"]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import DataPortal, DataStore, Engine, Strategy, analyze
+from src.recorder import EquityRecorder
+
+
+def _write_hourly_csv(root: Path, symbol: str, closes: List[float], tz=None):
+    dates = pd.date_range("2020-01-01 09:00", periods=len(closes), freq="8h", tz=tz)
+    df = pd.DataFrame(
+        {
+            "Open": closes,
+            "High": closes,
+            "Low": closes,
+            "Close": closes,
+            "Adj Close": closes,
+            "Volume": 1000,
+        },
+        index=dates,
+    )
+    df.to_csv(root / f"{symbol}.csv")
+
+
+class TradeEveryThird(Strategy):
+    def __init__(self):
+        self.i = 0
+
+    def on_bar(self, engine, timestamp, data):
+        if self.i % 3 == 0:
+            engine.buy("AAA", 1)
+        self.i += 1
+
+
+CLOSES = [float(c) for c in range(10, 20)]
+
+
+def _run(tmp_path: Path, recorder: EquityRecorder) -> pd.DataFrame:
+    _write_hourly_csv(tmp_path, "AAA", CLOSES)
+    portal = DataPortal(DataStore(tmp_path), ["AAA"])
+    return Engine(portal, TradeEveryThird(), starting_cash=1000.0, recorder=recorder).run()
+
+
+def test_recorder_every_bar_matches_full_history(tmp_path: Path):
+    rec = EquityRecorder(positions=True)
+    out = _run(tmp_path, rec)
+    assert len(out) == len(CLOSES)
+    assert list(out.columns) == ["value", "cash", "exposure"]
+    assert np.shares_memory(out["value"].to_numpy(), rec._value)
+    pos = rec.positions_frame()
+    assert list(pos["AAA"]) == [1, 1, 1, 2, 2, 2, 3, 3, 3, 4]
+    assert out["exposure"].iloc[-1] == pytest.approx(4 * 19.0 / out["value"].iloc[-1])
+    assert analyze(out).final_value == out["value"].iloc[-1]
+
+
+@pytest.mark.parametrize(
+    "recorder, expected",
+    [
+        (EquityRecorder(every=4), [0, 4, 8, 9]),
+        (EquityRecorder("trade"), [0, 3, 6, 9]),
+        (EquityRecorder("day"), [1, 4, 7, 9]),
+    ],
+)
+def test_recorder_sampling_modes(tmp_path: Path, recorder, expected):
+    full = _run(tmp_path, EquityRecorder())
+    out = _run(tmp_path, recorder)
+    pd.testing.assert_frame_equal(out, full.iloc[expected])
+
+
+def test_recorder_day_mode_with_tz_aware_bars(tmp_path: Path):
+    _write_hourly_csv(tmp_path, "AAA", CLOSES, tz="America/New_York")
+    portal = DataPortal(DataStore(tmp_path, tz="America/New_York"), ["AAA"])
+    full = Engine(portal, TradeEveryThird(), starting_cash=1000.0).run()
+    out = Engine(
+        portal, TradeEveryThird(), starting_cash=1000.0, recorder=EquityRecorder("day")
+    ).run()
+    # Days follow the bars' local calendar, as for naive timestamps.
+    pd.testing.assert_frame_equal(out, full.iloc[[1, 4, 7, 9]])
+
+
+@pytest.mark.parametrize("mode", ["trade", "day"])
+def test_recorder_resumed_run_matches_uninterrupted(tmp_path: Path, mode: str):
+    _write_hourly_csv(tmp_path, "AAA", CLOSES)
+    portal = DataPortal(DataStore(tmp_path), ["AAA"])
+    full = Engine(
+        portal, TradeEveryThird(), starting_cash=1000.0, recorder=EquityRecorder(mode)
+    ).run()
+
+    engine = Engine(
+        portal, TradeEveryThird(), starting_cash=1000.0, recorder=EquityRecorder(mode)
+    )
+    # Bar 5 is neither a trade nor the last bar of its day.
+    partial = engine.run(end=pd.Timestamp("2020-01-03 01:00"))
+    assert partial.index[-1] == pd.Timestamp("2020-01-03 01:00")
+    resumed = engine.fork().run()
+    pd.testing.assert_frame_equal(resumed, full)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import analyze
+from src.portfolio import Trade
+from src.robustness import block_bootstrap_indices, bootstrap_analysis
+
+
+def _results(n: int = 60) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    value = 100 * np.cumprod(1 + rng.normal(0.001, 0.01, n))
+    return pd.DataFrame({"value": value}, index=pd.bdate_range("2020-01-01", periods=n))
+
+
+def test_block_bootstrap_indices_are_contiguous_blocks():
+    idx = block_bootstrap_indices(10, 4, 3, np.random.default_rng(0))
+    assert idx.shape == (4, 10)
+    assert ((idx >= 0) & (idx < 10)).all()
+    steps = np.diff(idx[:, :3], axis=1) % 10
+    assert (steps == 1).all()
+
+
+def test_bootstrap_analysis_bands():
+    results = _results()
+    trades = [
+        Trade(results.index[1], "AAA", 1, 10.0, "buy"),
+        Trade(results.index[5], "AAA", 1, 12.0, "sell"),
+        Trade(results.index[6], "AAA", 1, 12.0, "buy"),
+        Trade(results.index[9], "AAA", 1, 9.0, "sell"),
+    ]
+    table = bootstrap_analysis(results, trades, n_samples=500, seed=7)
+
+    assert list(table.columns) == ["observed", "p5", "p50", "p95"]
+    assert table.loc["sharpe_ratio", "observed"] == pytest.approx(analyze(results).sharpe_ratio)
+    assert (table["p5"] <= table["p95"]).all()
+    assert "trade_shuffle_max_drawdown" in table.index
+
+    again = bootstrap_analysis(results, n_samples=500, seed=7, n_jobs=2)
+    assert again.loc["max_drawdown", "p50"] <= 0
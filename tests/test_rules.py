@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import DataStore, DataPortal, Engine
+from src.rules import RuleError, RuleSet, col, parse, position_state
+from src.strategies import RuleStrategy
+from src.strategies.friend_strategy import FRIEND_RULES, FriendStrategy
+from src.strategies.support_ft_strategy import SUPPORT_FT_RULES, SupportFTStrategy
+
+
+def test_parse_matches_operator_expressions():
+    df = pd.DataFrame({"Close": [1.0, 3.0, 2.0, 5.0], "ema": [2.0, 2.0, 2.0, 2.0]})
+    parsed = parse("close > ema * 1.1 and not prev(close) > 2")
+    built = (col("close") > col("ema") * 1.1) & ~(parse("prev(close)") > 2)
+    assert parsed(df).tolist() == [False, True, False, True]
+    assert built(df).tolist() == parsed(df).tolist()
+    assert parse("1 < close < 4")(df).tolist() == [False, True, True, False]
+    assert (col("Close") - col("ema"))(df).tolist() == [-1.0, 1.0, 0.0, 3.0]
+
+
+def test_position_state_holds_between_entry_and_exit():
+    entry = [0, 1, 1, 0, 0, 1, 0]
+    exit_ = [1, 0, 0, 1, 1, 0, 0]
+    assert position_state(entry, exit_).tolist() == [0, 1, 1, 0, 0, 1, 1]
+
+
+@pytest.mark.parametrize("rule", ["__import__('os')", "close.real > 1", "[close][0]", "foo(close)"])
+def test_unsafe_rules_are_rejected(rule):
+    with pytest.raises(RuleError):
+        RuleSet(entry=[rule], exit=[])
+
+
+DIP_YAML = """
+name: dip
+indicators:
+  fast: {func: sma, window: 2}
+entry: ["close < fast"]
+exit: ["close > fast"]
+"""
+
+
+def test_rule_set_from_yaml(tmp_path: Path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "dip.yaml"
+    path.write_text(DIP_YAML)
+    one_line = '{name: dip, entry: ["close < 2"], exit: ["close > 4"]}'
+    for rules in (
+        RuleSet.from_yaml_text(DIP_YAML),
+        RuleSet.from_yaml_file(path),
+        RuleSet.from_yaml_file(str(path)),
+        RuleStrategy("AAA", path).rules,
+        RuleStrategy("AAA", one_line).rules,
+    ):
+        df = pd.DataFrame({"Close": [3.0, 1.9, 1.0, 4.5, 5.0]})
+        for name, func in {**rules.indicators, **rules.signals()}.items():
+            df[name] = func(df)
+        assert df["dip_position"].tolist() == [0, 1, 1, 0, 0]
+    # A path given as text is not silently opened.
+    with pytest.raises(RuleError, match="from_yaml_file"):
+        RuleSet.from_yaml_text(str(path))
+    with pytest.raises(RuleError):
+        RuleStrategy("AAA", "dip.yaml")
+    with pytest.raises(RuleError):
+        RuleSet.from_dict({"entry": [], "exit": [], "extra": 1})
+
+
+def _write_walk(root: Path, symbol: str, n: int = 400, seed: int = 3) -> None:
+    # A constant prefix keeps the per-bar warmups of the legacy strategies
+    # from diverging from the vectorised indicators.
+    rng = np.random.default_rng(seed)
+    steps = np.concatenate([np.zeros(30), rng.normal(0, 0.03, n)])
+    close = 100 * np.exp(steps.cumsum())
+    open_ = close * (1 + rng.normal(0, 0.01, len(close)))
+    dates = pd.date_range("2020-01-01", periods=len(close), freq="D")
+    pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close),
+            "Low": np.minimum(open_, close),
+            "Close": close,
+            "Adj Close": close,
+            "Volume": 1000,
+        },
+        index=dates,
+    ).to_csv(root / f"{symbol}.csv", date_format="%Y-%m-%d")
+
+
+def _trades(tmp_path: Path, strategy) -> list:
+    engine = Engine(DataPortal(DataStore(tmp_path), ["XXX"]), strategy, starting_cash=100_000.0)
+    engine.run()
+    return [(t.timestamp, t.side, t.quantity) for t in engine.trades]
+
+
+@pytest.mark.parametrize(
+    "legacy, rules, qty",
+    [
+        (lambda: FriendStrategy("XXX"), FRIEND_RULES, 1),
+        (lambda: SupportFTStrategy("XXX"), SUPPORT_FT_RULES, 10),
+    ],
+)
+def test_rule_strategy_matches_legacy(tmp_path: Path, legacy, rules, qty):
+    _write_walk(tmp_path, "XXX")
+    expected = _trades(tmp_path, legacy())
+    result = _trades(tmp_path, RuleStrategy("XXX", rules, quantity=qty))
+    assert expected
+    assert result == expected
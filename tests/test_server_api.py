@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
@@ -59,3 +61,45 @@ def test_backtest_multiple_symbols(tmp_path, monkeypatch):
     assert resp.status_code == 200
     data = resp.json()
     assert len(data["history"]) == 3
+
+
+def test_backtest_profile_flag(tmp_path, monkeypatch):
+    _write_sample_csv(tmp_path, "AAA", [1, 2, 3])
+
+    ds = DataStore(tmp_path)
+    monkeypatch.setattr(server, "store", ds)
+    monkeypatch.setattr(server, "DATA_ROOT", Path(tmp_path))
+    server._PORTALS.clear()
+
+    client = TestClient(server.app)
+    resp = client.post(
+        "/backtest",
+        json={"symbol": "AAA", "strategy": "MACDStrategy", "profile": True},
+    )
+    assert resp.status_code == 200
+    profile = resp.json()["profile"]
+    assert profile["bars"] == 3
+    assert "strategy" in profile["phases"]
+
+
+def test_concurrent_identical_backtests_are_coalesced(tmp_path, monkeypatch):
+    _write_sample_csv(tmp_path, "AAA", [1, 2, 3])
+    monkeypatch.setattr(server, "store", DataStore(tmp_path))
+    server._PORTALS.clear()
+    runs = []
+    original = server._run_backtest
+
+    def slow_run(req):
+        runs.append(req)
+        time.sleep(0.2)
+        return original(req)
+
+    monkeypatch.setattr(server, "_run_backtest", slow_run)
+    client = TestClient(server.app)
+    payload = {"symbol": "AAA", "strategy": "MovingAverageCrossStrategy",
+               "params": {"short_window": 1, "long_window": 2}}
+    with ThreadPoolExecutor(4) as pool:
+        responses = list(pool.map(lambda _: client.post("/backtest", json=payload), range(4)))
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.text for r in responses}) == 1
+    assert len(runs) == 1
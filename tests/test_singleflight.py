@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src import DataStore
+from src.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flight.do, "key", work) for _ in range(8)]
+        while flight.coalesced < 7:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert not flight.in_flight("key")
+    # Completed calls are not cached.
+    assert flight.do("key", lambda: 1) == 1
+
+
+def test_errors_propagate_to_waiters():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, "k", fail)
+        started.wait(5)
+        waiter = pool.submit(flight.do, "k", fail)
+        for fut in (leader, waiter):
+            with pytest.raises(RuntimeError, match="boom"):
+                fut.result()
+    assert not flight.in_flight("k")
+
+
+def test_datastore_load_reads_file_once(tmp_path: Path, monkeypatch):
+    pd.DataFrame(
+        {"Open": [1.0], "High": [1.0], "Low": [1.0], "Close": [1.0], "Volume": [1]},
+        index=pd.date_range("2020-01-01", periods=1),
+    ).to_csv(tmp_path / "AAA.csv")
+    store = DataStore(tmp_path)
+    reads = []
+    original = store._read_file
+
+    def slow_read(path):
+        reads.append(path)
+        time.sleep(0.1)
+        return original(path)
+
+    monkeypatch.setattr(store, "_read_file", slow_read)
+    with ThreadPoolExecutor(6) as pool:
+        frames = list(pool.map(store.load, ["AAA"] * 6))
+    assert len(reads) == 1
+    assert all(df is frames[0] for df in frames)
+
+
+def test_datastore_reload_does_not_join_an_older_read(tmp_path: Path, monkeypatch):
+    def write(close):
+        pd.DataFrame(
+            {"Open": [close], "High": [close], "Low": [close], "Close": [close], "Volume": [1]},
+            index=pd.date_range("2020-01-01", periods=1),
+        ).to_csv(tmp_path / "AAA.csv")
+
+    write(1.0)
+    store = DataStore(tmp_path)
+    original = store._read_file
+    reading, release = threading.Event(), threading.Event()
+
+    def blocking_read(path):
+        df = original(path)
+        if not reading.is_set():
+            reading.set()
+            release.wait(5)
+        return df
+
+    monkeypatch.setattr(store, "_read_file", blocking_read)
+    with ThreadPoolExecutor(1) as pool:
+        stale = pool.submit(store.load, "AAA")
+        reading.wait(5)
+        write(2.0)
+        assert store.load("AAA", reload=True)["Close"].iloc[0] == 2.0
+        release.set()
+        assert stale.result()["Close"].iloc[0] == 1.0
+    # The older read finished last but does not replace the cached reload.
+    assert store.load("AAA")["Close"].iloc[0] == 2.0
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import DataPortal, DataStore, Engine, Strategy
+from src.data import StreamingPortal
+from src.indicators import sma
+
+
+def _write_store(root: Path) -> DataStore:
+    store = DataStore(root)
+    rng = np.random.default_rng(7)
+    idx = pd.date_range("2021-03-01 09:30", periods=700, freq="min", tz="UTC")
+    for sym, fmt in (("AAA", "parquet"), ("BBB", "csv")):
+        c = 100 + rng.standard_normal(len(idx)).cumsum()
+        df = pd.DataFrame(
+            {"Open": c, "High": c + 0.5, "Low": c - 0.5, "Close": c, "Adj Close": c, "Volume": 100},
+            index=idx,
+        )
+        store.write(sym, df, fmt=fmt)
+    return store
+
+
+class SmaCross(Strategy):
+    def indicators(self):
+        return {"sma30": lambda df: sma(df, 30)}
+
+    def on_bar(self, engine, timestamp, data):
+        for sym, row in data.items():
+            held = engine.portfolio.positions[sym]
+            if row["Close"] > row["sma30"] and not held:
+                engine.buy(sym, 10)
+            elif row["Close"] < row["sma30"] and held:
+                engine.sell(sym, held)
+
+
+def test_streaming_portal_matches_in_memory_run(tmp_path: Path):
+    store = _write_store(tmp_path)
+    expected = Engine(DataPortal(store, ["AAA", "BBB"]), SmaCross()).run()
+
+    portal = StreamingPortal(store, ["AAA", "BBB"], chunk_size=64, warmup=40, read_rows=50)
+    engine = Engine(portal, SmaCross())
+    results = engine.run()
+    pd.testing.assert_frame_equal(results, expected)
+    assert len(portal.index) == 700
+
+    windows = list(StreamingPortal(store, ["AAA", "BBB"], chunk_size=64, prefetch=0).iter_windows())
+    assert max(len(idx) for idx, _ in windows) == 64
+    assert sum(len(frames["BBB"]) for _, frames in windows) == 700
+
+
+def test_streaming_portal_stops_prefetch_thread_on_early_exit(tmp_path: Path):
+    store = _write_store(tmp_path)
+    portal = StreamingPortal(store, ["AAA"], chunk_size=16, prefetch=1)
+    bars = portal.iter_bars(end=pd.Timestamp("2021-03-01 09:40", tz="UTC"))
+    assert len(list(bars)) == 11
+    assert not [t for t in threading.enumerate() if t.name == "portal-prefetch"]
+
+    with pytest.raises(FileNotFoundError):
+        list(StreamingPortal(store, ["AAA", "MISSING"]).iter_bars())
+
+
+def test_streaming_portal_start_skips_enhancing_earlier_windows(tmp_path: Path, monkeypatch):
+    store = _write_store(tmp_path)
+    portal = StreamingPortal(store, ["AAA", "BBB"], chunk_size=64, warmup=40, prefetch=0)
+    portal.register_indicator("sma30", lambda df: sma(df, 30))
+    start = pd.Timestamp("2021-03-01 19:00", tz="UTC")  # bar 570, in the 9th window
+    expected = [(ts, bar["BBB"]["sma30"]) for ts, bar in portal.iter_bars() if ts >= start]
+
+    enhanced = []
+    series = StreamingPortal._series
+
+    def spy(self, symbol, data):
+        enhanced.append(data.index[-1])
+        return series(self, symbol, data)
+
+    monkeypatch.setattr(StreamingPortal, "_series", spy)
+    got = [(ts, bar["BBB"]["sma30"]) for ts, bar in portal.iter_bars(start=start)]
+    assert got == expected
+    assert min(enhanced) >= start